@@ -0,0 +1,345 @@
+import os
+import sys
+import csv
+import math
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+from multiprocessing import Pool
+from twisted.python.formmethod import InputError
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from main.aging import Aging
+from main.calculator import Calculator
+from main.configuration import Configuration
+from main.columnar_data import create_cyclic_data
+from main.phase_timer import PhaseTimer
+from main.random_stream import RandomStream
+
+
+def get_peak_memory():
+    '''
+    Returns the peak resident memory of the process in kilobytes.
+    '''
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class MemoryPhaseTimer(PhaseTimer):
+    '''
+    MemoryPhaseTimer is a PhaseTimer that also measures how much the peak
+    resident memory of the process grows while each phase is running.
+    The growth of a phase includes the growth in the phases started in
+    it.
+    '''
+
+    def __init__(self, mode='cycle'):
+        '''
+        Constructor
+        '''
+        PhaseTimer.__init__(self, mode)
+        # The peak memory growth of each phase in kilobytes.
+        self.memory = dict((phase, 0) for phase in PhaseTimer.PHASES)
+        # The peak memory when each running phase was started.
+        self.started_memory = []
+
+    def start(self, phase):
+        self.started_memory.append(get_peak_memory())
+        PhaseTimer.start(self, phase)
+
+    def stop(self):
+        phase = self.running[-1] if self.running else None
+        PhaseTimer.stop(self)
+        self.memory[phase] += get_peak_memory() - self.started_memory.pop()
+
+
+def run_case(case):
+    '''
+    Runs the cycles of one network for the case (setting, engine,
+    agents, cycles, values, seed), where values are the parameters that
+    override the defaults, and returns (phase_rows, cycle_rows,
+    counter_rows):
+    phase_rows are (phase, calls, seconds, memory_kb), with a 'total' row
+    of the cycles and the peak memory of the process,
+    cycle_rows are (cycle, seconds, peak_memory_kb),
+    counter_rows are (counter, value).
+    It is made in a new process of the pool, so the peak memory is the
+    peak of this case.
+    '''
+    setting, engine, agents, cycles, values, seed = case
+    output_dir = tempfile.mkdtemp()
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        config = Configuration(START_NUM_AGENT=agents, NUMBER_OF_CYCLES=cycles, \
+                               MASTER_SEED=seed, PLOT_MODE='off', \
+                               TIMING='cycle', OUTPUT_DIR=output_dir, \
+                               **values)
+        Calculator.set_checked(config.CHECKED_CALCULATIONS)
+        cyclic_data = create_cyclic_data(output_dir, config)
+        cyclic_data.set_run(1)
+        aging = Aging(1, cyclic_data, config, RandomStream.for_run(seed, 1), \
+                      None, 0)
+        network = aging.network
+        network.phase_timer = MemoryPhaseTimer()
+        cycle_rows = []
+        for cycle in range(1, cycles + 1):
+            started = time.time()
+            aging.start_cycle(cycle)
+            network.calculate_network()
+            aging.end_cycle(cycle)
+            cycle_rows.append((cycle, time.time() - started, get_peak_memory()))
+        aging.end_run()
+        cyclic_data.close_all()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+        shutil.rmtree(output_dir)
+    timer = network.phase_timer
+    phase_rows = [(phase, calls, seconds, timer.memory[phase]) \
+                  for phase, calls, seconds in timer.get_rows()]
+    phase_rows.append(('total', cycles, sum(row[1] for row in cycle_rows), \
+                       get_peak_memory()))
+    return phase_rows, cycle_rows, network.work_counter.get_rows()
+
+
+class ScalingBenchmark(object):
+    '''
+    ScalingBenchmark runs the cycles of a network for numbers of agents
+    from 50 to 10,000, with representative settings of ALPHA, BETA, R and
+    LOSS, and with each evaluation engine. The time and the peak memory
+    growth of each phase, the time and the peak memory of each cycle and
+    the work counters are written to csv files, so the complexity curve
+    of each engine can be drawn and the results of two versions of the
+    code can be compared with compare method.
+
+    Each case is run in its own process. The map is scaled with the
+    number of agents so that the density of agents is the density of
+    START_NUM_AGENT agents on MAP, unless fixed_map is set; on the fixed
+    map the candidate pairs grow as the square of the agents for every
+    engine.
+    '''
+
+    # The parameters of the representative settings.
+    SETTINGS = (('default', {}), \
+                ('tacit', {'ALPHA': 0.0, 'BETA': 2.0}), \
+                ('codified', {'ALPHA': 0.2, 'BETA': 6.0}), \
+                ('no_loss', {'LOSS': 0.0, 'R': 0.0}), \
+                ('wide_loss', {'LOSS': 20.0, 'R': 3.0}))
+
+    # The parameters of the evaluation engines.
+    ENGINES = (('dense', {'SPARSE_EVALUATION': 0, 'LAZY_LOSS': 1}), \
+               ('dense_eager', {'SPARSE_EVALUATION': 0, 'LAZY_LOSS': 0}), \
+               ('sparse', {'SPARSE_EVALUATION': 1, 'LAZY_LOSS': 1}))
+
+    # The largest number of agents each engine is run for, as the dense
+    # matrices of 10,000 agents need several gigabytes.
+    MAX_AGENTS = {'dense': 2000, 'dense_eager': 2000, 'sparse': 10000}
+
+    # The numbers of agents.
+    SIZES = (50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+    # The names of the result files in the output directory.
+    PHASE_FILE = 'benchmark_phase.csv'
+    CYCLE_FILE = 'benchmark_cycle.csv'
+    COUNTER_FILE = 'benchmark_counter.csv'
+
+    # The seconds below which a phase is not compared, as its time is
+    # mostly noise.
+    MIN_SECONDS = 0.05
+
+    def __init__(self, sizes=None, settings=None, engines=None, cycles=5, \
+                 seed=1, fixed_map=0, config=None):
+        '''
+        Constructor. sizes, settings and engines are None for all of them,
+        otherwise lists of the numbers of agents and of the names of the
+        settings and engines. The parameters other than the ones of the
+        settings and engines are taken from config, the default
+        configuration if it is None.
+        '''
+        if config is None:
+            config = Configuration.get_default()
+        if sizes is None:
+            sizes = ScalingBenchmark.SIZES
+        if (cycles < 1) or any(size < 2 for size in sizes):
+            raise InputError("Error : ScalingBenchmark cannot have cycles less than 1 or sizes less than 2.")
+        names = dict(ScalingBenchmark.SETTINGS)
+        if settings is None:
+            settings = [name for name, values in ScalingBenchmark.SETTINGS]
+        engine_names = dict(ScalingBenchmark.ENGINES)
+        if engines is None:
+            engines = [name for name, values in ScalingBenchmark.ENGINES]
+        for name in settings:
+            if name not in names:
+                raise InputError("Error : ScalingBenchmark has no setting " + name + ".")
+        for name in engines:
+            if name not in engine_names:
+                raise InputError("Error : ScalingBenchmark has no engine " + name + ".")
+        # The configuration that gives the parameters of the cases.
+        self.config = config
+        # The (setting, engine, agents, cycles, values, seed) cases.
+        self.cases = []
+        for setting in settings:
+            for engine in engines:
+                for agents in sorted(sizes):
+                    if agents > ScalingBenchmark.MAX_AGENTS[engine]:
+                        continue
+                    values = dict(names[setting])
+                    values.update(engine_names[engine])
+                    if not fixed_map:
+                        values['MAP'] = config.MAP * \
+                            math.sqrt(agents / float(config.START_NUM_AGENT))
+                    self.cases.append((setting, engine, agents, cycles, \
+                                       values, seed))
+
+    def run(self, output_dir):
+        '''
+        Runs all cases, each in a new process, and writes their results to
+        the files in output_dir. Returns the results of the cases.
+        '''
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        pool = Pool(1, maxtasksperchild=1)
+        try:
+            results = []
+            for case in self.cases:
+                print "benchmark", case[0], case[1], case[2], "agents"
+                results.append(pool.apply(run_case, (case,)))
+        finally:
+            pool.close()
+            pool.join()
+        self.write(output_dir, results)
+        return results
+
+    def write(self, output_dir, results):
+        '''
+        Writes the results of the cases to the files in output_dir.
+        '''
+        for file_name, header, index in \
+                ((ScalingBenchmark.PHASE_FILE, \
+                  ['phase', 'calls', 'seconds', 'memory_kb'], 0), \
+                 (ScalingBenchmark.CYCLE_FILE, \
+                  ['cycle', 'seconds', 'peak_memory_kb'], 1), \
+                 (ScalingBenchmark.COUNTER_FILE, ['counter', 'value'], 2)):
+            data_file = open(os.path.join(output_dir, file_name), 'wb')
+            writer = csv.writer(data_file)
+            writer.writerow(['setting', 'engine', 'agents'] + header)
+            for case, result in zip(self.cases, results):
+                for row in result[index]:
+                    writer.writerow(list(case[:3]) + [repr(value) \
+                        if isinstance(value, float) else value for value in row])
+            data_file.close()
+
+    @staticmethod
+    def read(output_dir, file_name):
+        '''
+        Returns the rows of a result file as a dictionary from
+        (setting, engine, agents, name) to the values of the row.
+        '''
+        data_file = open(os.path.join(output_dir, file_name), 'rb')
+        reader = csv.reader(data_file)
+        reader.next()
+        rows = {}
+        for row in reader:
+            rows[(row[0], row[1], int(row[2]), row[3])] = row[4:]
+        data_file.close()
+        return rows
+
+    @staticmethod
+    def get_exponents(output_dir):
+        '''
+        Returns the (setting, engine, agents, seconds, exponent) rows of the
+        total times, where exponent is the slope of log(seconds) over
+        log(agents) from the previous number of agents, the exponent of
+        the complexity curve, None for the first one.
+        '''
+        totals = {}
+        for key, values in ScalingBenchmark.read(output_dir, \
+                                                 ScalingBenchmark.PHASE_FILE).items():
+            if key[3] == 'total':
+                totals.setdefault(key[:2], []).append((key[2], float(values[1])))
+        rows = []
+        for setting, engine in sorted(totals):
+            previous = None
+            for agents, seconds in sorted(totals[(setting, engine)]):
+                exponent = None
+                if (previous is not None) and (previous[1] > 0) and (seconds > 0):
+                    exponent = math.log(seconds / previous[1]) / \
+                               math.log(agents / float(previous[0]))
+                rows.append((setting, engine, agents, seconds, exponent))
+                previous = (agents, seconds)
+        return rows
+
+    @staticmethod
+    def compare(baseline_dir, output_dir, threshold=1.25):
+        '''
+        Compares the results in output_dir with the results in
+        baseline_dir and returns the list of the regressions found: the
+        phases, and the total, whose time grew more than threshold times
+        and the counters whose value changed. The phases which took less
+        than MIN_SECONDS in the baseline are not compared.
+        '''
+        regressions = []
+        baseline = ScalingBenchmark.read(baseline_dir, ScalingBenchmark.PHASE_FILE)
+        current = ScalingBenchmark.read(output_dir, ScalingBenchmark.PHASE_FILE)
+        for key in sorted(set(baseline) & set(current)):
+            before = float(baseline[key][1])
+            after = float(current[key][1])
+            if (before >= ScalingBenchmark.MIN_SECONDS) and \
+               (after > threshold * before):
+                regressions.append("%s %s %d %s: %.3f s -> %.3f s" % \
+                                   (key + (before, after)))
+        baseline = ScalingBenchmark.read(baseline_dir, ScalingBenchmark.COUNTER_FILE)
+        current = ScalingBenchmark.read(output_dir, ScalingBenchmark.COUNTER_FILE)
+        for key in sorted(set(baseline) & set(current)):
+            if baseline[key][0] != current[key][0]:
+                regressions.append("%s %s %d %s: %s -> %s" % \
+                                   (key + (baseline[key][0], current[key][0])))
+        return regressions
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Measures how the time and ' + \
+                                     'the memory of the cycles grow with the ' + \
+                                     'number of agents.')
+    parser.add_argument('--sizes', type=int, nargs='*', default=None, \
+                        help='numbers of agents, 50 to 10000 if not given')
+    parser.add_argument('--settings', nargs='*', default=None, \
+                        choices=[name for name, values in ScalingBenchmark.SETTINGS], \
+                        help='settings to run, all if not given')
+    parser.add_argument('--engines', nargs='*', default=None, \
+                        choices=[name for name, values in ScalingBenchmark.ENGINES], \
+                        help='evaluation engines to run, all if not given')
+    parser.add_argument('--cycles', type=int, default=5, \
+                        help='number of cycles of each case')
+    parser.add_argument('--seed', type=int, default=1, \
+                        help='MASTER_SEED of the cases')
+    parser.add_argument('--fixed-map', action='store_true', \
+                        help='keep MAP instead of scaling it with the agents')
+    parser.add_argument('--output', default='benchmark_results', \
+                        help='directory where the results are written')
+    parser.add_argument('--compare', default=None, metavar='BASELINE_DIR', \
+                        help='compare the results with the results in BASELINE_DIR')
+    parser.add_argument('--threshold', type=float, default=1.25, \
+                        help='time ratio above which a phase is a regression')
+    Configuration.add_arguments(parser)
+    args = parser.parse_args()
+
+    benchmark = ScalingBenchmark(args.sizes, args.settings, args.engines, \
+                                 args.cycles, args.seed, args.fixed_map, \
+                                 Configuration.from_arguments(args))
+    benchmark.run(args.output)
+    for setting, engine, agents, seconds, exponent in \
+            ScalingBenchmark.get_exponents(args.output):
+        print "%-10s %-12s %6d agents %9.3f s" % (setting, engine, agents, seconds), \
+              ("exponent %.2f" % exponent) if exponent is not None else ""
+    if args.compare is not None:
+        regressions = ScalingBenchmark.compare(args.compare, args.output, \
+                                               args.threshold)
+        for regression in regressions:
+            print "regression", regression
+        if regressions:
+            exit(1)
@@ -1,8 +1,8 @@
-import random
 from twisted.python.formmethod import InputError
 from calculator import Calculator
-from global_values import MAP_MARKET, MAP_TECH, MAX_CUM_KNOW, MIN_CUM_KNOW,\
-    LEARNING_MARGIN, ALPHA_TECH, ALPHA_MARKET
+from population import Population
+from configuration import Configuration
+from random_stream import RandomStream
 
 class Agent(object):
     '''
@@ -12,46 +12,211 @@ class Agent(object):
     agents and chooses the most learningable agent to make alliance. 
     After the alliance is agreed, each side of the alliance moves 
     towards its partner.   
+
+    The values of an agent are stored in one row of a Population and the
+    agent is a view over this row. An agent created without a population
+    is stored in a one-row population of its own, so it cannot make
+    alliances, which are made between the agents of one population.
+
+    The map ranges, the cum_knowledge range, the movement coefficients and
+    LEARNING_MARGIN are taken from the configuration of the agent and the
+    random positions are drawn from its random stream.
     '''
 
+    __slots__ = ('agent_id', 'population', 'index', 'config', 'random_stream')
 
-    def __init__(self, agent_id, entry_cycle, sigma):
+    def __init__(self, agent_id, entry_cycle, sigma, population=None, \
+                 config=None, random_stream=None):
         '''
         Constructor
         '''
+        if config is None:
+            config = Configuration.get_default()
+        if random_stream is None:
+            random_stream = RandomStream.get_global()
+        # The configuration that gives the parameters of this agent.
+        self.config = config
+        # The stream that the random values of this agent are drawn from.
+        self.random_stream = random_stream
         # Each agent has a unique id determined by the network it 
         # belongs to.
         self.agent_id = agent_id
+        if population is None:
+            population = Population(1)
+        # The population that stores the values of this agent.
+        self.population = population
         # Gets the next sigma_m, sigma_k value pair for this agent.
         value = sigma.get_sigma()
-        # The coefficient that determines learningability depending on 
-        # market distance. 
-        self.sigma_m = value[0]
-        # The coefficient that determines learningability depending on 
-        # knowledge distance.
-        self.sigma_k = value[1]
-        # The cycle that this agent enters the network.
-        self.entry_cycle = entry_cycle
-        # The value that indicates if this agent is still active in the network or left the network.
-        self.is_active = 1
-        # The initial market position of the agent on the system map. 
-        # It is determined randomly for each agent.
-        self.map_market = random.uniform(0, MAP_MARKET)
-        # The initial knowledge position of the agent on the system map.
-        # It is determined randomly for each agent.
-        self.map_knowledge = random.uniform(0, MAP_TECH)
-        # Current cumulative knowledge of the agent. It is determined randomly at 
-        # at the entry in the system and updated in each cycle depending 
-        # on the alliance established.
-        self.cum_knowledge = random.uniform(MIN_CUM_KNOW, MAX_CUM_KNOW)
-        # Realized learning if there is an alliance during a cycle.
-        self.cycle_realized_learning = 0.0  
-        # The agent that this agent makes alliance.
-        self.alliance = None
-        # The next map_market position for this agent to be used when new network will be calculated. 
-        self.next_map_market = 0.0
-        # The next map_knowledge position for this agent to be used when new network will be calculated.
-        self.next_map_tech = 0.0
+        # The initial market and knowledge positions of the agent on the
+        # system map are determined randomly for each agent. The initial
+        # cumulative knowledge is determined randomly at the entry in the
+        # system and updated in each cycle depending on the alliance
+        # established.
+        map_market = random_stream.uniform(0, config.MAP_MARKET)
+        map_knowledge = random_stream.uniform(0, config.MAP_TECH)
+        cum_knowledge = random_stream.uniform(config.MIN_CUM_KNOW, \
+                                              config.MAX_CUM_KNOW)
+        if not Calculator.checked:
+            # the Calculator methods do not check the values of this agent
+            # at each call, so they are checked once here.
+            Calculator.validate_sigma(value[0])
+            Calculator.validate_sigma(value[1])
+            Calculator.validate_position(map_market, config.MAP_MARKET)
+            Calculator.validate_position(map_knowledge, config.MAP_TECH)
+        # The row of this agent in the population. The agent is active, 
+        # has no alliance, no realized learning and no next position.
+        self.index = population.add(self, entry_cycle, value[0], value[1], \
+                                    map_market, map_knowledge, cum_knowledge)
+
+    @staticmethod
+    def view(agent_id, population, index, config, random_stream):
+        '''
+        Returns the agent of the existing row index of the population, for
+        instance a row restored from a checkpoint, without drawing its
+        values.
+        '''
+        agent = Agent.__new__(Agent)
+        agent.agent_id = agent_id
+        agent.population = population
+        agent.index = index
+        agent.config = config
+        agent.random_stream = random_stream
+        return agent
+
+    @property
+    def sigma_m(self):
+        '''
+        The coefficient that determines learningability depending on 
+        market distance. 
+        '''
+        return float(self.population.columns['sigma_m'][self.index])
+
+    @sigma_m.setter
+    def sigma_m(self, value):
+        self.population.columns['sigma_m'][self.index] = value
+
+    @property
+    def sigma_k(self):
+        '''
+        The coefficient that determines learningability depending on 
+        knowledge distance.
+        '''
+        return float(self.population.columns['sigma_k'][self.index])
+
+    @sigma_k.setter
+    def sigma_k(self, value):
+        self.population.columns['sigma_k'][self.index] = value
+
+    @property
+    def entry_cycle(self):
+        '''
+        The cycle that this agent enters the network.
+        '''
+        return int(self.population.columns['entry_cycle'][self.index])
+
+    @entry_cycle.setter
+    def entry_cycle(self, value):
+        self.population.columns['entry_cycle'][self.index] = value
+
+    @property
+    def is_active(self):
+        '''
+        The value that indicates if this agent is still active in the 
+        network or left the network.
+        '''
+        return int(self.population.columns['is_active'][self.index])
+
+    @is_active.setter
+    def is_active(self, value):
+        self.population.columns['is_active'][self.index] = value
+
+    @property
+    def map_market(self):
+        '''
+        The market position of the agent on the system map.
+        '''
+        return float(self.population.columns['map_market'][self.index])
+
+    @map_market.setter
+    def map_market(self, value):
+        self.population.columns['map_market'][self.index] = value
+
+    @property
+    def map_knowledge(self):
+        '''
+        The knowledge position of the agent on the system map.
+        '''
+        return float(self.population.columns['map_knowledge'][self.index])
+
+    @map_knowledge.setter
+    def map_knowledge(self, value):
+        self.population.columns['map_knowledge'][self.index] = value
+
+    @property
+    def cum_knowledge(self):
+        '''
+        Current cumulative knowledge of the agent.
+        '''
+        return float(self.population.columns['cum_knowledge'][self.index])
+
+    @cum_knowledge.setter
+    def cum_knowledge(self, value):
+        self.population.columns['cum_knowledge'][self.index] = value
+
+    @property
+    def cycle_realized_learning(self):
+        '''
+        Realized learning if there is an alliance during a cycle.
+        '''
+        return float(self.population.columns['cycle_realized_learning'][self.index])
+
+    @cycle_realized_learning.setter
+    def cycle_realized_learning(self, value):
+        self.population.columns['cycle_realized_learning'][self.index] = value
+
+    @property
+    def alliance(self):
+        '''
+        The agent that this agent makes alliance, None if there is no 
+        alliance.
+        '''
+        partner = self.population.columns['partner'][self.index]
+        if partner < 0:
+            return None
+        return self.population.agents[partner]
+
+    @alliance.setter
+    def alliance(self, partner):
+        if partner is None:
+            self.population.columns['partner'][self.index] = -1
+        elif partner.population is not self.population:
+            raise InputError("Error : Agent cannot make alliance with an agent of another population.")
+        else:
+            self.population.columns['partner'][self.index] = partner.index
+
+    @property
+    def next_map_market(self):
+        '''
+        The next map_market position for this agent to be used when new 
+        network will be calculated. 
+        '''
+        return float(self.population.columns['next_map_market'][self.index])
+
+    @next_map_market.setter
+    def next_map_market(self, value):
+        self.population.columns['next_map_market'][self.index] = value
+
+    @property
+    def next_map_tech(self):
+        '''
+        The next map_knowledge position for this agent to be used when new 
+        network will be calculated.
+        '''
+        return float(self.population.columns['next_map_tech'][self.index])
+
+    @next_map_tech.setter
+    def next_map_tech(self, value):
+        self.population.columns['next_map_tech'][self.index] = value
         
     def reset(self):
         '''
@@ -77,7 +242,7 @@ class Agent(object):
         if (expected_learning < 0):
             raise InputError("Error : Agent.in_learning_margin method cannot have negative expected_learning \
                             as input.")
-        if ((self.cum_knowledge * LEARNING_MARGIN) < expected_learning):
+        if ((self.cum_knowledge * self.config.LEARNING_MARGIN) < expected_learning):
             return 1
         else:
             return 0 
@@ -104,13 +269,13 @@ class Agent(object):
         if (self.alliance != None): # if there is a link
             self.next_map_market = Calculator.calculate_next_position(self.map_market, \
                                                                          self.alliance.map_market, \
-                                                                         MAP_MARKET, \
-                                                                         ALPHA_MARKET, 
+                                                                         self.config.MAP_MARKET, \
+                                                                         self.config.ALPHA_MARKET, 
                                                                          self.sigma_m)
             self.next_map_tech = Calculator.calculate_next_position(self.map_knowledge, \
                                                                          self.alliance.map_knowledge, \
-                                                                         MAP_TECH, \
-                                                                         ALPHA_TECH, 
+                                                                         self.config.MAP_TECH, \
+                                                                         self.config.ALPHA_TECH, 
                                                                          self.sigma_k)
             
     def move_next_position(self):
@@ -119,6 +284,11 @@ class Agent(object):
         the next position is different then 0.0.
         '''
         if self.next_map_tech or self.next_map_market:
+            if not Calculator.checked:
+                Calculator.validate_position(self.next_map_market, \
+                                             self.config.MAP_MARKET)
+                Calculator.validate_position(self.next_map_tech, \
+                                             self.config.MAP_TECH)
             self.map_knowledge = self.next_map_tech
             self.map_market = self.next_map_market 
             self.next_map_tech = 0.0
@@ -128,8 +298,13 @@ class Agent(object):
         '''
         Randomly move the agent on the map, agent makes a breakthrough
         '''
-        self.map_knowledge = random.uniform(0, MAP_TECH)
-        self.map_market = random.uniform(0, MAP_MARKET)
+        map_knowledge = self.random_stream.uniform(0, self.config.MAP_TECH)
+        map_market = self.random_stream.uniform(0, self.config.MAP_MARKET)
+        if not Calculator.checked:
+            Calculator.validate_position(map_market, self.config.MAP_MARKET)
+            Calculator.validate_position(map_knowledge, self.config.MAP_TECH)
+        self.map_knowledge = map_knowledge
+        self.map_market = map_market
         
     def print_agent_data(self):
         """ 
@@ -1,36 +1,158 @@
-from numpy import *
 from network import Network
-from global_values import START_NUM_AGENT, NUMBER_OF_CYCLES, LAMBDA_POISSON
+from configuration import Configuration
+from random_stream import RandomStream
+from progress_reporter import ProgressReporter
+from simulation_log import SimulationLog
+from twisted.python.formmethod import InputError
 
 class Aging(object):
     '''
     classdocs
     '''
 
-    def __init__(self, run_num, cyclic_data):
+    def __init__(self, run_num, observer, config=None, random_stream=None, \
+                 plot_renderer=None, start=1, checkpoint=None, state=None):
         '''
-        Aging class manages network through cycles.
+        Aging class manages network through cycles. All random values of
+        the run are drawn from random_stream, the global random modules
+        if it is None. The maps are given to plot_renderer if it is not
+        None. The cycles are run by the constructor if start is 1;
+        otherwise they are run one by one with start_cycle and end_cycle,
+        as an Ensemble does, or with iterate_cycles.
+        The results of the cycles are given to observer, a CycleObserver
+        such as CyclicData.
+        The state of the run is written to checkpoint if it is not None.
+        If state is given, the run is resumed from this state returned by
+        get_state, and the observer must continue its files from the
+        offsets of the state.
         '''
-        # The network of this aging instance.
-        self.network = Network(START_NUM_AGENT, cyclic_data)
-        # The instance that stores the cycle values for a network for all cycles.
-        # The array that keeps the number of agents to be added to the network for each cycle. 
-        # The number of agents is determined randomly by poisson distribution.
-        self.agent_entry_array = random.poisson(LAMBDA_POISSON, NUMBER_OF_CYCLES + 1)
-        self.run_cycles(run_num, cyclic_data)
+        if config is None:
+            config = Configuration.get_default()
+        if random_stream is None:
+            random_stream = RandomStream.get_global()
+        # The configuration of this run.
+        self.config = config
+        # The number of this run and the observer that its cycle values
+        # are given to.
+        self.run_num = run_num
+        self.observer = observer
+        # The stream that the random values of the run are drawn from.
+        self.random_stream = random_stream
+        # The checkpoint that the state of the run is written to, None if
+        # it is not written.
+        self.checkpoint = checkpoint
+        # The last cycle that is run, and whether the run is finished.
+        self.cycle = 0
+        self.finished = 0
+        if state is None:
+            # The network of this aging instance.
+            self.network = Network(config.START_NUM_AGENT, observer, config, \
+                                   random_stream, plot_renderer)
+            # The instance that stores the cycle values for a network for all cycles.
+            # The array that keeps the number of agents to be added to the network for each cycle. 
+            # The number of agents is determined randomly by poisson distribution.
+            self.agent_entry_array = random_stream.poisson(config.LAMBDA_POISSON, \
+                                                         config.NUMBER_OF_CYCLES + 1)
+        else:
+            self.network = Network(config.START_NUM_AGENT, observer, config, \
+                                   random_stream, plot_renderer, state['network'])
+            self.set_state(state)
+        # The logger of the cycles and the reporter of the progress of
+        # the run.
+        self.logger = SimulationLog.get_logger()
+        self.progress = ProgressReporter(run_num, config.NUMBER_OF_CYCLES, \
+                                         config.PROGRESS_INTERVAL, self.cycle)
+        if start:
+            self.run_cycles(run_num, observer)
         
-    def run_cycles(self, run_num, cyclic_data):
-        for cycle in range(1, NUMBER_OF_CYCLES + 1):
-            cyclic_data.set_cycle(cycle)
-            self.network.plot_map(run_num, cycle - 1)
-            print "============== cycle =", cycle,", run =", str(run_num),"=================\r\r"
+    def run_cycles(self, run_num, observer):
+        for cycle in self.iterate_cycles():
+            pass
+
+    def iterate_cycles(self):
+        '''
+        Runs the remaining cycles of the run one by one and yields the
+        number of each cycle after it is run, so the caller can take the
+        blocks given to the observer in the cycle. The run is ended after
+        the last cycle.
+        '''
+        if self.finished:
+            return
+        self.progress.start()
+        for cycle in range(self.cycle + 1, self.config.NUMBER_OF_CYCLES + 1):
+            self.start_cycle(cycle)
             self.network.calculate_network()
-#            self.network.manage_exit()
-            number_entering_agents = self.agent_entry_array[cycle]
-            self.network.manage_breakthrough(number_entering_agents)
-#            print "POISSON = ", number_entering_agents
-#            self.network.manage_entry(number_entering_agents, cycle)
-            self.network.reset()
-        self.network.plot_map(run_num, cycle)
-            
-        
+            self.end_cycle(cycle)
+            if (self.checkpoint is not None) and self.checkpoint.is_due(cycle):
+                self.checkpoint.save(self.get_state())
+            yield cycle
+        self.end_run()
+        if self.checkpoint is not None:
+            self.checkpoint.save(self.get_state())
+
+    def get_state(self):
+        '''
+        Returns the state of the run after its last cycle: the network,
+        the agent entries, the random stream and the offsets of the cycle
+        data files, whose buffered data is written.
+        '''
+        return {'run_num': self.run_num, \
+                'cycle': self.cycle, \
+                'finished': self.finished, \
+                'network': self.network.get_state(), \
+                'agent_entry_array': self.agent_entry_array, \
+                'random_stream': self.random_stream.get_state(), \
+                'offsets': self.observer.get_offsets()}
+
+    def set_state(self, state):
+        '''
+        Restores the state returned by get_state, except the network and
+        the offsets, which are given to the constructors of Network and of
+        the cycle data.
+        '''
+        if state['run_num'] != self.run_num:
+            raise InputError("Error : Aging cannot be resumed from the state of another run.")
+        self.cycle = state['cycle']
+        self.finished = state['finished']
+        self.agent_entry_array = state['agent_entry_array']
+        self.random_stream.set_state(state['random_stream'])
+
+    def start_cycle(self, cycle):
+        '''
+        Starts the cycle and plots the map of the network at the end of
+        the previous cycle.
+        '''
+        self.cycle = cycle
+        self.observer.set_cycle(cycle)
+        self.network.phase_timer.set_cycle(cycle)
+        self.network.work_counter.set_cycle(cycle)
+        self.network.phase_timer.start('plot')
+        self.network.plot_map(self.run_num, cycle - 1)
+        self.network.phase_timer.stop()
+        self.logger.debug("============== cycle = %d , run = %d =================", \
+                          cycle, self.run_num)
+
+    def end_cycle(self, cycle):
+        '''
+        Ends the cycle after the network is calculated.
+        '''
+#        self.network.manage_exit()
+        number_entering_agents = self.agent_entry_array[cycle]
+        self.network.manage_breakthrough(number_entering_agents)
+#        print "POISSON = ", number_entering_agents
+#        self.network.manage_entry(number_entering_agents, cycle)
+        self.network.reset()
+        self.progress.update(cycle)
+
+    def end_run(self):
+        '''
+        Ends the run after its last cycle. Plots the map of the network at
+        the end of the last cycle and writes the phase times and the work
+        of the run.
+        '''
+        self.network.phase_timer.start('plot')
+        self.network.plot_map(self.run_num, self.config.NUMBER_OF_CYCLES)
+        self.network.phase_timer.stop()
+        self.observer.append_timing(self.network.phase_timer)
+        self.observer.append_work(self.network.work_counter)
+        self.finished = 1
@@ -0,0 +1,182 @@
+import heapq
+import numpy
+from twisted.python.formmethod import InputError
+from sparse_matrix import SparseMatrix
+from work_counter import WorkCounter
+
+
+class AllianceMatcher(object):
+    '''
+    AllianceMatcher decides the alliances of a network from the expected
+    learning values of the candidate pairs. The candidates are sorted once
+    in descending order of expected learning and tried one by one, skipping
+    the pairs whose agents have already made an alliance. This gives the
+    same alliances as repeatedly searching the evaluation matrix for its
+    max value and resetting the rows and columns of the allied agents.
+
+    Pairs with the same expected learning are tried in the order of
+    agent index and then partner index, which is the order the evaluation
+    matrix is scanned in.
+
+    match_with_bounds decides the same alliances when only an upper bound
+    of the expected learning of each pair is known in advance, for instance
+    the expected learning without LOSS. The exact values are calculated
+    only for the pairs that can still be the best candidate of the network.
+    '''
+
+    # The number of candidates whose exact values are calculated together
+    # by match_with_bounds at first. The blocks are doubled each time, so
+    # that the exact values are calculated in few calls when the bounds
+    # are far from the exact values.
+    BLOCK_SIZE = 64
+
+    def __init__(self, accept):
+        '''
+        Constructor. accept is called as accept(agent_index, partner_index,
+        agent_expected_learning, partner_expected_learning) for each pair
+        tried and returns whether the two agents make alliance.
+        '''
+        self.accept = accept
+        # The work of the matcher, which is taken by a WorkCounter.
+        self.counts = WorkCounter.create_counts(('matching_iterations', \
+                                                 'alliance_attempts', \
+                                                 'alliance_rejections', \
+                                                 'alliances'))
+
+    @staticmethod
+    def get_candidates(evaluation_matrix):
+        '''
+        Returns the pairs with positive expected learning in the given
+        square matrix as the arrays (agent_indices, partner_indices,
+        expected_learnings, partner_expected_learnings), where the partner
+        expected learning of a pair (i, j) is the value of (j, i). The
+        matrix can also be a SparseMatrix.
+        '''
+        if isinstance(evaluation_matrix, SparseMatrix):
+            positive = evaluation_matrix.values > 0
+            rows = evaluation_matrix.rows[positive]
+            cols = evaluation_matrix.cols[positive]
+            return rows, cols, evaluation_matrix.values[positive], \
+                   evaluation_matrix.get_values(cols, rows)
+        evaluation_matrix = numpy.asarray(evaluation_matrix, dtype=float)
+        if (evaluation_matrix.ndim != 2) or \
+           (evaluation_matrix.shape[0] != evaluation_matrix.shape[1]):
+            raise InputError("Error : AllianceMatcher.get_candidates method accepts only square matrix as parameter.")
+        rows, cols = numpy.nonzero(evaluation_matrix > 0)
+        return rows, cols, evaluation_matrix[rows, cols], \
+               evaluation_matrix[cols, rows]
+
+    @staticmethod
+    def get_order(rows, cols, values):
+        '''
+        Returns the order the candidates are tried in: descending expected
+        learning, then ascending agent index, then ascending partner index.
+        '''
+        return numpy.lexsort((cols, rows, -numpy.asarray(values)))
+
+    def match(self, rows, cols, values, reverse_values, num_agents):
+        '''
+        Tries the candidate pairs in order and returns the list of
+        (agent_index, partner_index) alliances in the order they are made.
+        When a pair is refused, its expected learning is taken as 0 if the
+        pair is later tried from the partner's side.
+        '''
+        matched = numpy.zeros(num_agents, dtype=bool)
+        refused = set()
+        alliances = []
+        order = self.get_order(rows, cols, values)
+        attempts = 0
+        for candidate in order:
+            agent_index = int(rows[candidate])
+            partner_index = int(cols[candidate])
+            if matched[agent_index] or matched[partner_index]:
+                continue
+            partner_learning = 0.0
+            if (partner_index, agent_index) not in refused:
+                partner_learning = float(reverse_values[candidate])
+            attempts += 1
+            if self.accept(agent_index, partner_index, \
+                           float(values[candidate]), partner_learning):
+                matched[agent_index] = True
+                matched[partner_index] = True
+                alliances.append((agent_index, partner_index))
+            else:
+                refused.add((agent_index, partner_index))
+        self.count(len(order), attempts, len(alliances))
+        return alliances
+
+    def match_with_bounds(self, rows, cols, bounds, get_values, num_agents):
+        '''
+        Tries the candidate pairs as match does when bounds[k] is an upper
+        bound of the expected learning of pair k, and returns the same
+        alliances as match with the exact values. get_values(rows, cols)
+        returns the exact expected learnings of the (rows[k], cols[k])
+        pairs as an array.
+        The candidates are taken in the order of their bounds, in blocks
+        which start from BLOCK_SIZE and are doubled, and the exact values
+        of their pairs and reverse pairs are calculated. A candidate is
+        tried when its exact value is before the bounds of the candidates
+        that are not taken yet, so no candidate that is not taken can be
+        better; otherwise more candidates are taken first. The candidates
+        whose agents have already made an alliance are not calculated.
+        '''
+        order = self.get_order(rows, cols, bounds)
+        matched = numpy.zeros(num_agents, dtype=bool)
+        refused = set()
+        alliances = []
+        # The taken candidates with positive exact values as
+        # (-expected_learning, agent_index, partner_index,
+        # partner_expected_learning), so the heap gives them in the order
+        # of match.
+        taken = []
+        position = 0
+        block_size = AllianceMatcher.BLOCK_SIZE
+        iterations = 0
+        attempts = 0
+        while True:
+            while (position < len(order)) and \
+                  ((not taken) or \
+                   (taken[0][:3] > (-float(bounds[order[position]]), \
+                                    int(rows[order[position]]), \
+                                    int(cols[order[position]])))):
+                block = order[position:position + block_size]
+                position += len(block)
+                iterations += 1
+                block_size *= 2
+                block = block[~(matched[rows[block]] | matched[cols[block]])]
+                if len(block) == 0:
+                    continue
+                values = get_values(numpy.concatenate((rows[block], cols[block])), \
+                                    numpy.concatenate((cols[block], rows[block])))
+                for candidate, value, reverse_value in \
+                        zip(block, values[:len(block)], values[len(block):]):
+                    if value > 0:
+                        heapq.heappush(taken, (-float(value), int(rows[candidate]), \
+                                               int(cols[candidate]), \
+                                               float(reverse_value)))
+            if not taken:
+                self.count(iterations, attempts, len(alliances))
+                return alliances
+            value, agent_index, partner_index, reverse_value = heapq.heappop(taken)
+            iterations += 1
+            if matched[agent_index] or matched[partner_index]:
+                continue
+            partner_learning = 0.0
+            if (partner_index, agent_index) not in refused:
+                partner_learning = reverse_value
+            attempts += 1
+            if self.accept(agent_index, partner_index, -value, partner_learning):
+                matched[agent_index] = True
+                matched[partner_index] = True
+                alliances.append((agent_index, partner_index))
+            else:
+                refused.add((agent_index, partner_index))
+
+    def count(self, iterations, attempts, alliances):
+        '''
+        Adds the work of a matching to the counts of the matcher.
+        '''
+        self.counts['matching_iterations'] += iterations
+        self.counts['alliance_attempts'] += attempts
+        self.counts['alliance_rejections'] += attempts - alliances
+        self.counts['alliances'] += alliances
@@ -0,0 +1,273 @@
+import os
+import copy
+import shutil
+import argparse
+import numpy
+from multiprocessing import Pool
+from twisted.python.formmethod import InputError
+from aging import Aging
+from cyclic_data import CyclicData
+from columnar_data import create_cyclic_data
+from calculator import Calculator
+from configuration import Configuration
+from random_stream import RandomStream
+from plot_renderer import PlotRenderer
+from plotter import Plotter
+from parallel_runner import ParallelRunner, start_worker
+from simulation_log import SimulationLog
+
+
+def run_branch(job, plot_renderer=None):
+    '''
+    Continues a run in a branch given by the job (run_num, branch,
+    trunk_dir, run_dir, config) from the state of the run at the branch
+    cycle in Branching.trunk_states. The files of the run up to the branch
+    cycle are copied from trunk_dir to run_dir and continued there. The
+    agent entries of the cycles after the branch cycle are drawn again
+    from the stream of the branch with the LAMBDA_POISSON of the branch.
+    Returns run_num.
+    '''
+    run_num, branch, trunk_dir, run_dir, config = job
+    state = Branching.trunk_states[run_num]
+    if os.path.exists(run_dir):
+        shutil.rmtree(run_dir)
+    shutil.copytree(trunk_dir, run_dir)
+    random_stream = RandomStream.for_branch(config.MASTER_SEED, run_num, branch)
+    entries = random_stream.poisson(config.LAMBDA_POISSON, \
+                                    config.NUMBER_OF_CYCLES - state['cycle'])
+    state = dict(state)
+    state['network'] = copy.deepcopy(state['network'])
+    state['agent_entry_array'] = numpy.concatenate( \
+        (state['agent_entry_array'][:state['cycle'] + 1], entries))
+    state['random_stream'] = random_stream.get_state()
+    cyclic_data = create_cyclic_data(run_dir, config, state['offsets'])
+    cyclic_data.set_run(run_num)
+    Aging(run_num, cyclic_data, config, random_stream, plot_renderer, 1, \
+          None, state)
+    cyclic_data.close_all()
+    return run_num
+
+
+def run_branch_in_worker(job):
+    '''
+    Continues a run in a branch with run_branch in a worker process,
+    which is forked with the trunk states of the parent process.
+    '''
+    config = job[4]
+    plot_renderer = start_worker(config, config.MASTER_SEED is not None)
+    run_branch(job, plot_renderer)
+    if plot_renderer is not None:
+        plot_renderer.close()
+    return job[0]
+
+
+class Branching(object):
+    '''
+    Branching makes the first cycles of each run once and continues the
+    run from the end of the branch cycle in several branches, each with
+    its own parameter overrides, for instance of LOSS, ALLIANCE_MARGIN or
+    LAMBDA_POISSON, and its own random stream. The common cycles of the
+    runs, the trunk, are not made again for each branch.
+
+    The branches of a run are made in a pool of worker processes that are
+    forked after the trunk of the run is made, so they start from the
+    state of the trunk in memory, which is shared with the parent process
+    until it is changed, instead of reading it from a file.
+
+    The maps of the trunk are plotted in the output directory, and each
+    branch writes its files and maps to its branch_X directory in the
+    same layout as simul_tm.py writes, with the data of the trunk in its
+    first cycles. The overrides of each branch are written to its
+    branch_file.txt.
+    '''
+
+    # The parameters that cannot be overridden in a branch, since the
+    # branch continues the runs and the files of the trunk.
+    FIXED = ('NUMBER_OF_RUNS', 'NUMBER_OF_WORKERS', 'START_NUM_AGENT', \
+             'OUTPUT_FORMAT', 'ENSEMBLE_SIZE', 'TIMING', 'CHECKPOINT_EVERY', \
+             'RESUME', 'OUTPUT_DIR')
+
+    # The states of the trunks at the branch cycle by run_num, which the
+    # forked worker processes take over.
+    trunk_states = {}
+
+    def __init__(self, branches, branch_cycle, number_of_runs=None, \
+                 number_of_workers=None, config=None):
+        '''
+        Constructor. branches is the list of the dictionaries of the
+        parameters overridden in each branch. The trunk and the parameters
+        that are not overridden are taken from config, the default
+        configuration if it is None. number_of_runs and number_of_workers
+        are taken from config if they are None.
+        '''
+        if config is None:
+            config = Configuration.get_default()
+        if number_of_runs is None:
+            number_of_runs = config.NUMBER_OF_RUNS
+        if number_of_workers is None:
+            number_of_workers = config.NUMBER_OF_WORKERS
+        if (number_of_runs < 1) or (number_of_workers < 1):
+            raise InputError("Error : Branching cannot have number_of_runs or number_of_workers less than 1.")
+        if (branch_cycle < 0) or (branch_cycle > config.NUMBER_OF_CYCLES):
+            raise InputError("Error : Branching cannot have branch_cycle less than 0 or greater than NUMBER_OF_CYCLES.")
+        if (config.ENSEMBLE_SIZE > 1) or config.CHECKPOINT_EVERY or config.RESUME:
+            raise InputError("Error : Branching cannot make ensembles or checkpoints.")
+        if not branches:
+            raise InputError("Error : Branching must have at least one branch.")
+        # The configuration of the trunk.
+        self.config = config
+        # The directory of the maps of the trunk and of the branch
+        # directories.
+        self.output_dir = config.OUTPUT_DIR
+        # The overrides and the configurations of the branches.
+        self.branches = [dict(branch) for branch in branches]
+        self.configs = []
+        for index, branch in enumerate(self.branches):
+            for name in branch:
+                if name in Branching.FIXED:
+                    raise InputError("Error : Branching cannot override " + name + " in a branch.")
+            branch_config = config.copy(**branch)
+            if branch_config.NUMBER_OF_CYCLES < branch_cycle:
+                raise InputError("Error : Branching cannot have a branch with NUMBER_OF_CYCLES less than branch_cycle.")
+            self.configs.append(branch_config.set( \
+                OUTPUT_DIR=os.path.join(self.get_branch_dir(index + 1), '')))
+        # The cycle after which the runs are continued in the branches.
+        self.branch_cycle = branch_cycle
+        self.number_of_runs = number_of_runs
+        self.number_of_workers = number_of_workers
+
+    def get_branch_dir(self, branch):
+        '''
+        Returns the directory of the files of the branch with number
+        branch, starting from 1.
+        '''
+        return os.path.join(self.output_dir, 'branch_' + str(branch))
+
+    def get_trunk_dir(self, run_num):
+        '''
+        Returns the directory where the trunk of the run with run_num
+        writes its files.
+        '''
+        return os.path.join(self.output_dir, 'trunk', 'run_' + str(run_num))
+
+    def run_trunk(self, run_num, plot_renderer=None):
+        '''
+        Makes the cycles of the run with run_num up to the branch cycle
+        and returns its state.
+        '''
+        cyclic_data = create_cyclic_data(self.get_trunk_dir(run_num), self.config)
+        cyclic_data.set_run(run_num)
+        aging = Aging(run_num, cyclic_data, self.config, \
+                      RandomStream.for_run(self.config.MASTER_SEED, run_num), \
+                      plot_renderer, 0)
+        for cycle in range(1, self.branch_cycle + 1):
+            aging.start_cycle(cycle)
+            aging.network.calculate_network()
+            aging.end_cycle(cycle)
+        state = aging.get_state()
+        cyclic_data.close_all()
+        return state
+
+    def get_jobs(self, run_num):
+        '''
+        Returns the jobs (run_num, branch, trunk_dir, run_dir, config) of
+        the branches of the run with run_num.
+        '''
+        jobs = []
+        for index, config in enumerate(self.configs):
+            runner = ParallelRunner(1, config.OUTPUT_DIR, config)
+            jobs.append((run_num, index + 1, self.get_trunk_dir(run_num), \
+                         runner.get_run_dir(run_num), config))
+        return jobs
+
+    def write_branch_file(self, branch):
+        '''
+        Writes the branch cycle and the overrides of the branch with number
+        branch to its branch_file.txt as NAME,VALUE rows.
+        '''
+        data_file = open(os.path.join(self.get_branch_dir(branch), \
+                                      'branch_file.txt'), 'w')
+        data_file.write('BRANCH_CYCLE,' + str(self.branch_cycle) + '\n')
+        overrides = self.branches[branch - 1]
+        for name in sorted(overrides):
+            data_file.write(name + ',' + str(overrides[name]) + '\n')
+        data_file.close()
+
+    def run(self):
+        '''
+        Makes the trunk and the branches of all runs and merges the files
+        of each branch.
+        '''
+        for branch in range(1, len(self.configs) + 1):
+            if not os.path.exists(self.get_branch_dir(branch)):
+                os.makedirs(self.get_branch_dir(branch))
+            CyclicData.delete_files(self.get_branch_dir(branch))
+        Plotter.set_style(self.config.PLOT_TEXT)
+        plot_renderer = None
+        if self.config.PLOT_QUEUE_SIZE > 0:
+            plot_renderer = PlotRenderer(self.config.PLOT_QUEUE_SIZE)
+        try:
+            for run_num in range(1, self.number_of_runs + 1):
+                Branching.trunk_states[run_num] = self.run_trunk(run_num, \
+                                                                 plot_renderer)
+                jobs = self.get_jobs(run_num)
+                if self.number_of_workers == 1:
+                    for job in jobs:
+                        run_branch(job, plot_renderer)
+                else:
+                    # the pool is forked after the trunk is made.
+                    pool = Pool(min(self.number_of_workers, len(jobs)))
+                    try:
+                        pool.map(run_branch_in_worker, jobs, 1)
+                    finally:
+                        pool.close()
+                        pool.join()
+                del Branching.trunk_states[run_num]
+                shutil.rmtree(self.get_trunk_dir(run_num))
+        finally:
+            if plot_renderer is not None:
+                plot_renderer.close()
+        shutil.rmtree(os.path.join(self.output_dir, 'trunk'))
+        for index, config in enumerate(self.configs):
+            ParallelRunner(1, config.OUTPUT_DIR, config).merge( \
+                range(1, self.number_of_runs + 1))
+            self.write_branch_file(index + 1)
+
+
+def parse_branch(config, assignments):
+    '''
+    Returns the overrides of a branch given as NAME=VALUE texts.
+    '''
+    overrides = {}
+    for assignment in assignments:
+        if '=' not in assignment:
+            raise InputError("Error : Branch overrides must be given as NAME=VALUE.")
+        name, text = assignment.split('=', 1)
+        overrides[name.strip()] = config.parse(name.strip(), text)
+    return overrides
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Runs the simulation up to ' + \
+                                     'a cycle once and continues it in ' + \
+                                     'several branches.')
+    parser.add_argument('--cycle', type=int, required=True, \
+                        help='cycle after which the runs are branched')
+    parser.add_argument('--branch', nargs='*', action='append', default=[], \
+                        metavar='NAME=VALUE', \
+                        help='overrides of a branch; repeated for each branch')
+    parser.add_argument('--runs', type=int, default=None, \
+                        help='number of runs')
+    parser.add_argument('--workers', type=int, default=None, \
+                        help='number of worker processes')
+    Configuration.add_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.branch:
+        parser.error('no branch is given')
+    config = Configuration.from_arguments(args)
+    Calculator.set_checked(config.CHECKED_CALCULATIONS)
+    SimulationLog.configure(config.LOG_LEVEL)
+    Branching([parse_branch(config, branch) for branch in args.branch], \
+              args.cycle, args.runs, args.workers, config).run()
@@ -1,12 +1,54 @@
 import math
 from twisted.python.formmethod import InputError
-from global_values import MIN_SIGMA, MAX_SIGMA, MAP_MARKET,MAP_TECH, BETA, MAX_TIP
+from configuration import Configuration
 
 class Calculator(object):
     '''
     Calculator class is a static class to make calculations of the network 
     alliances.
+
+    In checked mode every method checks its input and raises InputError for 
+    values out of range. In unchecked mode the distance, position and 
+    radius methods skip these checks since they are called for every pair 
+    of agents; the input is then checked once when an agent is created or 
+    moved, with the validate methods.
     '''
+
+    # 1 if the methods check their input at each call, 0 otherwise.
+    checked = 1
+
+    # The configuration that gives the parameters of the calculations.
+    config = Configuration.get_default()
+
+    @staticmethod
+    def set_config(config):
+        '''
+        Sets the configuration that gives the parameters of the calculations.
+        '''
+        Calculator.config = config
+
+    @staticmethod
+    def set_checked(checked):
+        '''
+        Sets the validation mode. 1 for checked mode, 0 for unchecked mode.
+        '''
+        Calculator.checked = checked
+
+    @staticmethod
+    def validate_sigma(sigma):
+        '''
+        Raises InputError if sigma is out of range (MIN_SIGMA, MAX_SIGMA).
+        '''
+        if (sigma <= Calculator.config.MIN_SIGMA) or (sigma >= Calculator.config.MAX_SIGMA):
+            raise InputError("Error: Calculator.validate_sigma method cannot have sigma out of range (MIN_SIGMA, MAX_SIGMA).")
+
+    @staticmethod
+    def validate_position(value, map_range):
+        '''
+        Raises InputError if value is out of range [0, map_range].
+        '''
+        if (value < 0) or (value > map_range):
+            raise InputError("Error: Calculator.validate_position method cannot have value out of range [0,map_range].")
     
     @staticmethod
     def distance(distance, sigma):
@@ -21,11 +63,12 @@ class Calculator(object):
         The result of the parabola distribution function for given distance and
         sigma values.
         """
-        if (distance < 0):
-            raise(InputError("Error: Calculator.parabola_distance method cannot have negative distance."))
-        if (sigma <= MIN_SIGMA) or (sigma >= MAX_SIGMA):
-            raise(InputError("Error: Calculator.parabolo_distance method cannot have sigma out of range (MIN_SIGMA, MAX_SIGMA)."))
-        return  ( BETA * (distance - sigma) - (distance - sigma)**2 )
+        if Calculator.checked:
+            if (distance < 0):
+                raise(InputError("Error: Calculator.parabola_distance method cannot have negative distance."))
+            if (sigma <= Calculator.config.MIN_SIGMA) or (sigma >= Calculator.config.MAX_SIGMA):
+                raise(InputError("Error: Calculator.parabolo_distance method cannot have sigma out of range (MIN_SIGMA, MAX_SIGMA)."))
+        return  ( Calculator.config.BETA * (distance - sigma) - (distance - sigma)**2 )
 
     @staticmethod
     def normal_distance(distance, mu):
@@ -35,7 +78,7 @@ class Calculator(object):
         """
         if (distance < 0):
             raise(InputError("Error: Calculator.normal_distance method cannot have negative distance."))
-        if (mu <= MIN_SIGMA) or (mu >= MAX_SIGMA):
+        if (mu <= Calculator.config.MIN_SIGMA) or (mu >= Calculator.config.MAX_SIGMA):
             raise(InputError("Error: Calculator.normal_distance method cannot have mu out of range \
                 (MIN_SIGMA, MAX_SIGMA)."))
         std_dev = 1.0
@@ -50,17 +93,19 @@ class Calculator(object):
         calculate_expected_learning is calculated by summing market distance
         and knowledge distance.
         '''
-        if (sigma_m <= MIN_SIGMA) or (sigma_k <= MIN_SIGMA) or (sigma_m >= MAX_SIGMA) or (sigma_k >= MAX_SIGMA):
-            raise InputError("Error: Calculator.calculate_expected_learning method cannot have sigma_m or \
-                            sigma_k value out of range (MIN_SIGMA,MAX_SIGMA).")
-        if (self_market < 0) or (self_market > MAP_MARKET) or (partner_market < 0) or (partner_market > MAP_MARKET) or \
-            (self_knowledge < 0) or (self_knowledge > MAP_TECH) or (partner_knowledge < 0) or (partner_knowledge > MAP_TECH):
-            raise InputError("Error: Calculator.calculate_expected_learning method cannot have self_market or \
-                            partner_market out of range [0,MAP_MARKET] and self_knowledge or partner_knowledge \
-                            out of range [0,MAP_TECH].")
+        config = Calculator.config
+        if Calculator.checked:
+            if (sigma_m <= config.MIN_SIGMA) or (sigma_k <= config.MIN_SIGMA) or (sigma_m >= config.MAX_SIGMA) or (sigma_k >= config.MAX_SIGMA):
+                raise InputError("Error: Calculator.calculate_expected_learning method cannot have sigma_m or \
+                                sigma_k value out of range (MIN_SIGMA,MAX_SIGMA).")
+            if (self_market < 0) or (self_market > config.MAP_MARKET) or (partner_market < 0) or (partner_market > config.MAP_MARKET) or \
+                (self_knowledge < 0) or (self_knowledge > config.MAP_TECH) or (partner_knowledge < 0) or (partner_knowledge > config.MAP_TECH):
+                raise InputError("Error: Calculator.calculate_expected_learning method cannot have self_market or \
+                                partner_market out of range [0,MAP_MARKET] and self_knowledge or partner_knowledge \
+                                out of range [0,MAP_TECH].")
         
-        market_distance = Calculator.get_torus_distance(self_market, partner_market, MAP_MARKET)
-        knowledge_distance = Calculator.get_torus_distance(self_knowledge,partner_knowledge, MAP_TECH)
+        market_distance = Calculator.get_torus_distance(self_market, partner_market, config.MAP_MARKET)
+        knowledge_distance = Calculator.get_torus_distance(self_knowledge,partner_knowledge, config.MAP_TECH)
 
         return Calculator.distance(market_distance, sigma_m) \
              + Calculator.distance(knowledge_distance, sigma_k)
@@ -73,13 +118,14 @@ class Calculator(object):
         torus.
         Added the sigma value. alpha should be multiplied by r(d) / r(sigma)
         '''
-        if (self_value < 0) or (self_value > map_range) or (partner_value < 0) or (partner_value > map_range):
-            raise InputError("Error: Calculator.calculate_next_position method cannot have self_value \
-                            or partner_value out of range [0,map_range].")
-        if (map_range <= 0):
-            raise InputError("Error: Calculator.calculate_next_position method cannot have non-positive map_range.")
-        if (alpha <= 0):
-            raise InputError("Error: Calculator.calculate_next_position method cannot have non-positive alpha.")
+        if Calculator.checked:
+            if (self_value < 0) or (self_value > map_range) or (partner_value < 0) or (partner_value > map_range):
+                raise InputError("Error: Calculator.calculate_next_position method cannot have self_value \
+                                or partner_value out of range [0,map_range].")
+            if (map_range <= 0):
+                raise InputError("Error: Calculator.calculate_next_position method cannot have non-positive map_range.")
+            if (alpha <= 0):
+                raise InputError("Error: Calculator.calculate_next_position method cannot have non-positive alpha.")
         next_value = 0.0
         distance = Calculator.get_torus_distance(self_value, partner_value, map_range) 
         
@@ -87,7 +133,7 @@ class Calculator(object):
         difference = self_value - partner_value
         
         # this inverted u value is r(d) / r(sigma)
-        dividend_u = MAX_TIP
+        dividend_u = Calculator.config.MAX_TIP
         inverted_u = 0.0
         
         if dividend_u != 0:
@@ -110,11 +156,12 @@ class Calculator(object):
         Calculates the distance between two points on a torus in a given
         map range.
         '''
-        if (map_range <= 0):
-            raise InputError("Error: Calculator.get_torus_distance method cannot have non-positive map_range.")
-        if (self_value < 0) or (self_value > map_range) or (partner_value < 0) or (partner_value > map_range):
-            raise InputError("Error: Calculator.get_torus_distance method cannot have self_value \
-                            or partner_value out of range [0,map_range].")
+        if Calculator.checked:
+            if (map_range <= 0):
+                raise InputError("Error: Calculator.get_torus_distance method cannot have non-positive map_range.")
+            if (self_value < 0) or (self_value > map_range) or (partner_value < 0) or (partner_value > map_range):
+                raise InputError("Error: Calculator.get_torus_distance method cannot have self_value \
+                                or partner_value out of range [0,map_range].")
         distance = abs(self_value - partner_value)
         if distance > (map_range / 2.0):
             distance = map_range - distance
@@ -126,15 +173,16 @@ class Calculator(object):
         Returns 1 if the distance partner is within radius distance on torus from self;
         0 otherwise.
         '''
-        if (self_x < 0) or (self_x > x_range) or (partner_x < 0) or (partner_x > x_range):
-            raise InputError("Error : Calculator.is_in_radius method cannot have self_x or \
-                        partner_x out of range [0, x_range]." + str(self_x) + " " + str(partner_x))
-        if (self_y < 0) or (self_y > y_range) or (partner_y < 0) or (partner_y > y_range):
-            raise InputError("Error : Calculator.is_in_radius method cannot have self_y or \
-                        partner_y out of range [0, y_range]." + str(self_y) + " " + str(partner_y))
-        if (radius < 0):
-            raise InputError("Error : Calculator.is_in_radius method cannot have radius \
-                             value less than 0.")
+        if Calculator.checked:
+            if (self_x < 0) or (self_x > x_range) or (partner_x < 0) or (partner_x > x_range):
+                raise InputError("Error : Calculator.is_in_radius method cannot have self_x or \
+                            partner_x out of range [0, x_range]." + str(self_x) + " " + str(partner_x))
+            if (self_y < 0) or (self_y > y_range) or (partner_y < 0) or (partner_y > y_range):
+                raise InputError("Error : Calculator.is_in_radius method cannot have self_y or \
+                            partner_y out of range [0, y_range]." + str(self_y) + " " + str(partner_y))
+            if (radius < 0):
+                raise InputError("Error : Calculator.is_in_radius method cannot have radius \
+                                 value less than 0.")
         distance = (Calculator.get_torus_distance(self_x, partner_x, x_range)) ** 2 + \
                    (Calculator.get_torus_distance(self_y, partner_y, y_range)) ** 2
         distance = math.sqrt(distance)
@@ -0,0 +1,91 @@
+import numpy
+from twisted.python.formmethod import InputError
+
+
+class CandidateGenerator(object):
+    '''
+    CandidateGenerator enumerates the pairs of agents whose expected
+    learning can be positive, without going through all pairs of the
+    network. The parabola distance function of an axis is positive only
+    when sigma < distance < sigma + BETA, so agent j can be a candidate
+    of agent i only if j is in that band around i on the market axis or on
+    the technology axis.
+
+    The positions on each axis are sorted once, and the agents in the band
+    of an agent are found by binary search on the sorted positions, which
+    are repeated once shifted by the range of the map so that the band can
+    wrap around the edge of the torus. The bands are widened by a small
+    tolerance, so the pairs found are a superset of the pairs with
+    positive expected learning whose values are then calculated exactly.
+    '''
+
+    # The tolerance the bands are widened by, relative to the map range.
+    TOLERANCE = 1e-9
+
+    def __init__(self, map_market, map_tech, beta):
+        '''
+        Constructor
+        '''
+        if (map_market <= 0) or (map_tech <= 0):
+            raise InputError("Error : CandidateGenerator cannot have non-positive map_market or map_tech.")
+        # The ranges of the market and technology axes of the map.
+        self.map_market = map_market
+        self.map_tech = map_tech
+        # The parabola distance function coefficient, the width of the
+        # band in which the learning on an axis is positive.
+        self.beta = beta
+
+    @staticmethod
+    def get_band_pairs(values, low, high, map_range):
+        '''
+        Returns the pairs (rows, cols) of the agents where the torus
+        distance of agent cols[k] from agent rows[k] on the axis of the
+        values is in [low[rows[k]], high[rows[k]]]. A pair can be returned
+        twice.
+        '''
+        values = numpy.asarray(values, dtype=float)
+        size = len(values)
+        order = numpy.argsort(values, kind='mergesort')
+        # the sorted positions and the same positions one range further,
+        # so that an interval crossing the edge of the map is consecutive.
+        extended = numpy.concatenate((values[order], values[order] + map_range))
+        high = numpy.minimum(high, map_range / 2.0)
+        length = high - low
+        found_rows = [numpy.zeros(0, dtype=numpy.intp)]
+        found_cols = [numpy.zeros(0, dtype=numpy.intp)]
+        # the partners of an agent are in the interval after it and in the
+        # interval before it on the axis.
+        for start in (values + low, values - high):
+            start = numpy.mod(start, map_range)
+            first = numpy.searchsorted(extended, start, 'left')
+            last = numpy.searchsorted(extended, start + length, 'right')
+            count = numpy.maximum(last - first, 0)
+            rows = numpy.repeat(numpy.arange(size), count)
+            offset = numpy.cumsum(count) - count
+            position = numpy.arange(len(rows)) + numpy.repeat(first - offset, count)
+            found_rows.append(rows)
+            found_cols.append(order[position % size])
+        return numpy.concatenate(found_rows), numpy.concatenate(found_cols)
+
+    def get_pairs(self, map_market, map_knowledge, sigma_m, sigma_k, is_active):
+        '''
+        Returns the candidate pairs of different active agents as the
+        arrays (rows, cols), sorted by row and then by column.
+        '''
+        map_market = numpy.asarray(map_market, dtype=float)
+        map_knowledge = numpy.asarray(map_knowledge, dtype=float)
+        is_active = numpy.asarray(is_active, dtype=bool)
+        size = len(map_market)
+        keys = [numpy.zeros(0, dtype=numpy.intp)]
+        for values, sigma, map_range in ((map_market, sigma_m, self.map_market), \
+                                         (map_knowledge, sigma_k, self.map_tech)):
+            tolerance = CandidateGenerator.TOLERANCE * map_range
+            sigma = numpy.asarray(sigma, dtype=float)
+            rows, cols = self.get_band_pairs(values, sigma - tolerance, \
+                                             sigma + self.beta + tolerance, \
+                                             map_range)
+            keys.append(rows * size + cols)
+        keys = numpy.unique(numpy.concatenate(keys))
+        rows, cols = numpy.divmod(keys, max(size, 1))
+        kept = (rows != cols) & is_active[rows] & is_active[cols]
+        return rows[kept], cols[kept]
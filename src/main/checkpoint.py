@@ -0,0 +1,82 @@
+import os
+import cPickle
+from twisted.python.formmethod import InputError
+
+
+class Checkpoint(object):
+    '''
+    Checkpoint writes the state of a run every CHECKPOINT_EVERY cycles to
+    one binary file in the output directory of its cycle data, so a run
+    that is stopped can be resumed from its last checkpoint. The state is
+    written to a temporary file that then replaces the checkpoint file,
+    so the checkpoint file is always complete.
+
+    The state of a run is given by Aging.get_state. It holds the offsets
+    of the cycle data files at the checkpoint, and the files are cut back
+    to these offsets when the run is resumed, so the rows written after
+    the checkpoint are not written twice.
+    '''
+
+    # The name of the checkpoint file.
+    FILE_NAME = 'checkpoint.bin'
+
+    def __init__(self, output_dir, every):
+        '''
+        Constructor. The state is written every cycles; never if every is
+        0, but the final state of a run is still written.
+        '''
+        if (every < 0):
+            raise InputError("Error : Checkpoint cannot have every less than 0.")
+        # The path of the checkpoint file.
+        self.path = os.path.join(output_dir, Checkpoint.FILE_NAME)
+        # The number of cycles between two checkpoints.
+        self.every = every
+
+    @staticmethod
+    def for_config(output_dir, config):
+        '''
+        Returns the checkpoint of the runs that write their cycle data to
+        output_dir with config, None if neither CHECKPOINT_EVERY nor
+        RESUME is set.
+        '''
+        if not (config.CHECKPOINT_EVERY or config.RESUME):
+            return None
+        return Checkpoint(output_dir, config.CHECKPOINT_EVERY)
+
+    def is_due(self, cycle):
+        '''
+        Returns whether the state at the end of cycle is written.
+        '''
+        return (self.every > 0) and (cycle % self.every == 0)
+
+    def save(self, state):
+        '''
+        Writes the state to the checkpoint file, replacing the previous
+        state at once.
+        '''
+        temporary = self.path + '.tmp'
+        data_file = open(temporary, 'wb')
+        cPickle.dump(state, data_file, cPickle.HIGHEST_PROTOCOL)
+        data_file.flush()
+        os.fsync(data_file.fileno())
+        data_file.close()
+        os.rename(temporary, self.path)
+
+    def load(self):
+        '''
+        Returns the state in the checkpoint file, None if there is no
+        checkpoint.
+        '''
+        if not os.path.exists(self.path):
+            return None
+        data_file = open(self.path, 'rb')
+        state = cPickle.load(data_file)
+        data_file.close()
+        return state
+
+    def delete(self):
+        '''
+        Deletes the checkpoint file.
+        '''
+        if os.path.exists(self.path):
+            os.unlink(self.path)
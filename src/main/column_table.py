@@ -0,0 +1,249 @@
+import os
+import shutil
+import numpy
+from twisted.python.formmethod import InputError
+
+
+class ColumnTable(object):
+    '''
+    ColumnTable writes the rows of one data table to a binary columnar
+    format. The rows are kept in a buffer and every CHUNK_SIZE rows the
+    buffer is converted to typed arrays that are appended to one file for
+    each column, so the values of a column are stored one after another
+    and can be read back with numpy.fromfile.
+
+    The files of the table name in the output directory are
+    name.schema : the csv header line, then a name,dtype,kind line for
+                  each column.
+    name.column.bin : the values of each column.
+    name.column.int : for the number columns, the rows whose value was
+                      given as an int, so that it is written back as an
+                      int to csv.
+    The kind of a column is int, float or number. A number column is a
+    float column that can also be given int values.
+    '''
+
+    # The number of rows converted and written at once.
+    CHUNK_SIZE = 4096
+
+    # The numpy type of the values of each kind of column.
+    DTYPES = {'int': '<i4', 'float': '<f8', 'number': '<f8'}
+
+    def __init__(self, output_dir, name, header, columns, offsets=None):
+        '''
+        Constructor. columns is the list of (column name, kind) pairs.
+        The files of the table in output_dir are created, or cut back to
+        the offsets returned by get_offsets and continued if offsets are
+        given.
+        '''
+        for column, kind in columns:
+            if kind not in ColumnTable.DTYPES:
+                raise InputError("Error : ColumnTable cannot have column kind " + kind + ".")
+        # The directory and the name of the table files.
+        self.output_dir = output_dir
+        self.name = name
+        # The names and kinds of the columns.
+        self.columns = columns
+        # The type of a row of the buffer when it is converted to arrays.
+        self.dtype = numpy.dtype([(column, ColumnTable.DTYPES[kind]) \
+                                  for column, kind in columns])
+        # The rows that are not written yet.
+        self.rows = []
+        # The number of rows written to the files.
+        self.number_of_rows = 0
+        # The offsets that the files are continued from, None if they are
+        # created.
+        self.offsets = offsets
+        if offsets is not None:
+            self.number_of_rows = offsets['rows']
+        schema = open(self.get_path('schema'), 'w')
+        schema.write(header + '\n')
+        for column, kind in columns:
+            schema.write(column + ',' + ColumnTable.DTYPES[kind] + ',' + \
+                         kind + '\n')
+        schema.close()
+        # The files of the columns, and of the int rows of number columns.
+        self.files = []
+        self.int_files = []
+        for column, kind in columns:
+            self.files.append(self.open_file(column + '.bin'))
+            if kind == 'number':
+                self.int_files.append(self.open_file(column + '.int'))
+            else:
+                self.int_files.append(None)
+
+    def open_file(self, suffix):
+        '''
+        Opens the table file with the given suffix, which is cut back to
+        its offset and continued if the table has offsets.
+        '''
+        if self.offsets is None:
+            return open(self.get_path(suffix), 'wb')
+        data_file = open(self.get_path(suffix), 'ab')
+        data_file.truncate(self.offsets[suffix])
+        return data_file
+
+    def get_offsets(self):
+        '''
+        Writes the rows in the buffer and returns the number of rows and
+        the size of each file of the table, from which a ColumnTable
+        continues the files.
+        '''
+        self.flush()
+        offsets = {'rows': self.number_of_rows}
+        for (column, kind), data_file, int_file in \
+                zip(self.columns, self.files, self.int_files):
+            for suffix, output in ((column + '.bin', data_file), \
+                                   (column + '.int', int_file)):
+                if output is not None:
+                    output.flush()
+                    offsets[suffix] = os.fstat(output.fileno()).st_size
+        return offsets
+
+    def get_path(self, suffix):
+        '''
+        Returns the path of the table file with the given suffix.
+        '''
+        return ColumnTable.get_file_path(self.output_dir, self.name, suffix)
+
+    @staticmethod
+    def get_file_path(output_dir, name, suffix):
+        '''
+        Returns the path of the file with the suffix of table name in
+        output_dir.
+        '''
+        return os.path.join(output_dir, name + '.' + suffix)
+
+    def append(self, row):
+        '''
+        Appends a row given as a tuple of the column values.
+        '''
+        self.rows.append(row)
+        if len(self.rows) == ColumnTable.CHUNK_SIZE:
+            self.flush()
+
+    def append_block(self, columns):
+        '''
+        Appends the rows given as the values of each column, which are
+        arrays of the same length or single values that are the same for
+        all rows. The rows in the buffer are written first and the block
+        is written to the column files directly.
+        '''
+        if len(columns) != len(self.columns):
+            raise InputError("Error : ColumnTable.append_block method cannot have a different number of columns.")
+        self.flush()
+        size = max(numpy.size(values) for values in columns)
+        for k, values in enumerate(columns):
+            block = numpy.empty(size, dtype=self.dtype[k])
+            block[...] = values
+            block.tofile(self.files[k])
+            if (self.int_files[k] is not None) and \
+               numpy.issubdtype(numpy.asarray(values).dtype, numpy.integer):
+                numpy.arange(self.number_of_rows, self.number_of_rows + size, \
+                             dtype='<i8').tofile(self.int_files[k])
+        self.number_of_rows += size
+
+    def flush(self):
+        '''
+        Writes the rows in the buffer to the column files.
+        '''
+        if not self.rows:
+            return
+        chunk = numpy.array(self.rows, dtype=self.dtype)
+        for k in range(len(self.columns)):
+            numpy.ascontiguousarray(chunk[self.columns[k][0]]).tofile(self.files[k])
+            if self.int_files[k] is not None:
+                int_rows = [self.number_of_rows + i \
+                            for i, row in enumerate(self.rows) \
+                            if isinstance(row[k], (int, long))]
+                numpy.array(int_rows, dtype='<i8').tofile(self.int_files[k])
+        self.number_of_rows += len(self.rows)
+        self.rows = []
+
+    def close(self):
+        '''
+        Writes the rows in the buffer and closes the files.
+        '''
+        self.flush()
+        for data_file in self.files + self.int_files:
+            if data_file is not None:
+                data_file.close()
+
+    @staticmethod
+    def read_schema(output_dir, name):
+        '''
+        Returns the csv header and the (column name, dtype, kind) triples
+        of table name in output_dir.
+        '''
+        schema = open(ColumnTable.get_file_path(output_dir, name, 'schema'))
+        header = schema.readline().rstrip('\n')
+        columns = [tuple(line.rstrip('\n').split(',')) for line in schema]
+        schema.close()
+        return header, columns
+
+    @staticmethod
+    def read(output_dir, name):
+        '''
+        Returns the columns of table name in output_dir as a dictionary of
+        arrays.
+        '''
+        header, columns = ColumnTable.read_schema(output_dir, name)
+        return dict((column, numpy.fromfile( \
+                        ColumnTable.get_file_path(output_dir, name, column + '.bin'), \
+                        dtype=dtype)) for column, dtype, kind in columns)
+
+    @staticmethod
+    def write_csv(output_dir, name, csv_path):
+        '''
+        Writes table name in output_dir to csv_path in the layout of
+        CyclicData. The values are written with str as CyclicData does.
+        '''
+        header, columns = ColumnTable.read_schema(output_dir, name)
+        arrays = ColumnTable.read(output_dir, name)
+        values = []
+        for column, dtype, kind in columns:
+            if kind == 'int':
+                values.append([str(value) for value in arrays[column].tolist()])
+            else:
+                texts = [str(value) for value in arrays[column].tolist()]
+                if kind == 'number':
+                    int_rows = numpy.fromfile(ColumnTable.get_file_path( \
+                                    output_dir, name, column + '.int'), dtype='<i8')
+                    for i in int_rows.tolist():
+                        texts[i] = str(int(arrays[column][i]))
+                values.append(texts)
+        csv_file = open(csv_path, 'w')
+        csv_file.write(header + '\n')
+        for row in zip(*values):
+            csv_file.write(','.join(row) + '\n')
+        csv_file.close()
+
+    @staticmethod
+    def merge(input_dirs, name, output_dir):
+        '''
+        Merges the table name of the input directories in the given order
+        into the table in output_dir.
+        '''
+        header, columns = ColumnTable.read_schema(input_dirs[0], name)
+        shutil.copy(ColumnTable.get_file_path(input_dirs[0], name, 'schema'), \
+                    output_dir)
+        for column, dtype, kind in columns:
+            suffix = column + '.bin'
+            output = open(ColumnTable.get_file_path(output_dir, name, suffix), 'wb')
+            int_output = None
+            if kind == 'number':
+                int_output = open(ColumnTable.get_file_path(output_dir, name, \
+                                                            column + '.int'), 'wb')
+            offset = 0
+            for input_dir in input_dirs:
+                values = numpy.fromfile(ColumnTable.get_file_path(input_dir, name, suffix), \
+                                        dtype=dtype)
+                values.tofile(output)
+                if int_output is not None:
+                    int_rows = numpy.fromfile(ColumnTable.get_file_path( \
+                                    input_dir, name, column + '.int'), dtype='<i8')
+                    (int_rows + offset).tofile(int_output)
+                offset += len(values)
+            output.close()
+            if int_output is not None:
+                int_output.close()
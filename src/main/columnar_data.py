@@ -0,0 +1,220 @@
+import os
+import sys
+from cyclic_data import CyclicData
+from column_table import ColumnTable
+from configuration import Configuration
+
+
+def create_cyclic_data(output_dir=None, config=None, offsets=None):
+    '''
+    Returns the CyclicData that writes to output_dir in the OUTPUT_FORMAT
+    of config, csv or columnar, and continues the files from offsets if
+    they are given.
+    '''
+    if config is None:
+        config = Configuration.get_default()
+    if config.OUTPUT_FORMAT == 'columnar':
+        return ColumnarData(output_dir, config, offsets)
+    return CyclicData(output_dir, config, offsets)
+
+
+class ColumnarData(CyclicData):
+    '''
+    ColumnarData writes the same data as CyclicData to binary columnar
+    tables instead of csv files. The rows are buffered and written in
+    chunks of typed arrays by ColumnTable, so no string is built while the
+    simulation runs. The tables can be read with ColumnTable.read, or
+    converted to the csv files of CyclicData with to_csv, for instance for
+    the R script:
+    python columnar_data.py OUTPUT_DIR
+    The few rows of the timing files are written to csv files as by
+    CyclicData.
+    '''
+
+    # The csv header and the (column, kind) pairs of each table.
+    TABLES = {
+        'data_alliance': ("run,cycle,agent_id1,agent_id2", \
+                          [('run', 'int'), ('cycle', 'int'), \
+                           ('agent_id1', 'int'), ('agent_id2', 'int')]),
+        'data_agent': ("run,cycle,agent_id,entry_cycle,sigma_m,sigma_k", \
+                       [('run', 'int'), ('cycle', 'int'), ('agent_id', 'int'), \
+                        ('entry_cycle', 'int'), ('sigma_m', 'float'), \
+                        ('sigma_k', 'float')]),
+        'data_agent_cycle': ("run,cycle, agent_id, map_market, map_knowledge, cum_knowledge, cycle_realized_learning", \
+                             [('run', 'int'), ('cycle', 'int'), \
+                              ('agent_id', 'int'), ('map_market', 'float'), \
+                              ('map_knowledge', 'float'), \
+                              ('cum_knowledge', 'float'), \
+                              ('cycle_realized_learning', 'float')]),
+        'data_agent_exit': ("run,cycle,agent_id", \
+                            [('run', 'int'), ('cycle', 'int'), \
+                             ('agent_id', 'int')]),
+        'data_network': ("run,cycle,number_of_agents,network_total_cum_knowledge,network_total_realized_learning,average_agent_cum_knowledge,average_agent_realized_learning,min_agent_cum_knowledge,max_agent_cum_knowledge", \
+                         [('run', 'int'), ('cycle', 'int'), \
+                          ('number_of_agents', 'int'), \
+                          ('network_total_cum_knowledge', 'number'), \
+                          ('network_total_realized_learning', 'number'), \
+                          ('average_agent_cum_knowledge', 'number'), \
+                          ('average_agent_realized_learning', 'number'), \
+                          ('min_agent_cum_knowledge', 'number'), \
+                          ('max_agent_cum_knowledge', 'number')]),
+        'data_breakthrough': ("run,cycle,agent_id,map_market,map_knowledge,new_map_market,new_map_knowledge", \
+                              [('run', 'int'), ('cycle', 'int'), \
+                               ('agent_id', 'int'), ('map_market', 'float'), \
+                               ('map_knowledge', 'float'), \
+                               ('new_map_market', 'float'), \
+                               ('new_map_knowledge', 'float')])}
+
+    def open_table(self, file_name):
+        '''
+        Creates the table with the specified file_name in the output
+        directory.
+        '''
+        header, columns = ColumnarData.TABLES[file_name]
+        offsets = None
+        if self.offsets is not None:
+            offsets = self.offsets.get(file_name)
+        table = ColumnTable(self.output_dir, file_name, header, columns, offsets)
+        self.files[file_name] = table
+        return table
+
+    def get_offsets(self):
+        '''
+        Writes the data of the open files and tables and returns their
+        offsets, from which a ColumnarData continues them.
+        '''
+        offsets = CyclicData.get_offsets(self)
+        for file_name, table in self.files.items():
+            if isinstance(table, ColumnTable):
+                offsets[file_name] = table.get_offsets()
+        return offsets
+
+    def create_alliance_file(self):
+        '''
+        Creates the table which stores alliance data.
+        '''
+        return self.open_table('data_alliance')
+
+    def append_alliance(self, agent1, agent2):
+        '''
+        Appends the alliance for agent1-agent2 and agent2-agent1.
+        '''
+        self.alliance_file.append((self.run_number, self.cycle_number, \
+                                   agent1, agent2))
+        self.alliance_file.append((self.run_number, self.cycle_number, \
+                                   agent2, agent1))
+
+    def create_agent_exit_file(self):
+        '''
+        Creates the table which stores agent exit cycle data.
+        '''
+        return self.open_table('data_agent_exit')
+
+    def append_agent_exit(self, agent_id):
+        '''
+        Appends the agent exit cycle.
+        '''
+        self.agent_exit_file.append((self.run_number, self.cycle_number, \
+                                     agent_id))
+
+    def create_agent_file(self):
+        '''
+        Creates the table which stores agent data.
+        '''
+        return self.open_table('data_agent')
+
+    def append_agent(self, agent_id, entry_cycle, sigma_m, sigma_k):
+        '''
+        Appends agent data.
+        '''
+        self.agent_file.append((self.run_number, self.cycle_number, \
+                                agent_id, entry_cycle, sigma_m, sigma_k))
+
+    def create_agent_cycle_file(self):
+        '''
+        Creates the table which stores agent data per cycle.
+        '''
+        return self.open_table('data_agent_cycle')
+
+    def append_agent_cycle(self, agent_id, map_market, map_knowledge, capital, realized_learning):
+        '''
+        Appends agent data per cycle.
+        '''
+        self.agent_cycle_file.append((self.run_number, self.cycle_number, \
+                                      agent_id, map_market, map_knowledge, \
+                                      capital, realized_learning))
+
+    def append_agent_cycles(self, agent_ids, map_market, map_knowledge, \
+                            capital, realized_learning):
+        '''
+        Appends the agent data of a cycle, given as arrays, as one block
+        of the table.
+        '''
+        if not len(agent_ids):
+            return
+        self.agent_cycle_file.append_block((self.run_number, \
+                                            self.cycle_number, agent_ids, \
+                                            map_market, map_knowledge, \
+                                            capital, realized_learning))
+
+    def create_network_file(self):
+        '''
+        Creates the table which stores network data.
+        '''
+        return self.open_table('data_network')
+
+    def append_network(self, number_of_agents, network_total_capital, network_total_realized_learning, \
+                          average_agent_capital, average_agent_realized_learning, min_agent_capital, \
+                          max_agent_capital):
+        '''
+        Appends network data.
+        '''
+        self.network_file.append((self.run_number, self.cycle_number, \
+                                  number_of_agents, network_total_capital, \
+                                  network_total_realized_learning, \
+                                  average_agent_capital, \
+                                  average_agent_realized_learning, \
+                                  min_agent_capital, max_agent_capital))
+
+    def create_agent_breakthrough_file(self):
+        '''
+        Creates the table which stores breakthrough data.
+        '''
+        return self.open_table('data_breakthrough')
+
+    def append_agent_breakthrough(self, agent_id, map_market, map_knowledge,  \
+                                  new_map_market, new_map_knowledge):
+        '''
+        Appends breakthrough data.
+        '''
+        self.agent_breakthrough_file.append((self.run_number, \
+                                             self.cycle_number, agent_id, \
+                                             map_market, map_knowledge, \
+                                             new_map_market, \
+                                             new_map_knowledge))
+
+    @staticmethod
+    def to_csv(output_dir):
+        '''
+        Writes the tables in output_dir to the csv files of CyclicData.
+        '''
+        for file_name in CyclicData.FILE_NAMES:
+            ColumnTable.write_csv(output_dir, file_name, \
+                                  os.path.join(output_dir, file_name + '.txt'))
+
+    @staticmethod
+    def merge(run_dirs, output_dir):
+        '''
+        Merges the tables of the run directories in the given order into
+        the tables in output_dir, and the timing files if the runs wrote
+        them.
+        '''
+        for file_name in CyclicData.FILE_NAMES:
+            ColumnTable.merge(run_dirs, file_name, output_dir)
+        CyclicData.merge_timing(run_dirs, output_dir)
+
+
+if __name__ == "__main__":
+
+    for output_dir in sys.argv[1:]:
+        ColumnarData.to_csv(output_dir)
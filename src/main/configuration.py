@@ -0,0 +1,193 @@
+import ast
+import copy
+import global_values
+from twisted.python.formmethod import InputError
+
+
+class Configuration(object):
+    '''
+    Configuration holds the parameters of a simulation. The defaults are
+    the values in global_values.py and each of them can be overridden
+    with set method, from a file or from the command line.
+
+    ALPHA_MARKET, ALPHA_TECH, MAP_MARKET, MAP_TECH, MAX_TIP and OUTPUT_DIR
+    are derived from other parameters as in global_values.py. They are
+    derived again when the parameters they depend on are overridden,
+    unless they are overridden themselves.
+
+    A Configuration is given to Network, Agent, Calculator and CyclicData,
+    so one process can run several parameter points one after another.
+    '''
+
+    # The names of the parameters.
+    PARAMETERS = ('NUMBER_OF_RUNS', 'NUMBER_OF_WORKERS', 'NUMBER_OF_CYCLES', \
+                  'START_NUM_AGENT', 'MAP', 'ALPHA', 'ALPHA_MARKET', \
+                  'ALPHA_TECH', 'BETA', 'MAX_TIP', 'MIN_CUM_KNOW', \
+                  'MAX_CUM_KNOW', 'MIN_SIGMA', 'MAX_SIGMA', 'MAP_MARKET', \
+                  'MAP_TECH', 'LAMBDA_POISSON', 'LOSS', 'R', \
+                  'ALLIANCE_MARGIN', 'LEARNING_MARGIN', 'EXIT_MARGIN', \
+                  'CHECKED_CALCULATIONS', 'MASTER_SEED', 'OUTPUT_FORMAT', \
+                  'PLOT_MODE', 'PLOT_EVERY', 'PLOT_CYCLES', 'PDF_EVERY', \
+                  'PDF_CYCLES', 'PLOT_TEXT', 'PLOT_QUEUE_SIZE', \
+                  'INCREMENTAL_EVALUATION', 'LAZY_LOSS', 'SPARSE_EVALUATION', \
+                  'ENSEMBLE_SIZE', 'TIMING', 'CHECKPOINT_EVERY', 'RESUME', \
+                  'LOG_LEVEL', 'PROGRESS_INTERVAL', 'CYCLE_MAP', 'OUTPUT_DIR')
+
+    # The derived parameters and the parameters they are derived from.
+    DERIVED = (('ALPHA_MARKET', ('ALPHA',)), \
+               ('ALPHA_TECH', ('ALPHA',)), \
+               ('MAP_MARKET', ('MAP',)), \
+               ('MAP_TECH', ('MAP',)), \
+               ('MAX_TIP', ('BETA',)), \
+               ('OUTPUT_DIR', ('ALPHA', 'BETA')))
+
+    # The configuration used when none is given.
+    default = None
+
+    def __init__(self, **values):
+        '''
+        Constructor. Takes the values in global_values.py and overrides
+        them with the given values.
+        '''
+        for name in Configuration.PARAMETERS:
+            setattr(self, name, getattr(global_values, name))
+        # The names of the parameters that are overridden.
+        self.overridden = set()
+        self.set(**values)
+
+    @staticmethod
+    def get_default():
+        '''
+        Returns the configuration of the values in global_values.py.
+        '''
+        if Configuration.default is None:
+            Configuration.default = Configuration()
+        return Configuration.default
+
+    @staticmethod
+    def get_max_tip(beta):
+        '''
+        Returns the max value of the parabola distance for beta.
+        '''
+        return (beta / 2.0) ** 2
+
+    @staticmethod
+    def get_output_dir(alpha, beta):
+        '''
+        Returns the directory where the files of the runs with alpha and
+        beta are written.
+        '''
+        return '../../output_alpha_' + str(alpha) + '_beta_' + str(beta) + '/'
+
+    def set(self, **values):
+        '''
+        Overrides the given parameters and derives the parameters that
+        depend on them again. Returns the configuration.
+        '''
+        for name in values:
+            if name not in Configuration.PARAMETERS:
+                raise InputError("Error : Configuration has no parameter " + name + ".")
+        for name, value in values.items():
+            setattr(self, name, value)
+            self.overridden.add(name)
+        for name, bases in Configuration.DERIVED:
+            if (name not in self.overridden) and \
+               any(base in values for base in bases):
+                setattr(self, name, self.derive(name))
+        return self
+
+    def derive(self, name):
+        '''
+        Returns the value of the derived parameter name.
+        '''
+        if name in ('ALPHA_MARKET', 'ALPHA_TECH'):
+            return self.ALPHA
+        if name in ('MAP_MARKET', 'MAP_TECH'):
+            return self.MAP
+        if name == 'MAX_TIP':
+            return Configuration.get_max_tip(self.BETA)
+        return Configuration.get_output_dir(self.ALPHA, self.BETA)
+
+    def copy(self, **values):
+        '''
+        Returns a copy of the configuration with the given values
+        overridden.
+        '''
+        other = copy.copy(self)
+        other.overridden = set(self.overridden)
+        return other.set(**values)
+
+    def parse(self, name, text):
+        '''
+        Returns the value of parameter name given as text. The value has
+        the type of the value in global_values.py, or any type if the
+        value there is None. A single value of a tuple parameter is given
+        as a tuple of one value.
+        '''
+        if name not in Configuration.PARAMETERS:
+            raise InputError("Error : Configuration has no parameter " + name + ".")
+        default = getattr(global_values, name)
+        if isinstance(default, str):
+            return text.strip().strip('\'"')
+        try:
+            value = ast.literal_eval(text.strip())
+            if (default is None) or (value is None):
+                return value
+            if isinstance(default, tuple) and \
+               not isinstance(value, (tuple, list)):
+                return (value,)
+            return type(default)(value)
+        except (ValueError, SyntaxError, TypeError):
+            raise InputError("Error : Configuration cannot parse " + text + \
+                             " as the value of " + name + ".")
+
+    def set_assignments(self, assignments):
+        '''
+        Overrides the parameters given as NAME=VALUE texts.
+        '''
+        values = {}
+        for assignment in assignments:
+            if '=' not in assignment:
+                raise InputError("Error : Configuration assignments must be given as NAME=VALUE.")
+            name, text = assignment.split('=', 1)
+            name = name.strip()
+            values[name] = self.parse(name, text)
+        return self.set(**values)
+
+    def read_file(self, file_name):
+        '''
+        Overrides the parameters given in the file as NAME = VALUE lines,
+        in the format of global_values.py. Empty lines and the lines
+        starting with # are skipped.
+        '''
+        assignments = []
+        data_file = open(file_name)
+        for line in data_file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                assignments.append(line)
+        data_file.close()
+        return self.set_assignments(assignments)
+
+    @staticmethod
+    def add_arguments(parser):
+        '''
+        Adds the --config and --set options to the argparse parser.
+        '''
+        parser.add_argument('--config', action='append', default=[], \
+                            help='file of NAME = VALUE lines that override global_values.py')
+        parser.add_argument('--set', action='append', default=[], \
+                            metavar='NAME=VALUE', \
+                            help='overrides a value of global_values.py')
+
+    @staticmethod
+    def from_arguments(args):
+        '''
+        Returns the configuration of the options added by add_arguments.
+        The files are read in the given order and --set options are
+        applied last.
+        '''
+        config = Configuration()
+        for file_name in args.config:
+            config.read_file(file_name)
+        return config.set_assignments(args.set)
@@ -0,0 +1,117 @@
+class CycleObserver(object):
+    '''
+    CycleObserver is the interface through which a Network and its Aging
+    give the results of the cycles of a run. Each method receives a block
+    of values of one cycle: the values of several agents are given as
+    arrays, or lists, with a value for each agent in the same order. The
+    cycle and the run that the blocks belong to are set by set_cycle and
+    set_run before them.
+
+    The blocks of a cycle are:
+    agents : the agents created in the cycle, by append_agents.
+    agent cycles : the position, cum_knowledge and realized learning of
+    the active agents, by append_agent_cycles, or by append_cycle with the
+    network summary.
+    network : the network summary of the cycle, by append_network.
+    alliances : the alliances made, by append_alliances.
+    breakthroughs : the agents moved by breakthroughs, by
+    append_breakthroughs.
+    agent exits : the agents that left the network, by append_agent_exits.
+    The phase times and the work of a run are given by append_timing and
+    append_work at the end of the run.
+
+    The methods of CycleObserver do nothing, so an observer only overrides
+    the methods of the blocks it uses. CyclicData writes the blocks to csv
+    files, ColumnarData to binary tables, CycleRecorder keeps them in
+    memory, and ObserverGroup gives them to several observers.
+    '''
+
+    def set_run(self, run_number):
+        '''
+        Sets the run of the following blocks.
+        '''
+        pass
+
+    def set_cycle(self, cycle_number):
+        '''
+        Sets the cycle of the following blocks.
+        '''
+        pass
+
+    def append_agents(self, agent_ids, entry_cycles, sigma_m, sigma_k):
+        '''
+        Receives the agents created in the cycle.
+        '''
+        pass
+
+    def append_agent_cycles(self, agent_ids, map_market, map_knowledge, \
+                            capital, realized_learning):
+        '''
+        Receives the positions, cum_knowledge and realized learning of
+        the agents in the cycle.
+        '''
+        pass
+
+    def append_network(self, number_of_agents, network_total_capital, network_total_realized_learning, \
+                          average_agent_capital, average_agent_realized_learning, min_agent_capital, \
+                          max_agent_capital):
+        '''
+        Receives the network summary of the cycle.
+        '''
+        pass
+
+    def append_cycle(self, agent_ids, map_market, map_knowledge, capital, \
+                     realized_learning, network):
+        '''
+        Receives the agent cycles and the network summary of the cycle,
+        given as the tuple of the append_network arguments.
+        '''
+        self.append_agent_cycles(agent_ids, map_market, map_knowledge, \
+                                 capital, realized_learning)
+        self.append_network(*network)
+
+    def append_alliances(self, agent_ids1, agent_ids2):
+        '''
+        Receives the alliances made in the cycle, each between agent_ids1[i]
+        and agent_ids2[i].
+        '''
+        pass
+
+    def append_breakthroughs(self, agent_ids, map_market, map_knowledge, \
+                             new_map_market, new_map_knowledge):
+        '''
+        Receives the breakthroughs of the cycle in the order they are made,
+        with the positions of the agents before and after each of them.
+        '''
+        pass
+
+    def append_agent_exits(self, agent_ids):
+        '''
+        Receives the agents that left the network in the cycle.
+        '''
+        pass
+
+    def append_timing(self, phase_timer):
+        '''
+        Receives the phase times of the run measured by phase_timer.
+        '''
+        pass
+
+    def append_work(self, work_counter):
+        '''
+        Receives the work of the run counted by work_counter.
+        '''
+        pass
+
+    def get_offsets(self):
+        '''
+        Returns the offsets of the files written by the observer, from
+        which a run is resumed; an observer without files has none.
+        '''
+        return {}
+
+    def close_all(self):
+        '''
+        Ends the blocks given to the observer.
+        '''
+        pass
@@ -0,0 +1,151 @@
+import numpy
+from cycle_observer import CycleObserver
+
+
+class CycleRecorder(CycleObserver):
+    '''
+    CycleRecorder is the CycleObserver that keeps the blocks of the cycles
+    in memory, so the results of a run can be used in the same process
+    without writing and reading files. get returns the values of all
+    blocks of a kind kept so far as arrays of their columns, with the run
+    and the cycle of each row. The kinds and their columns are the tables
+    of CyclicData, except that an alliance is kept once and not in both
+    directions.
+
+    stream makes the cycles of an Aging one by one and yields the blocks
+    of each cycle, for instance
+    recorder = CycleRecorder()
+    aging = Aging(1, recorder, config, random_stream, None, 0)
+    for cycle, blocks in recorder.stream(aging):
+        print cycle, blocks['network']['network_total_cum_knowledge']
+    '''
+
+    # The columns of the blocks of each kind, after the run and cycle
+    # columns.
+    COLUMNS = {'agent': ('agent_id', 'entry_cycle', 'sigma_m', 'sigma_k'), \
+               'agent_cycle': ('agent_id', 'map_market', 'map_knowledge', \
+                               'cum_knowledge', 'cycle_realized_learning'), \
+               'alliance': ('agent_id1', 'agent_id2'), \
+               'agent_exit': ('agent_id',), \
+               'network': ('number_of_agents', 'network_total_cum_knowledge', \
+                           'network_total_realized_learning', \
+                           'average_agent_cum_knowledge', \
+                           'average_agent_realized_learning', \
+                           'min_agent_cum_knowledge', 'max_agent_cum_knowledge'), \
+               'breakthrough': ('agent_id', 'map_market', 'map_knowledge', \
+                                'new_map_market', 'new_map_knowledge')}
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        # The run and the cycle of the following blocks.
+        self.run_number = 0
+        self.cycle_number = 0
+        # The blocks of each kind, each as the list of the arrays of its
+        # run, cycle and other columns.
+        self.blocks = dict((kind, []) for kind in CycleRecorder.COLUMNS)
+
+    def set_run(self, run_number):
+        '''
+        Sets the run of the following blocks.
+        '''
+        self.run_number = run_number
+
+    def set_cycle(self, cycle_number):
+        '''
+        Sets the cycle of the following blocks.
+        '''
+        self.cycle_number = cycle_number
+
+    def add(self, kind, values):
+        '''
+        Keeps the block of kind given as the values of its columns. Empty
+        blocks are not kept.
+        '''
+        size = len(values[0])
+        if size:
+            self.blocks[kind].append([numpy.repeat(self.run_number, size), \
+                                      numpy.repeat(self.cycle_number, size)] + \
+                                     [numpy.array(column) for column in values])
+
+    def append_agents(self, agent_ids, entry_cycles, sigma_m, sigma_k):
+        '''
+        Keeps the agents created in the cycle.
+        '''
+        self.add('agent', (agent_ids, entry_cycles, sigma_m, sigma_k))
+
+    def append_agent_cycles(self, agent_ids, map_market, map_knowledge, \
+                            capital, realized_learning):
+        '''
+        Keeps the positions, cum_knowledge and realized learning of the
+        agents in the cycle.
+        '''
+        self.add('agent_cycle', (agent_ids, map_market, map_knowledge, \
+                                 capital, realized_learning))
+
+    def append_network(self, number_of_agents, network_total_capital, network_total_realized_learning, \
+                          average_agent_capital, average_agent_realized_learning, min_agent_capital, \
+                          max_agent_capital):
+        '''
+        Keeps the network summary of the cycle as a block of one row.
+        '''
+        self.add('network', [[value] for value in \
+                             (number_of_agents, network_total_capital, \
+                              network_total_realized_learning, \
+                              average_agent_capital, \
+                              average_agent_realized_learning, \
+                              min_agent_capital, max_agent_capital)])
+
+    def append_alliances(self, agent_ids1, agent_ids2):
+        '''
+        Keeps the alliances made in the cycle.
+        '''
+        self.add('alliance', (agent_ids1, agent_ids2))
+
+    def append_breakthroughs(self, agent_ids, map_market, map_knowledge, \
+                             new_map_market, new_map_knowledge):
+        '''
+        Keeps the breakthroughs of the cycle.
+        '''
+        self.add('breakthrough', (agent_ids, map_market, map_knowledge, \
+                                  new_map_market, new_map_knowledge))
+
+    def append_agent_exits(self, agent_ids):
+        '''
+        Keeps the agents that left the network in the cycle.
+        '''
+        self.add('agent_exit', (agent_ids,))
+
+    def get(self, kind):
+        '''
+        Returns the dictionary of the arrays of the run, cycle and other
+        columns of the blocks of kind kept so far.
+        '''
+        names = ('run', 'cycle') + CycleRecorder.COLUMNS[kind]
+        blocks = self.blocks[kind]
+        if not blocks:
+            return dict((name, numpy.empty(0)) for name in names)
+        return dict((name, numpy.concatenate([block[k] for block in blocks])) \
+                    for k, name in enumerate(names))
+
+    def take(self):
+        '''
+        Returns the dictionary of the get values of all kinds and drops
+        the blocks kept so far.
+        '''
+        values = dict((kind, self.get(kind)) for kind in CycleRecorder.COLUMNS)
+        self.blocks = dict((kind, []) for kind in CycleRecorder.COLUMNS)
+        return values
+
+    def stream(self, aging):
+        '''
+        Yields the (cycle, blocks) of the cycles of aging, whose observer
+        is this recorder, or an ObserverGroup with it, and whose cycles
+        are not started. blocks are the take values of the cycle. The
+        first blocks are the blocks of the network when the stream starts,
+        with cycle 0 for a new run.
+        '''
+        yield aging.cycle, self.take()
+        for cycle in aging.iterate_cycles():
+            yield cycle, self.take()
@@ -1,10 +1,14 @@
 import os
-from global_values import OUTPUT_DIR, ALPHA, BETA
+import shutil
+import numpy
+from configuration import Configuration
+from cycle_observer import CycleObserver
 
 
-class CyclicData(object):
+class CyclicData(CycleObserver):
     '''
     CyclicData class is used to write the cycle values to files.
+    It is the CycleObserver of a run that writes the blocks to csv files.
     There are six basic files that store cycle data:
     1. data_agent_exit.txt
     2. data_agent.txt
@@ -12,12 +16,41 @@ class CyclicData(object):
     4. data_alliance.txt
     5. data_network.txt
     6. data_breakthrough.txt
+    When TIMING is not 'off', the phase times and the work counters of
+    the runs are also written to data_timing.txt and data_counter.txt,
+    and to data_timing_cycle.txt and data_counter_cycle.txt for each
+    cycle in 'cycle' mode.
     '''
 
-    def __init__(self):
-        '''
-        Constructor
-        '''
+    # The names of the files that store cycle data.
+    FILE_NAMES = ('data_alliance', 'data_agent', 'data_agent_cycle', \
+                  'data_agent_exit', 'data_network', 'data_breakthrough')
+
+    # The names of the files that store the phase times and the work
+    # counters, which are only written in TIMING mode.
+    TIMING_FILE_NAMES = ('data_timing', 'data_timing_cycle', 'data_counter', \
+                         'data_counter_cycle')
+
+    def __init__(self, output_dir=None, config=None, offsets=None):
+        '''
+        Constructor. The files are written to output_dir which is created
+        if it does not exist. If output_dir is None, the OUTPUT_DIR of the
+        configuration is used. If offsets returned by get_offsets are
+        given, the files are cut back to these offsets and continued
+        instead of being written again, for instance to resume a run from
+        a checkpoint.
+        '''
+        if config is None:
+            config = Configuration.get_default()
+        # The configuration of the runs whose data is written.
+        self.config = config
+        if output_dir is None:
+            output_dir = config.OUTPUT_DIR
+
+        # The directory where the files are written.
+        self.output_dir = output_dir
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
 
         # Initially sets the run number to 0. This value can be
         # changed by set_run method.
@@ -27,8 +60,16 @@ class CyclicData(object):
         # changed by set_cycle method.
         self.cycle_number = 0
 
+        # The offsets that the files are continued from, None if they are
+        # written again.
+        self.offsets = offsets
+
+        # The open data files by name.
+        self.files = {}
+
         # Deletes the files in output folder
-        self.delete_files_in_output()
+        if offsets is None:
+            self.delete_files_in_output()
 
         # The file that stores alliance data per cycle.
         self.alliance_file = self.create_alliance_file()
@@ -50,6 +91,19 @@ class CyclicData(object):
         # The file that stores agent breakthrough.
         self.agent_breakthrough_file = self.create_agent_breakthrough_file()
 
+        # The files that store the phase times and the work counters of
+        # the runs, None if they are not written.
+        self.timing_file = None
+        self.timing_cycle_file = None
+        self.counter_file = None
+        self.counter_cycle_file = None
+        if config.TIMING != 'off':
+            self.timing_file = self.create_timing_file()
+            self.counter_file = self.create_counter_file()
+        if config.TIMING == 'cycle':
+            self.timing_cycle_file = self.create_timing_cycle_file()
+            self.counter_cycle_file = self.create_counter_cycle_file()
+
         # The file that stores alpha beta values
         self.create_alpha_beta_file()
         
@@ -71,7 +125,7 @@ class CyclicData(object):
         alpha | beta
         '''
         data_file = self.open_file('alpha_beta_file')
-        wrow = str(ALPHA)+','+ str(BETA)+ '\n'
+        wrow = str(self.config.ALPHA)+','+ str(self.config.BETA)+ '\n'
         data_file.write(wrow)
         data_file.close()
         
@@ -82,7 +136,7 @@ class CyclicData(object):
         '''
         data_file = self.open_file('data_alliance')
         title = "run,cycle,agent_id1,agent_id2\n"
-        data_file.write(title)
+        self.write_title(data_file, title)
         return data_file
 
     def append_alliance(self, agent1, agent2):
@@ -98,6 +152,14 @@ class CyclicData(object):
                     str(agent2) + ',' + str(agent1) + '\n'
         self.alliance_file.write(wrow)
 
+    def append_alliances(self, agent_ids1, agent_ids2):
+        '''
+        Appends the alliances given as arrays, each as append_alliance
+        does.
+        '''
+        for agent1, agent2 in zip(*CyclicData.to_lists((agent_ids1, agent_ids2))):
+            self.append_alliance(agent1, agent2)
+
     def create_agent_exit_file(self):
         '''
         Creates the file which stores agent exit cycle data in the form
@@ -105,7 +167,7 @@ class CyclicData(object):
         '''
         data_file = self.open_file('data_agent_exit')
         title = "run,cycle,agent_id\n"
-        data_file.write(title)
+        self.write_title(data_file, title)
         return data_file
     
     def append_agent_exit(self, agent_id):
@@ -116,6 +178,13 @@ class CyclicData(object):
         wrow = str(self.run_number)+','+ str(self.cycle_number)+','+ \
                     str(agent_id) + '\n'
         self.agent_exit_file.write(wrow)
+
+    def append_agent_exits(self, agent_ids):
+        '''
+        Appends the agent exits given as an array.
+        '''
+        for agent_id in CyclicData.to_lists((agent_ids,))[0]:
+            self.append_agent_exit(agent_id)
         
     def create_agent_file(self):
         '''
@@ -124,7 +193,7 @@ class CyclicData(object):
         '''
         data_file = self.open_file('data_agent')
         title = "run,cycle,agent_id,entry_cycle,sigma_m,sigma_k\n"
-        data_file.write(title)
+        self.write_title(data_file, title)
         return data_file
     
     def append_agent(self, agent_id, entry_cycle, sigma_m, sigma_k):
@@ -136,6 +205,14 @@ class CyclicData(object):
                 str(agent_id) + ',' + str(entry_cycle) + ',' + \
                 str(sigma_m) + ',' + str(sigma_k) + '\n'
         self.agent_file.write(wrow) 
+
+    def append_agents(self, agent_ids, entry_cycles, sigma_m, sigma_k):
+        '''
+        Appends the agent data given as arrays with a value for each agent.
+        '''
+        for row in zip(*CyclicData.to_lists((agent_ids, entry_cycles, \
+                                              sigma_m, sigma_k))):
+            self.append_agent(*row)
         
     def create_agent_cycle_file(self):
         '''
@@ -145,7 +222,7 @@ class CyclicData(object):
         '''
         data_file = self.open_file('data_agent_cycle')
         title = "run,cycle, agent_id, map_market, map_knowledge, cum_knowledge, cycle_realized_learning\n"
-        data_file.write(title)
+        self.write_title(data_file, title)
         return data_file
     
     def append_agent_cycle(self, agent_id, map_market, map_knowledge, capital, realized_learning):
@@ -160,6 +237,31 @@ class CyclicData(object):
                 str(capital) + ',' + str(realized_learning) + '\n'
         self.agent_cycle_file.write(wrow) 
 
+    def append_agent_cycles(self, agent_ids, map_market, map_knowledge, \
+                            capital, realized_learning):
+        '''
+        Appends the agent data of a cycle, given as arrays with a value
+        for each agent. The rows of the agents are written at once.
+        '''
+        prefix = str(self.run_number)+','+ str(self.cycle_number)+','
+        rows = [prefix + str(agent_id) + ',' + str(market) + ',' + \
+                str(knowledge) + ',' + str(agent_capital) + ',' + \
+                str(learning) + '\n' \
+                for agent_id, market, knowledge, agent_capital, learning in \
+                zip(*CyclicData.to_lists((agent_ids, map_market, \
+                                          map_knowledge, capital, \
+                                          realized_learning)))]
+        self.agent_cycle_file.write(''.join(rows))
+
+    @staticmethod
+    def to_lists(blocks):
+        '''
+        Returns the blocks, arrays or lists, as lists of Python numbers,
+        so the values are written in the same format as the values given
+        one by one.
+        '''
+        return [numpy.asarray(values).tolist() for values in blocks]
+
     def create_network_file(self):
         '''
         Creates the file which stores network data in the form\
@@ -170,7 +272,7 @@ class CyclicData(object):
         '''
         data_file = self.open_file('data_network')
         title = "run,cycle,number_of_agents,network_total_cum_knowledge,network_total_realized_learning,average_agent_cum_knowledge,average_agent_realized_learning,min_agent_cum_knowledge,max_agent_cum_knowledge\n"
-        data_file.write(title)
+        self.write_title(data_file, title)
         return data_file
 
     def append_network(self, number_of_agents, network_total_capital, network_total_realized_learning, \
@@ -198,7 +300,7 @@ class CyclicData(object):
         '''
         data_file = self.open_file('data_breakthrough')
         title = "run,cycle,agent_id,map_market,map_knowledge,new_map_market,new_map_knowledge\n"
-        data_file.write(title)
+        self.write_title(data_file, title)
         return data_file
 
     def append_agent_breakthrough(self, agent_id, map_market, map_knowledge,  \
@@ -214,12 +316,129 @@ class CyclicData(object):
                ',' + str(new_map_knowledge) + '\n'
         self.agent_breakthrough_file.write(wrow)
 
+    def append_breakthroughs(self, agent_ids, map_market, map_knowledge, \
+                             new_map_market, new_map_knowledge):
+        '''
+        Appends the breakthroughs given as arrays in the order they are
+        made.
+        '''
+        for row in zip(*CyclicData.to_lists((agent_ids, map_market, \
+                                              map_knowledge, new_map_market, \
+                                              new_map_knowledge))):
+            self.append_agent_breakthrough(*row)
+
+    def create_timing_file(self):
+        '''
+        Creates the file which stores the phase times of each run in the form
+        run  |  phase  |  calls  |  seconds
+        '''
+        data_file = self.open_file('data_timing')
+        title = "run,phase,calls,seconds\n"
+        self.write_title(data_file, title)
+        return data_file
+
+    def create_timing_cycle_file(self):
+        '''
+        Creates the file which stores the phase times of each cycle in the form
+        run  |  cycle  |  phase  |  seconds
+        '''
+        data_file = self.open_file('data_timing_cycle')
+        title = "run,cycle,phase,seconds\n"
+        self.write_title(data_file, title)
+        return data_file
+
+    def append_timing(self, phase_timer):
+        '''
+        Writes the phase times of the current run measured by phase_timer,
+        if the timing files are written.
+        '''
+        if self.timing_file is not None:
+            for phase, calls, seconds in phase_timer.get_rows():
+                self.timing_file.write(str(self.run_number) + ',' + phase + \
+                                       ',' + str(calls) + ',' + repr(seconds) + '\n')
+        if self.timing_cycle_file is not None:
+            for cycle, phase, seconds in phase_timer.get_cycle_rows():
+                self.timing_cycle_file.write(str(self.run_number) + ',' + \
+                                             str(cycle) + ',' + phase + ',' + \
+                                             repr(seconds) + '\n')
+
+    def create_counter_file(self):
+        '''
+        Creates the file which stores the work counters of each run in the form
+        run  |  counter  |  value
+        '''
+        data_file = self.open_file('data_counter')
+        title = "run,counter,value\n"
+        self.write_title(data_file, title)
+        return data_file
+
+    def create_counter_cycle_file(self):
+        '''
+        Creates the file which stores the work counters of each cycle in the form
+        run  |  cycle  |  counter  |  value
+        '''
+        data_file = self.open_file('data_counter_cycle')
+        title = "run,cycle,counter,value\n"
+        self.write_title(data_file, title)
+        return data_file
+
+    def append_work(self, work_counter):
+        '''
+        Writes the work of the current run counted by work_counter, if the
+        counter files are written.
+        '''
+        if self.counter_file is not None:
+            for name, value in work_counter.get_rows():
+                self.counter_file.write(str(self.run_number) + ',' + name + \
+                                        ',' + str(value) + '\n')
+        if self.counter_cycle_file is not None:
+            for cycle, name, value in work_counter.get_cycle_rows():
+                self.counter_cycle_file.write(str(self.run_number) + ',' + \
+                                              str(cycle) + ',' + name + ',' + \
+                                              str(value) + '\n')
+
     def open_file(self, file_name):
         '''
-        Opens a file with the specified file_name in the OUTPUT_DIR directory
+        Opens a file with the specified file_name in the output directory.
+        If the file has an offset, it is cut back to the offset and
+        continued.
+        '''
+        output = os.path.join(self.output_dir, file_name + ".txt")
+        if (self.offsets is None) or (file_name not in self.offsets):
+            data_file = open(output, 'w')
+        else:
+            data_file = CyclicData.open_at(output, self.offsets[file_name])
+        self.files[file_name] = data_file
+        return data_file
+
+    @staticmethod
+    def open_at(path, offset):
+        '''
+        Opens the file for appending after cutting it back to offset
+        bytes.
         '''
-        output = OUTPUT_DIR + file_name + ".txt"
-        return open(output, 'w')
+        data_file = open(path, 'ab')
+        data_file.truncate(offset)
+        return data_file
+
+    def write_title(self, data_file, title):
+        '''
+        Writes the title line of a new file; a continued file has it.
+        '''
+        if os.fstat(data_file.fileno()).st_size == 0:
+            data_file.write(title)
+
+    def get_offsets(self):
+        '''
+        Writes the data of the open files and returns their offsets, from
+        which a CyclicData continues them.
+        '''
+        offsets = {}
+        for file_name, data_file in self.files.items():
+            if isinstance(data_file, file) and not data_file.closed:
+                data_file.flush()
+                offsets[file_name] = os.fstat(data_file.fileno()).st_size
+        return offsets
     
     def close_all(self):
         '''
@@ -231,14 +450,63 @@ class CyclicData(object):
         self.agent_exit_file.close()
         self.network_file.close()
         self.agent_breakthrough_file.close()
+        for data_file in (self.timing_file, self.timing_cycle_file, \
+                          self.counter_file, self.counter_cycle_file):
+            if data_file is not None:
+                data_file.close()
 
     def delete_files_in_output(self):
         """
-        Delete files in the OUTPUT_DIR directory before each run.
+        Delete files in the output directory before each run.
+        """
+        CyclicData.delete_files(self.output_dir)
+
+    @staticmethod
+    def merge(run_dirs, output_dir):
+        '''
+        Merges the files of the run directories in the given order into
+        the files in output_dir. The header line is written once for each
+        file. The timing files are merged if the runs wrote them.
+        '''
+        CyclicData.merge_files(run_dirs, output_dir, CyclicData.FILE_NAMES)
+        CyclicData.merge_timing(run_dirs, output_dir)
+
+    @staticmethod
+    def merge_timing(run_dirs, output_dir):
+        '''
+        Merges the files of the phase times and the work counters of the
+        run directories that wrote them.
+        '''
+        CyclicData.merge_files(run_dirs, output_dir, \
+            [file_name for file_name in CyclicData.TIMING_FILE_NAMES \
+             if os.path.exists(os.path.join(run_dirs[0], file_name + '.txt'))])
+
+    @staticmethod
+    def merge_files(run_dirs, output_dir, file_names):
+        '''
+        Merges the given files of the run directories in the given order
+        into the files in output_dir.
+        '''
+        for file_name in file_names:
+            output = open(os.path.join(output_dir, file_name + '.txt'), 'w')
+            for i, run_dir in enumerate(run_dirs):
+                data_file = open(os.path.join(run_dir, file_name + '.txt'))
+                header = data_file.readline()
+                if i == 0:
+                    output.write(header)
+                shutil.copyfileobj(data_file, output)
+                data_file.close()
+            output.close()
+
+    @staticmethod
+    def delete_files(output_dir):
+        """
+        Delete files in the output_dir directory. The directories in it
+        are not deleted.
         """
-        if os.path.exists(OUTPUT_DIR):
-            for file_i in os.listdir(OUTPUT_DIR):
-                file_path = os.path.join(OUTPUT_DIR, file_i)
+        if os.path.exists(output_dir):
+            for file_i in os.listdir(output_dir):
+                file_path = os.path.join(output_dir, file_i)
                 try:
                     if os.path.isfile(file_path):
                         os.unlink(file_path)
@@ -0,0 +1,129 @@
+import time
+import numpy
+from twisted.python.formmethod import InputError
+from aging import Aging
+from calculator import Calculator
+from columnar_data import create_cyclic_data
+from evaluation_engine import EvaluationEngine
+from random_stream import RandomStream
+
+
+class Ensemble(object):
+    '''
+    Ensemble makes several runs together, cycle by cycle. The evaluation
+    matrices of all networks are calculated at once by one EvaluationEngine
+    with a leading axis of networks, so the array operations of a cycle are
+    made once for the ensemble instead of once for each run. Only the
+    alliances, the realized learning and the breakthroughs are calculated
+    network by network.
+
+    The runs are given as the jobs (run_num, run_dir, config, point_index)
+    of run_in_worker. Each run writes its cycle data to its own run
+    directory and draws its random values from its own stream, so with
+    MASTER_SEED its data is the same as when it is run alone. The runs can
+    be of different parameter points, but they must have the same map,
+    LOSS, R, sigma range, number of agents and number of cycles.
+    '''
+
+    # The parameters that must be the same for all runs of an ensemble.
+    SHARED_PARAMETERS = ('MAP_MARKET', 'MAP_TECH', 'LOSS', 'R', 'MIN_SIGMA', \
+                         'MAX_SIGMA', 'START_NUM_AGENT', 'NUMBER_OF_CYCLES', \
+                         'SPARSE_EVALUATION')
+
+    def __init__(self, jobs, plot_renderer=None):
+        '''
+        Constructor. Creates the network of each run. The maps are given
+        to plot_renderer if it is not None.
+        '''
+        if not jobs:
+            raise InputError("Error : Ensemble cannot have no jobs.")
+        configs = [job[2] for job in jobs]
+        for name in Ensemble.SHARED_PARAMETERS:
+            if len(set(getattr(config, name) for config in configs)) > 1:
+                raise InputError("Error : Ensemble cannot have runs of different " + name + ".")
+        if any(config.CHECKPOINT_EVERY or config.RESUME for config in configs):
+            raise InputError("Error : Ensemble runs cannot be checkpointed or resumed.")
+        # The configuration of the first run, which gives the shared
+        # parameters.
+        self.config = configs[0]
+        # The cycle data of each run.
+        self.cyclic_datas = []
+        # The Aging instance of each run, whose cycles are run by the
+        # ensemble.
+        self.agings = []
+        for run_num, run_dir, config, point_index in jobs:
+            cyclic_data = create_cyclic_data(run_dir, config)
+            cyclic_data.set_run(run_num)
+            random_stream = RandomStream.for_run(config.MASTER_SEED, \
+                                                 run_num, point_index)
+            self.cyclic_datas.append(cyclic_data)
+            self.agings.append(Aging(run_num, cyclic_data, config, \
+                                     random_stream, plot_renderer, 0))
+        # The engine that evaluates the networks of all runs together.
+        self.evaluation_engine = EvaluationEngine( \
+            self.config.MAP_MARKET, self.config.MAP_TECH, \
+            [config.ALPHA_MARKET for config in configs], \
+            [config.ALPHA_TECH for config in configs], \
+            [config.BETA for config in configs], \
+            [config.MAX_TIP for config in configs], \
+            self.config.LOSS, self.config.R, self.config.MIN_SIGMA, \
+            self.config.MAX_SIGMA)
+
+    def run(self):
+        '''
+        Runs the cycles of all runs and closes their cycle data.
+        '''
+        for cycle in range(1, self.config.NUMBER_OF_CYCLES + 1):
+            for aging in self.agings:
+                aging.start_cycle(cycle)
+            matrices = self.create_evaluation_matrices()
+            for aging, (expected_learning_matrix, \
+                        expected_learning_matrix_with_loss) in \
+                    zip(self.agings, matrices):
+                # the next positions of the alliances are calculated with
+                # the configuration of the run.
+                Calculator.set_config(aging.config)
+                aging.network.apply_evaluation_matrices( \
+                    expected_learning_matrix, expected_learning_matrix_with_loss)
+                aging.end_cycle(cycle)
+        for aging in self.agings:
+            aging.end_run()
+        for cyclic_data in self.cyclic_datas:
+            cyclic_data.close_all()
+
+    def create_evaluation_matrices(self):
+        '''
+        Returns the (expected_learning_matrix,
+        expected_learning_matrix_with_loss) pair of each network. The
+        networks are evaluated together if they have the same number of
+        agents and SPARSE_EVALUATION is not set, and one by one otherwise.
+        '''
+        networks = [aging.network for aging in self.agings]
+        if self.config.SPARSE_EVALUATION or \
+           (len(set(len(network.population) for network in networks)) > 1):
+            matrices = []
+            for network in networks:
+                Calculator.set_config(network.config)
+                network.create_evaluation_matrices()
+                matrices.append((network.expected_learning_matrix, \
+                                 network.expected_learning_matrix_with_loss))
+            return matrices
+        # the time and the work of the evaluation are shared equally by
+        # the runs.
+        started = time.time()
+        columns = [numpy.array([network.population[name] \
+                                for network in networks]) \
+                   for name in ('map_market', 'map_knowledge', 'sigma_m', \
+                                'sigma_k', 'is_active')]
+        expected_learning, expected_learning_with_loss = \
+            self.evaluation_engine.evaluate(*columns)
+        seconds = (time.time() - started) / len(networks)
+        for network in networks:
+            network.phase_timer.record('evaluation', seconds)
+        for counts in (self.evaluation_engine.counts, \
+                       self.evaluation_engine.spatial_index.counts):
+            for name in counts:
+                for network in networks:
+                    network.work_counter.add(name, counts[name] // len(networks))
+                counts[name] = 0
+        return zip(expected_learning, expected_learning_with_loss)
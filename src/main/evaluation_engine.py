@@ -0,0 +1,619 @@
+import numpy
+from twisted.python.formmethod import InputError
+from torus_grid import TorusGrid
+from candidate_generator import CandidateGenerator
+from sparse_matrix import SparseMatrix
+from work_counter import WorkCounter
+
+
+class EvaluationEngine(object):
+    '''
+    EvaluationEngine calculates the expected learning matrices of a network
+    with array operations instead of calling the Calculator methods for each
+    pair of agents. The torus distances of all pairs are calculated once per
+    cycle, the parabola distance function and the next position rule are
+    applied to the whole matrices and the results are written into float
+    buffers which are kept and reused in the following cycles.
+
+    Every value is calculated with the same operations in the same order as
+    Calculator does, so the matrices are identical to the ones calculated
+    pair by pair.
+
+    In incremental mode the engine keeps the values of the previous
+    evaluation. Only the rows and columns of the agents whose position,
+    sigma or activity has changed are calculated again, and the neighbor
+    counts of the other pairs are corrected for the agents that moved
+    into or out of their radius. The results are the same as in a full
+    evaluation. When most agents have changed, all pairs are calculated.
+
+    The networks of an ensemble, which have the same number of agents, can
+    be evaluated together. Their arrays are then given with a leading axis
+    of networks and the matrices have the shape (networks, agents, agents).
+    The movement and parabola coefficients can be given for each network
+    of the ensemble, so that networks of different ALPHA and BETA values
+    are evaluated together.
+
+    On big maps most pairs are too far from each other or too close to
+    learn anything. evaluate_sparse calculates only the pairs enumerated by
+    a CandidateGenerator and returns the matrices as SparseMatrix instances
+    which hold the pairs with positive expected learning.
+
+    In lazy loss mode the neighbor counts are not calculated for all pairs.
+    evaluate and evaluate_sparse return only the expected learning, which
+    is an upper bound of the expected learning with loss, and the values
+    with loss of the pairs tried by the AllianceMatcher are calculated by
+    get_learning_with_loss.
+    '''
+
+    # The largest fraction of changed agents for which the matrices are
+    # updated in incremental mode instead of being calculated again.
+    CHANGED_FRACTION = 0.25
+
+    def __init__(self, map_market, map_tech, alpha_market, alpha_tech, \
+                 beta, max_tip, loss, radius, min_sigma, max_sigma, \
+                 incremental=0, lazy_loss=0):
+        '''
+        Constructor. alpha_market, alpha_tech, beta and max_tip are either
+        numbers or sequences with a value for each network of an ensemble.
+        incremental is 1 for incremental mode and lazy_loss is 1 for lazy
+        loss mode, which are not used for ensembles.
+        '''
+        # The ranges of the market and technology axes of the map.
+        self.map_market = map_market
+        self.map_tech = map_tech
+        # The movement coefficients on the market and technology axes.
+        self.alpha_market = alpha_market
+        self.alpha_tech = alpha_tech
+        # The parabola distance function coefficients.
+        self.beta = beta
+        self.max_tip = max_tip
+        # The LOSS percentage and the radius in which LOSS is applied.
+        self.loss = loss
+        self.radius = radius
+        # The range (MIN_SIGMA, MAX_SIGMA) that sigma values must be in.
+        self.min_sigma = min_sigma
+        self.max_sigma = max_sigma
+        # The spatial index used to count the neighbors of the next
+        # positions when no index is given to evaluate method.
+        self.spatial_index = TorusGrid(map_market, map_tech, radius)
+        # The generator of the pairs that are evaluated by evaluate_sparse.
+        self.candidate_generator = CandidateGenerator(map_market, map_tech, beta)
+        # 1 if only the pairs of the changed agents are calculated again.
+        self.incremental = incremental
+        # 1 if the learning with loss is calculated only for the pairs
+        # given to get_learning_with_loss.
+        self.lazy_loss = lazy_loss
+        # The (expected_learning, next_map_market, next_map_knowledge,
+        # spatial_index) of the last evaluation in lazy loss mode, which
+        # get_learning_with_loss reads the pairs from.
+        self.lazy_values = None
+        # The spatial index of the next positions of the pairs whose
+        # neighbor counts are corrected in incremental mode.
+        self.pair_index = TorusGrid(map_market, map_tech, radius)
+        # The copies of the (map_market, map_knowledge, sigma_m, sigma_k,
+        # is_active) arrays of the previous evaluation in incremental mode,
+        # None if there is no previous evaluation to be updated.
+        self.previous = None
+        # The number of agents and the number of networks, None for a
+        # single network, that the buffers are allocated for.
+        self.size = 0
+        self.number_of_networks = None
+        # The buffers that are reused in each cycle. They are allocated
+        # by allocate method when the number of agents changes.
+        self.market_distance = None
+        self.knowledge_distance = None
+        self.market_learning = None
+        self.knowledge_learning = None
+        self.next_map_market = None
+        self.next_map_knowledge = None
+        self.expected_learning = None
+        self.expected_learning_with_loss = None
+        self.neighbor_count = None
+        self.pair_mask = None
+        # The pairs calculated by the engine, which are taken by a
+        # WorkCounter.
+        self.counts = WorkCounter.create_counts(('pair_evaluations',))
+
+    def allocate(self, size, number_of_networks=None):
+        '''
+        Allocates the matrix buffers for the given number of agents of a
+        single network, or of each of number_of_networks networks. The
+        buffers are allocated again only if the size is changed.
+        '''
+        if (size < 0):
+            raise InputError("Error : EvaluationEngine.allocate method cannot have negative size.")
+        if (size == self.size) and \
+           (number_of_networks == self.number_of_networks) and \
+           (self.expected_learning is not None):
+            return
+        self.previous = None
+        self.size = size
+        self.number_of_networks = number_of_networks
+        shape = (size, size)
+        if number_of_networks is not None:
+            shape = (number_of_networks, size, size)
+        self.market_distance = numpy.zeros(shape)
+        self.knowledge_distance = numpy.zeros(shape)
+        self.market_learning = numpy.zeros(shape)
+        self.knowledge_learning = numpy.zeros(shape)
+        self.next_map_market = numpy.zeros(shape)
+        self.next_map_knowledge = numpy.zeros(shape)
+        self.expected_learning = numpy.zeros(shape)
+        self.expected_learning_with_loss = numpy.zeros(shape)
+        self.neighbor_count = numpy.zeros(shape, dtype=numpy.int32)
+        self.pair_mask = numpy.zeros(shape, dtype=bool)
+
+    def evaluate(self, map_market, map_knowledge, sigma_m, sigma_k, is_active, \
+                 spatial_index=None):
+        '''
+        Calculates the expected learning matrix and the expected learning
+        matrix with loss for the agents whose positions, sigmas and activity
+        are given in the arrays. Row i of the matrices is the expected
+        learning of agent i from every other agent. The values for inactive
+        agents and for an agent with itself are 0.
+        The arrays of an ensemble have a row for each network, and the
+        matrix k of the results is the matrix of network k.
+        spatial_index is a TorusGrid built for the active agents at these
+        positions, with a layer for each network of an ensemble; if it is
+        not given, it is built here.
+        Returns (expected_learning, expected_learning_with_loss), where
+        expected_learning_with_loss is None in lazy loss mode.
+        '''
+        map_market = numpy.asarray(map_market, dtype=float)
+        map_knowledge = numpy.asarray(map_knowledge, dtype=float)
+        sigma_m = numpy.asarray(sigma_m, dtype=float)
+        sigma_k = numpy.asarray(sigma_k, dtype=float)
+        is_active = numpy.asarray(is_active, dtype=bool)
+        if map_market.ndim == 2:
+            self.allocate(map_market.shape[1], map_market.shape[0])
+        else:
+            self.allocate(len(map_market))
+        self.validate(map_market, map_knowledge, sigma_m, sigma_k, is_active)
+
+        # pairs of different active agents are evaluated, the rest is 0.
+        numpy.logical_and(is_active[..., :, None], is_active[..., None, :], \
+                          out=self.pair_mask)
+        diagonal = numpy.arange(self.size)
+        self.pair_mask[..., diagonal, diagonal] = False
+
+        if spatial_index is None:
+            spatial_index = self.spatial_index
+            self.build_spatial_index(spatial_index, map_market, \
+                                     map_knowledge, is_active)
+        changed = None
+        if self.incremental and (self.number_of_networks is None):
+            changed = self.get_changed(map_market, map_knowledge, sigma_m, \
+                                       sigma_k, is_active)
+        if changed is None:
+            self.evaluate_all(map_market, map_knowledge, sigma_m, sigma_k, \
+                              spatial_index)
+        else:
+            self.evaluate_changed(changed, map_market, map_knowledge, \
+                                  sigma_m, sigma_k, is_active, spatial_index)
+        if self.incremental and (self.number_of_networks is None):
+            self.previous = tuple(numpy.array(values) for values in \
+                                  (map_market, map_knowledge, sigma_m, \
+                                   sigma_k, is_active))
+        if self.is_lazy():
+            self.lazy_values = (self.expected_learning, self.next_map_market, \
+                                self.next_map_knowledge, spatial_index)
+            return self.expected_learning, None
+        self.apply_loss(self.expected_learning, self.neighbor_count, \
+                        self.expected_learning_with_loss)
+        self.expected_learning_with_loss[~self.pair_mask] = 0.0
+        return self.expected_learning, self.expected_learning_with_loss
+
+    def evaluate_sparse(self, map_market, map_knowledge, sigma_m, sigma_k, \
+                        is_active, spatial_index=None):
+        '''
+        Calculates the expected learning and the expected learning with
+        loss of a single network as evaluate does, but only for the pairs
+        given by the candidate generator. Returns
+        (expected_learning, expected_learning_with_loss) as SparseMatrix
+        instances which hold the pairs with positive expected learning;
+        their values are the same as the values of evaluate.
+        expected_learning_with_loss is None in lazy loss mode.
+        '''
+        map_market = numpy.asarray(map_market, dtype=float)
+        map_knowledge = numpy.asarray(map_knowledge, dtype=float)
+        sigma_m = numpy.asarray(sigma_m, dtype=float)
+        sigma_k = numpy.asarray(sigma_k, dtype=float)
+        is_active = numpy.asarray(is_active, dtype=bool)
+        if map_market.ndim != 1:
+            raise InputError("Error : EvaluationEngine.evaluate_sparse method cannot evaluate an ensemble.")
+        self.validate(map_market, map_knowledge, sigma_m, sigma_k, is_active)
+        size = len(map_market)
+        if spatial_index is None:
+            spatial_index = self.build_spatial_index(self.spatial_index, \
+                                                     map_market, \
+                                                     map_knowledge, is_active)
+        rows, cols = self.candidate_generator.get_pairs(map_market, \
+                                                        map_knowledge, \
+                                                        sigma_m, sigma_k, \
+                                                        is_active)
+        learnings, next_positions = self.evaluate_pair_list(rows, cols, \
+                                        map_market, map_knowledge, \
+                                        sigma_m, sigma_k)
+        expected_learning = learnings[0] + learnings[1]
+        positive = expected_learning > 0
+        rows = rows[positive]
+        cols = cols[positive]
+        expected_learning = expected_learning[positive]
+        if self.lazy_loss:
+            self.lazy_values = (SparseMatrix(size, rows, cols, expected_learning), \
+                                SparseMatrix(size, rows, cols, \
+                                             next_positions[0][positive]), \
+                                SparseMatrix(size, rows, cols, \
+                                             next_positions[1][positive]), \
+                                spatial_index)
+            return self.lazy_values[0], None
+        neighbor_count = numpy.zeros(len(rows), dtype=numpy.int32)
+        if self.loss != 0:
+            neighbor_count = spatial_index.count_in_radius_array( \
+                                next_positions[0][positive], \
+                                next_positions[1][positive], rows, cols)
+        expected_learning_with_loss = self.apply_loss(expected_learning, \
+                                                      neighbor_count, \
+                                                      numpy.zeros(len(rows)))
+        return SparseMatrix(size, rows, cols, expected_learning), \
+               SparseMatrix(size, rows, cols, expected_learning_with_loss)
+
+    def evaluate_pair_list(self, rows, cols, map_market, map_knowledge, \
+                           sigma_m, sigma_k):
+        '''
+        Calculates the learnings and the next positions of agents rows[k]
+        when they make alliance with agents cols[k] on the market and
+        technology axes. Returns ([market_learning, knowledge_learning],
+        [next_map_market, next_map_knowledge]) arrays of the pairs.
+        '''
+        # each pair is evaluated as a 1 x 1 matrix of the agent of the row
+        # with the agent of the column, so the values are calculated with
+        # the same operations as the matrices of evaluate.
+        shape = (len(rows), 1, 1)
+        self.counts['pair_evaluations'] += len(rows)
+        learnings = []
+        next_positions = []
+        for values, sigma, map_range, alpha in \
+                ((map_market, sigma_m, self.map_market, self.alpha_market), \
+                 (map_knowledge, sigma_k, self.map_tech, self.alpha_tech)):
+            agent_values = values[rows][:, None]
+            partner_values = values[cols][:, None]
+            distance = self.torus_distance(agent_values, map_range, \
+                                           numpy.zeros(shape), partner_values)
+            learning = self.parabola(distance, sigma[rows][:, None], \
+                                     numpy.zeros(shape))
+            learnings.append(learning.ravel())
+            next_positions.append(self.next_position(agent_values, distance, \
+                                                     learning, map_range, \
+                                                     alpha, numpy.zeros(shape), \
+                                                     partner_values=partner_values).ravel())
+        return learnings, next_positions
+
+    def get_next_positions(self, map_market, map_knowledge, sigma_m, sigma_k, \
+                           agents, partners):
+        '''
+        Returns the (next_map_market, next_map_knowledge) arrays of the
+        positions that agents[k] moves to when it makes alliance with
+        partners[k]. The positions are the same as the ones calculated by
+        Calculator.calculate_next_position.
+        '''
+        agents = numpy.asarray(agents, dtype=numpy.intp)
+        partners = numpy.asarray(partners, dtype=numpy.intp)
+        if len(agents) != len(partners):
+            raise InputError("Error : EvaluationEngine.get_next_positions method cannot have agents and partners of different length.")
+        learnings, next_positions = self.evaluate_pair_list(agents, partners, \
+                                        numpy.asarray(map_market, dtype=float), \
+                                        numpy.asarray(map_knowledge, dtype=float), \
+                                        numpy.asarray(sigma_m, dtype=float), \
+                                        numpy.asarray(sigma_k, dtype=float))
+        return next_positions[0], next_positions[1]
+
+    def evaluate_all(self, map_market, map_knowledge, sigma_m, sigma_k, \
+                     spatial_index):
+        '''
+        Calculates the matrices and the neighbor counts for all pairs.
+        '''
+        self.counts['pair_evaluations'] += self.expected_learning.size
+        self.torus_distance(map_market, self.map_market, self.market_distance)
+        self.torus_distance(map_knowledge, self.map_tech, \
+                            self.knowledge_distance)
+        beta = self.get_coefficient(self.beta)
+        self.parabola(self.market_distance, sigma_m, self.market_learning, beta)
+        self.parabola(self.knowledge_distance, sigma_k, \
+                      self.knowledge_learning, beta)
+
+        numpy.add(self.market_learning, self.knowledge_learning, \
+                  out=self.expected_learning)
+        self.expected_learning[~self.pair_mask] = 0.0
+
+        max_tip = self.get_coefficient(self.max_tip)
+        self.next_position(map_market, self.market_distance, \
+                           self.market_learning, self.map_market, \
+                           self.get_coefficient(self.alpha_market), \
+                           self.next_map_market, max_tip)
+        self.next_position(map_knowledge, self.knowledge_distance, \
+                           self.knowledge_learning, self.map_tech, \
+                           self.get_coefficient(self.alpha_tech), \
+                           self.next_map_knowledge, max_tip)
+        if not self.is_lazy():
+            self.count_neighbors(spatial_index)
+
+    def get_changed(self, map_market, map_knowledge, sigma_m, sigma_k, \
+                    is_active):
+        '''
+        Returns the indices of the agents whose values have changed since
+        the previous evaluation, or None if all pairs are to be calculated
+        because there is no previous evaluation or more than
+        CHANGED_FRACTION of the agents have changed.
+        '''
+        if (self.previous is None) or (len(self.previous[0]) != self.size):
+            return None
+        changed = numpy.zeros(self.size, dtype=bool)
+        for values, previous in zip((map_market, map_knowledge, sigma_m, \
+                                     sigma_k, is_active), self.previous):
+            changed |= (values != previous)
+        changed = numpy.flatnonzero(changed)
+        if EvaluationEngine.CHANGED_FRACTION * self.size < len(changed):
+            return None
+        return changed
+
+    def evaluate_changed(self, changed, map_market, map_knowledge, sigma_m, \
+                         sigma_k, is_active, spatial_index):
+        '''
+        Updates the matrices of the previous evaluation for the changed
+        agents. Their rows and columns are calculated again, and the
+        neighbor counts of the other pairs are corrected by the changed
+        agents that were or are now active.
+        '''
+        if len(changed) == 0:
+            return
+        every = slice(None)
+        self.evaluate_pairs(changed, every, map_market, map_knowledge, \
+                            sigma_m, sigma_k)
+        self.evaluate_pairs(every, changed, map_market, map_knowledge, \
+                            sigma_m, sigma_k)
+        if (self.loss == 0) or self.lazy_loss:
+            return
+        kept = numpy.ones(self.size, dtype=bool)
+        kept[changed] = False
+        kept = numpy.flatnonzero(kept)
+        pairs = (kept[:, None] * self.size + kept[None, :]).ravel()
+        self.pair_index.build(self.next_map_market.ravel()[pairs], \
+                              self.next_map_knowledge.ravel()[pairs], pairs)
+        previous_market, previous_knowledge = self.previous[0], self.previous[1]
+        previous_active = self.previous[4]
+        # the counts are corrected in place through the flat view.
+        count = self.neighbor_count.reshape(-1)
+        for values_market, values_knowledge, active, sign in \
+                ((map_market, map_knowledge, is_active, 1), \
+                 (previous_market, previous_knowledge, previous_active, -1)):
+            agents = changed[active[changed]]
+            positions, found = self.pair_index.find_in_radius( \
+                                    values_market[agents], values_knowledge[agents])
+            count += sign * numpy.bincount(found, minlength=len(count)).astype(count.dtype)
+        # the rows of the changed agents and the rest of their columns are
+        # counted again.
+        index = numpy.arange(self.size)
+        self.neighbor_count[changed, :] = spatial_index.count_in_radius_array( \
+                                            self.next_map_market[changed, :], \
+                                            self.next_map_knowledge[changed, :], \
+                                            changed[:, None], index[None, :])
+        block = (kept[:, None], changed[None, :])
+        self.neighbor_count[block] = spatial_index.count_in_radius_array( \
+                                        self.next_map_market[block], \
+                                        self.next_map_knowledge[block], \
+                                        kept[:, None], changed[None, :])
+
+    def evaluate_pairs(self, rows, columns, map_market, map_knowledge, \
+                       sigma_m, sigma_k):
+        '''
+        Calculates the distances, expected learnings and next positions of
+        the agents in rows with the agents in columns, which are index
+        arrays or slices, in the same way as evaluate_all does.
+        '''
+        for values, sigma, map_range, alpha, distance, learning, \
+            next_values in ((map_market, sigma_m, self.map_market, \
+                             self.alpha_market, self.market_distance, \
+                             self.market_learning, self.next_map_market), \
+                            (map_knowledge, sigma_k, self.map_tech, \
+                             self.alpha_tech, self.knowledge_distance, \
+                             self.knowledge_learning, self.next_map_knowledge)):
+            shape = (len(values[rows]), len(values[columns]))
+            block_distance = self.torus_distance(values[rows], map_range, \
+                                                 numpy.zeros(shape), \
+                                                 values[columns])
+            block_learning = self.parabola(block_distance, sigma[rows], \
+                                           numpy.zeros(shape))
+            distance[rows, columns] = block_distance
+            learning[rows, columns] = block_learning
+            next_values[rows, columns] = self.next_position(values[rows], \
+                                            block_distance, block_learning, \
+                                            map_range, alpha, \
+                                            numpy.zeros(shape), \
+                                            partner_values=values[columns])
+        block = self.market_learning[rows, columns] + \
+                self.knowledge_learning[rows, columns]
+        self.counts['pair_evaluations'] += block.size
+        block[~self.pair_mask[rows, columns]] = 0.0
+        self.expected_learning[rows, columns] = block
+
+    def is_lazy(self):
+        '''
+        Returns whether the evaluated network is in lazy loss mode, which
+        is not used for ensembles.
+        '''
+        return bool(self.lazy_loss) and (self.number_of_networks is None)
+
+    def get_learning_with_loss(self, rows, cols):
+        '''
+        Returns the expected learning with loss of the (rows[k], cols[k])
+        pairs of the last evaluation in lazy loss mode. The values are
+        the same as the values of the expected learning matrix with loss
+        of evaluate.
+        '''
+        if self.lazy_values is None:
+            raise InputError("Error : EvaluationEngine.get_learning_with_loss method cannot be called before an evaluation in lazy loss mode.")
+        rows = numpy.asarray(rows, dtype=numpy.intp)
+        cols = numpy.asarray(cols, dtype=numpy.intp)
+        expected_learning, next_map_market, next_map_knowledge, \
+            spatial_index = self.lazy_values
+        learning = self.get_pair_values(expected_learning, rows, cols)
+        next_market = self.get_pair_values(next_map_market, rows, cols)
+        next_knowledge = self.get_pair_values(next_map_knowledge, rows, cols)
+        neighbor_count = numpy.zeros(len(rows), dtype=numpy.int32)
+        if self.loss != 0:
+            neighbor_count = spatial_index.count_in_radius_array(next_market, \
+                                                                 next_knowledge, \
+                                                                 rows, cols)
+        return self.apply_loss(learning, neighbor_count, numpy.zeros(len(rows)))
+
+    @staticmethod
+    def get_pair_values(matrix, rows, cols):
+        '''
+        Returns the values of the (rows[k], cols[k]) pairs of the matrix,
+        which is a SparseMatrix or an array, as an array.
+        '''
+        if isinstance(matrix, SparseMatrix):
+            return matrix.get_values(rows, cols)
+        return numpy.asarray(matrix, dtype=float)[rows, cols]
+
+    def get_coefficient(self, value):
+        '''
+        Returns the coefficient value as a number for a single network, or
+        as an array that is broadcast over the matrices of an ensemble.
+        '''
+        if numpy.ndim(value) == 0:
+            return value
+        value = numpy.asarray(value, dtype=float)
+        if (self.number_of_networks is None) or \
+           (len(value) != self.number_of_networks):
+            raise InputError("Error : EvaluationEngine cannot have coefficients for a different number of networks.")
+        return value[:, None, None]
+
+    def build_spatial_index(self, spatial_index, map_market, map_knowledge, \
+                            is_active):
+        '''
+        Builds the spatial index for the active agents, with a layer for
+        each network of an ensemble.
+        '''
+        if is_active.ndim == 1:
+            active = numpy.flatnonzero(is_active)
+            spatial_index.build(map_market[active], map_knowledge[active], active)
+        else:
+            layers, active = numpy.nonzero(is_active)
+            spatial_index.build(map_market[layers, active], \
+                                map_knowledge[layers, active], active, \
+                                layers, len(is_active))
+        return spatial_index
+
+    def validate(self, map_market, map_knowledge, sigma_m, sigma_k, is_active):
+        '''
+        Checks the positions and sigmas of the active agents once for the
+        whole network instead of checking them for each pair.
+        '''
+        if not (map_knowledge.shape == sigma_m.shape == sigma_k.shape == \
+                is_active.shape == map_market.shape) or (map_market.ndim > 2):
+            raise InputError("Error : EvaluationEngine.evaluate method cannot have arrays of different length.")
+        for sigma in (sigma_m[is_active], sigma_k[is_active]):
+            if numpy.any(sigma <= self.min_sigma) or numpy.any(sigma >= self.max_sigma):
+                raise InputError("Error : EvaluationEngine.evaluate method cannot have sigma_m or \
+                            sigma_k value out of range (MIN_SIGMA,MAX_SIGMA).")
+        for values, map_range in ((map_market[is_active], self.map_market), \
+                                  (map_knowledge[is_active], self.map_tech)):
+            if numpy.any(values < 0) or numpy.any(values > map_range):
+                raise InputError("Error : EvaluationEngine.evaluate method cannot have map_market \
+                            out of range [0,MAP_MARKET] or map_knowledge out of range [0,MAP_TECH].")
+
+    @staticmethod
+    def torus_distance(values, map_range, out, partner_values=None):
+        '''
+        Writes the torus distance of every pair of values into out, or of
+        every value with every partner value if they are given.
+        '''
+        if partner_values is None:
+            partner_values = values
+        numpy.subtract(values[..., :, None], partner_values[..., None, :], \
+                       out=out)
+        numpy.absolute(out, out=out)
+        wrapped = out > (map_range / 2.0)
+        out[wrapped] = map_range - out[wrapped]
+        return out
+
+    def parabola(self, distance, sigma, out, beta=None):
+        '''
+        Writes the parabola distance function result clipped at 0 into out.
+        Row i uses the sigma of agent i. beta is the coefficient given by
+        get_coefficient, BETA of the engine if it is None.
+        '''
+        if beta is None:
+            beta = self.get_coefficient(self.beta)
+        shifted = distance - sigma[..., :, None]
+        # numpy.power is used instead of ** so that the square is calculated
+        # with pow as the float ** operator does.
+        numpy.subtract(beta * shifted, numpy.power(shifted, 2.0), out=out)
+        out[out < 0] = 0.0
+        return out
+
+    def next_position(self, values, distance, learning, map_range, alpha, \
+                      out, max_tip=None, partner_values=None):
+        '''
+        Writes the next position of agent i on an axis when it makes
+        alliance with agent j into out[i][j]. The partners are the agents
+        of partner_values if they are given. alpha and max_tip are the
+        coefficients given by get_coefficient, max_tip is MAX_TIP of the
+        engine if it is None.
+        '''
+        if max_tip is None:
+            max_tip = self.get_coefficient(self.max_tip)
+        if partner_values is None:
+            partner_values = values
+        half_range = map_range / 2.0
+        difference = values[..., :, None] - partner_values[..., None, :]
+        # the inverted u is 0 for the networks whose max_tip is 0.
+        inverted_u = numpy.zeros_like(learning)
+        numpy.divide(learning, max_tip, out=inverted_u, \
+                     where=numpy.broadcast_to(max_tip != 0, learning.shape))
+        step = distance * alpha * inverted_u
+        backward = ((difference > 0) & (difference < half_range)) | \
+                   ((difference < 0) & (numpy.absolute(difference) > half_range))
+        self_values = numpy.broadcast_to(values[..., :, None], out.shape)
+        numpy.add(self_values, step, out=out)
+        numpy.subtract(self_values, step, out=out, where=backward)
+        below = out < 0
+        above = out > map_range
+        out[below] += map_range
+        out[above] -= map_range
+        return out
+
+    def count_neighbors(self, spatial_index):
+        '''
+        Counts for each pair (i, j) the active agents other than i and j
+        which are within the radius of the next position of agent i when it
+        makes alliance with agent j.
+        '''
+        if self.loss == 0:
+            self.neighbor_count.fill(0)
+            return self.neighbor_count
+        index = numpy.arange(self.size)
+        layers = None
+        if self.number_of_networks is not None:
+            layers = numpy.arange(self.number_of_networks)[:, None, None]
+        # the agent itself and its partner do not cause loss.
+        self.neighbor_count[...] = spatial_index.count_in_radius_array( \
+                                        self.next_map_market, \
+                                        self.next_map_knowledge, \
+                                        index[:, None], index[None, :], layers)
+        return self.neighbor_count
+
+    def apply_loss(self, learning, count, out):
+        '''
+        Writes into out the learning decreased by LOSS percent once for
+        each neighbor counted.
+        '''
+        out[...] = learning
+        if (self.loss == 0) or (out.size == 0):
+            return out
+        for step in range(int(count.max())):
+            lossy = count > step
+            out[lossy] -= out[lossy] * self.loss / 100
+        return out
@@ -1,5 +1,11 @@
+# The values in this file are the defaults of a Configuration. They can be
+# overridden for a run without changing this file, see configuration.py.
+
 # Number of runs
 NUMBER_OF_RUNS = 5
+# Number of worker processes that make the runs at the same time.
+# 1 -> the runs are made one after another in a single process.
+NUMBER_OF_WORKERS = 1
 # Number of cycles in each run
 NUMBER_OF_CYCLES = 500
 # Initial number of agents in the network at the beginning of each run.
@@ -27,6 +33,7 @@ ALPHA_TECH = ALPHA
 BETA = 4.0
 
 # beta=[2.0, 3.0, 4.0, 5.0, 6.0] and max_tip=[1.0, 2.25, 4.0, 6.25, 9.0]
+# i.e. max_tip = (beta / 2) ** 2, the max value of the parabola distance.
 if BETA == 2.0:
     MAX_TIP = 1.0
 elif BETA == 3.0:
@@ -37,6 +44,8 @@ elif BETA == 5.0:
     MAX_TIP = 6.25
 elif BETA == 6.0:
     MAX_TIP = 9.0
+else:
+    MAX_TIP = (BETA / 2.0) ** 2
 
 # the minimum value for an agent's cum. knowledge at the entry.
 MIN_CUM_KNOW = 0.0
@@ -75,6 +84,112 @@ LEARNING_MARGIN = 0.0
 # to be used if there is an entry.
 EXIT_MARGIN = 0.0
 
+# 1 -> Calculator methods check their input at each call, to be used for
+# tests and debugging.
+# 0 -> the input is checked once when an agent is created or moved and
+# Calculator methods skip the checks.
+CHECKED_CALCULATIONS = 0
+
+# The seed from which the random numbers of each run are derived, together
+# with the run number and the index of the parameter point. The runs are
+# reproducible and do not depend on the number of workers.
+# None -> the global random modules are used and they are not seeded.
+MASTER_SEED = None
+
+# The format of the data files.
+# 'csv' -> a csv text file for each data table, written row by row.
+# 'columnar' -> binary column files for each data table, written in chunks.
+# They are converted to the csv files with columnar_data.py.
+OUTPUT_FORMAT = 'csv'
+
+# The cycles whose map is plotted.
+# 'every' -> every PLOT_EVERY cycles and the last cycle.
+# 'list' -> the cycles in PLOT_CYCLES.
+# 'first_last' -> the first and the last cycle.
+# 'off' -> no map is plotted.
+PLOT_MODE = 'every'
+PLOT_EVERY = 1
+PLOT_CYCLES = ()
+# A plotted map is also written to pdf if its cycle is a multiple of
+# PDF_EVERY (0 -> never) or it is in PDF_CYCLES.
+PDF_EVERY = 50
+PDF_CYCLES = (249,)
+# The text of the maps is rendered with 'latex', or with 'mathtext' of
+# matplotlib which is faster since it does not start a LaTeX process.
+PLOT_TEXT = 'latex'
+
+# The number of maps that can wait to be plotted in the background.
+# When that many maps are waiting, the simulation waits for the plotter.
+# 0 -> the maps are plotted before the simulation goes on.
+PLOT_QUEUE_SIZE = 8
+
+# 1 -> the evaluation matrices of a network are updated in each cycle only
+# for the agents that have moved since the previous cycle.
+# 0 -> all pairs are evaluated in each cycle.
+INCREMENTAL_EVALUATION = 1
+
+# 1 -> the expected learning with LOSS is only calculated for the pairs
+# that can be chosen when the alliances are decided. The expected
+# learning without LOSS is its upper bound, so the pairs are taken in
+# its order and the ones that cannot be the best are not calculated.
+# The alliances are the same as with 0.
+# 0 -> the expected learning with LOSS is calculated for all pairs.
+LAZY_LOSS = 1
+
+# 1 -> only the pairs of agents whose expected learning can be positive,
+# which are within sigma + BETA of each other on an axis, are evaluated
+# and the evaluation matrices are kept as sparse matrices. It is faster
+# and needs less memory on big maps where most pairs are out of this
+# band, for instance MAP much larger than BETA with thousands of agents.
+# INCREMENTAL_EVALUATION is not used then, and the networks of an
+# ensemble are evaluated one by one.
+# 0 -> all pairs are evaluated.
+SPARSE_EVALUATION = 0
+
+# The number of runs that are made together as an ensemble whose
+# networks are evaluated in one array operation per cycle. It is faster
+# for small networks, up to about 50 agents, whose evaluation takes less
+# time than the calls that make it. It needs memory for the evaluation
+# matrices of all networks of the ensemble.
+# 1 -> each run is made alone.
+ENSEMBLE_SIZE = 1
+
+# The phases of the cycles are timed and their times are written to
+# data_timing.txt in the output directory, as the seconds and the number
+# of calls of each phase of each run. The time of a phase does not
+# include the time of the phases started in it, such as the writing of
+# the cycle data ('output'). The work of the cycles, such as the pair
+# evaluations, the neighbor checks for LOSS and the alliance attempts, is
+# counted and written to data_counter.txt.
+# 'off' -> nothing is timed or counted.
+# 'run' -> the times and the counters are summed up for each run.
+# 'cycle' -> the times and the counters of each cycle are also written to
+# data_timing_cycle.txt and data_counter_cycle.txt.
+TIMING = 'off'
+
+# The state of a run is written to checkpoint.bin in the directory of
+# its data files every CHECKPOINT_EVERY cycles and at its end. With
+# RESUME = 1 the runs continue from their checkpoints, the data files are
+# cut back to the rows written until the checkpoint, and the finished
+# runs are not made again. Runs in ensembles are not checkpointed.
+# 0 -> no checkpoint is written.
+CHECKPOINT_EVERY = 0
+RESUME = 0
+
+# The level of the messages written while the runs are made.
+# 'auto' -> 'info' when the runs are made in the main process, 'warning'
+# when they are made by worker processes.
+# 'debug' -> the values of each cycle, the breakthroughs and the sigma
+# values are also written.
+# 'info' -> the progress of each run is written.
+# 'warning', 'error' -> nothing is written unless something goes wrong.
+LOG_LEVEL = 'auto'
+
+# The minimum number of seconds between two progress messages of a run,
+# which give the cycles made per second and the time until the end of
+# the run.
+PROGRESS_INTERVAL = 10.0
+
 # File names
 CYCLE_MAP = 'cycle_map'
 
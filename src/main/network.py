@@ -1,11 +1,19 @@
+import numpy
 from random_sigma import RandomSigma
 from agent import Agent
+from population import Population
 from plotter import Plotter
+from plot_policy import PlotPolicy
 from calculator import Calculator
-import random
+from evaluation_engine import EvaluationEngine
+from torus_grid import TorusGrid
+from alliance_matcher import AllianceMatcher
+from phase_timer import PhaseTimer
+from work_counter import WorkCounter
 from twisted.python.formmethod import InputError
-from global_values import EXIT_MARGIN, MAP_MARKET, ALPHA_MARKET,\
-    MAP_TECH, ALPHA_TECH, LOSS, ALLIANCE_MARGIN, CYCLE_MAP, R
+from configuration import Configuration
+from random_stream import RandomStream
+from simulation_log import SimulationLog
 
 class Network(object):
     '''
@@ -13,21 +21,53 @@ class Network(object):
     and organizes their relationship. 
     '''
 
-    def __init__(self, number_of_agents, cyclic_data):
+    def __init__(self, number_of_agents, observer, config=None, \
+                 random_stream=None, plot_renderer=None, state=None):
         '''
         Constructor of the Network class. Initializes the network 
-        with specified number of agents.
+        with specified number of agents. The parameters are taken from
+        config, the default configuration if it is None, which is also
+        set as the configuration of Calculator. All random values of the
+        network and its agents are drawn from random_stream, the global
+        random modules if it is None. The maps are plotted by
+        plot_renderer in the background, or by Plotter if it is None.
+        The results of the cycles are given to observer, a CycleObserver
+        such as CyclicData.
+        If state is given, the network is restored from this state
+        returned by get_state instead of being created.
         '''
-        cyclic_data.set_cycle(0)
+        if config is None:
+            config = Configuration.get_default()
+        if random_stream is None:
+            random_stream = RandomStream.get_global()
+        # The configuration that gives the parameters of the network.
+        self.config = config
+        # The stream that the random values of the network are drawn from.
+        self.random_stream = random_stream
+        # The renderer that the maps are given to, None if they are
+        # plotted before plot_map returns.
+        self.plot_renderer = plot_renderer
+        # The policy that decides the cycles whose map is plotted.
+        self.plot_policy = PlotPolicy(config.PLOT_MODE, \
+                                      config.NUMBER_OF_CYCLES, \
+                                      config.PLOT_EVERY, config.PLOT_CYCLES, \
+                                      config.PDF_EVERY, config.PDF_CYCLES)
+        Calculator.set_config(config)
+        observer.set_cycle(0)
         # sigma is used as a parameter to create an agent. Each created agent 
         # takes the sigma instance and gets its sigma_m and sigma_k values
         # from the next value pair in sigma.
-        self.sigma = RandomSigma()
-        # cyclic_data is used to write the necessary values to file
-        self.cyclic_data = cyclic_data
+        self.sigma = RandomSigma(config, random_stream)
+        # The observer that the results of the cycles are given to.
+        self.observer = observer
+        # The logger of the values of the cycles.
+        self.logger = SimulationLog.get_logger()
+        # The columns of the values of all agents in the network.
+        self.population = Population(max(number_of_agents, 1))
         # The list of agents in the network. Both active and inactive agents
-        # are contained in this array.
-        self.agents = []
+        # are contained in this array. Each agent is a view over its row
+        # in the population and is added to the list when it is created.
+        self.agents = self.population.agents
         # The array that stores the expected learning of each agent in
         # the network from every other agent in the network.
         self.expected_learning_matrix = []
@@ -36,13 +76,72 @@ class Network(object):
         # network. LOSS is applied to expected learnings depending on
         # the number of agents in a specified radius for foreseen in
         # the next position. This matrix is used to decide alliances.
+        # It is None with LAZY_LOSS, when the values with loss are only
+        # calculated for the pairs tried by the alliance matcher.
         self.expected_learning_matrix_with_loss = []
+        # The engine that calculates both evaluation matrices with array
+        # operations. It keeps its buffers between cycles.
+        self.evaluation_engine = EvaluationEngine(config.MAP_MARKET, \
+                                                  config.MAP_TECH, \
+                                                  config.ALPHA_MARKET, \
+                                                  config.ALPHA_TECH, \
+                                                  config.BETA, config.MAX_TIP, \
+                                                  config.LOSS, config.R, \
+                                                  config.MIN_SIGMA, \
+                                                  config.MAX_SIGMA, \
+                                                  config.INCREMENTAL_EVALUATION, \
+                                                  config.LAZY_LOSS)
+        # The spatial index of the active agent positions that is used to
+        # count the agents in radius R when LOSS is applied. It is built
+        # by build_spatial_index method whenever the agents are moved.
+        self.spatial_index = TorusGrid(config.MAP_MARKET, config.MAP_TECH, \
+                                       config.R)
+        # The matcher that decides the alliances from the evaluation matrix.
+        self.alliance_matcher = AllianceMatcher(self.accepts_alliance)
+        # The timer that measures the phases of the cycles in TIMING mode.
+        self.phase_timer = PhaseTimer(config.TIMING)
+        # The counter of the work of the cycles in TIMING mode.
+        self.work_counter = WorkCounter(config.TIMING)
         # The sum of cum_knowledge of all active agents in the network.
         self.total_cum_knowledge = 0.0
         # The average cum_knowledge of agents in the network
         self.average_agent_cum_knowledge = 0.0
         # Creates the network
-        self.create_initial_network(number_of_agents)
+        if state is None:
+            self.create_initial_network(number_of_agents)
+        else:
+            self.set_state(state)
+
+    def get_state(self):
+        '''
+        Returns the state of the network between two cycles: the columns
+        of the agents, the network totals, the region of the sigma
+        generator and the phase times and the work counted so far. The
+        random stream is not included.
+        '''
+        return {'population': self.population.get_state(), \
+                'agent_ids': [agent.agent_id for agent in self.agents], \
+                'total_cum_knowledge': self.total_cum_knowledge, \
+                'average_agent_cum_knowledge': self.average_agent_cum_knowledge, \
+                'sigma_region': self.sigma.region, \
+                'phase_timer': self.phase_timer, \
+                'work_counter': self.work_counter}
+
+    def set_state(self, state):
+        '''
+        Restores the state returned by get_state. The agents are the views
+        of the restored rows of the population. In incremental mode the
+        first evaluation after the restore calculates all pairs.
+        '''
+        self.population.set_state(state['population'])
+        for index, agent_id in enumerate(state['agent_ids']):
+            self.agents.append(Agent.view(agent_id, self.population, index, \
+                                          self.config, self.random_stream))
+        self.total_cum_knowledge = state['total_cum_knowledge']
+        self.average_agent_cum_knowledge = state['average_agent_cum_knowledge']
+        self.sigma.region = state['sigma_region']
+        self.phase_timer = state['phase_timer']
+        self.work_counter = state['work_counter']
     
     def create_initial_network(self, number_of_agents):
         '''
@@ -55,38 +154,30 @@ class Network(object):
             raise InputError("Error : Network.create_initial_network method  \
                               cannot have number_of_agents less than 0.")
         for i in range(number_of_agents):
-            agent = Agent(i, 0, self.sigma)
-            self.agents.append(agent)
-            self.cyclic_data.append_agent(agent.agent_id, agent.entry_cycle, \
-                                          agent.sigma_m, agent.sigma_k)
-            self.cyclic_data.append_agent_cycle(agent.agent_id, \
-                                                agent.map_market, \
-                                                agent.map_knowledge,
-                                                agent.cum_knowledge, \
-                                                agent.cycle_realized_learning)
+            agent = Agent(i, 0, self.sigma, self.population, self.config, \
+                          self.random_stream)
             self.total_cum_knowledge += agent.cum_knowledge
+        self.append_agents(range(number_of_agents))
         try :
             self.average_agent_cum_knowledge = self.total_cum_knowledge / number_of_agents
         except : 
             pass
-        self.cyclic_data.append_network(number_of_agents, \
-                                        self.total_cum_knowledge, 0, \
-                                        self.average_agent_cum_knowledge, \
-                                        0, 0, 0)
+        self.observer.append_network(number_of_agents, \
+                                     self.total_cum_knowledge, 0, \
+                                     self.average_agent_cum_knowledge, \
+                                     0, 0, 0)
             
     def reset(self):
         '''
         Resets the network values to beginning values of a cycle.
         All agent values for active agents must also be reseted. 
         '''
-        num_agent = len(self.agents)
-        for agent_index in range(num_agent):
-            agent = self.agents[agent_index]
-            if (agent.is_active):
-                agent.reset()
+        self.phase_timer.start('reset')
+        self.population.reset()
         self.average_agent_cum_knowledge = 0.0 
         self.expected_learning_matrix = []
         self.expected_learning_matrix_with_loss = []
+        self.phase_timer.stop()
 
     def calculate_network(self):
         '''
@@ -95,113 +186,139 @@ class Network(object):
         Depending on alliances calculates the values of new network.
         '''
         self.create_evaluation_matrices()
+        self.apply_evaluation_matrices(self.expected_learning_matrix, \
+                                       self.expected_learning_matrix_with_loss)
+
+    def apply_evaluation_matrices(self, expected_learning_matrix, \
+                                  expected_learning_matrix_with_loss):
+        '''
+        Establishes alliances with the given evaluation matrices of the
+        network and calculates the values of the new network. The matrices
+        are created by create_evaluation_matrices, or for all networks of
+        an ensemble at once.
+        '''
+        self.expected_learning_matrix = expected_learning_matrix
+        self.expected_learning_matrix_with_loss = expected_learning_matrix_with_loss
         # Decides alliances depending on the expected_learning_matrix_with
         # loss. If loss is not to be considered can be changed with
         # expected_learning_matrix.
-        self.make_network_alliances(self.expected_learning_matrix_with_loss)
+        self.phase_timer.start('matching')
+        if self.expected_learning_matrix_with_loss is None:
+            self.make_network_alliances_with_bounds(self.expected_learning_matrix)
+        else:
+            self.make_network_alliances(self.expected_learning_matrix_with_loss)
+        self.phase_timer.stop()
+        self.phase_timer.start('realized_learning')
         self.calculate_realized_learning()
-        
+        self.phase_timer.stop()
+        self.count_work()
+
+    def count_work(self):
+        '''
+        Adds the work counted by the evaluation engine, the spatial
+        indexes and the alliance matcher to the work counter.
+        '''
+        for counts in (self.evaluation_engine.counts, \
+                       self.evaluation_engine.spatial_index.counts, \
+                       self.evaluation_engine.pair_index.counts, \
+                       self.spatial_index.counts, self.alliance_matcher.counts):
+            self.work_counter.take(counts)
+
     def create_evaluation_matrices(self):
         """ 
         Creates the expected_learning_matrix and 
         expected_learning_matrix_with_loss 
         to make evaluation for alliances.
         """
-        num_agent = len(self.agents)
-        # first, create an empty expected_learning_matrix
-        self.expected_learning_matrix = Calculator.init_matrix(num_agent, 0)
-        # first, create an empty expected_learning_matrix
-        self.expected_learning_matrix_with_loss = Calculator.init_matrix(num_agent, 0)
+        self.phase_timer.start('evaluation')
+        population = self.population
+        self.build_spatial_index()
+        # with SPARSE_EVALUATION the matrices are SparseMatrix instances
+        # of the candidate pairs.
+        evaluate = self.evaluation_engine.evaluate
+        if self.config.SPARSE_EVALUATION:
+            evaluate = self.evaluation_engine.evaluate_sparse
+        self.expected_learning_matrix, self.expected_learning_matrix_with_loss = \
+            evaluate(population['map_market'], population['map_knowledge'], \
+                     population['sigma_m'], population['sigma_k'], \
+                     population['is_active'], self.spatial_index)
+        self.phase_timer.stop()
 
-        # start the calculation for the expected_learning_matrix
-        for agent_index in range(num_agent):
-            for partner_index in range(num_agent):
-                if (agent_index != partner_index):
-                    if (self.agents[agent_index].is_active) and (self.agents[partner_index].is_active):
-                        agent = self.agents[agent_index]
-                        partner = self.agents[partner_index]
-                        self_map_market = agent.map_market
-                        self_map_knowledge = agent.map_knowledge
-            
-                        partner_map_market = partner.map_market
-                        partner_map_knowledge = partner.map_knowledge
-                        # then, expected learning calculation btw two firms 
-                        # are inserted into expected_learning_matrix
-                        self.expected_learning_matrix[agent_index][partner_index] = \
-                        Calculator.calculate_expected_learning(agent.sigma_m, \
-                                                    agent.sigma_k, \
-                                                    self_map_market, \
-                                                    self_map_knowledge, \
-                                                    partner_map_market, \
-                                                    partner_map_knowledge)
-                        # prepares to calculate expected learning with loss
-                        next_map_market = Calculator.calculate_next_position(self_map_market, \
-                                                    partner_map_market, \
-                                                    MAP_MARKET, \
-                                                    ALPHA_MARKET, \
-                                                    agent.sigma_m)
-                        next_map_knowledge = \
-                        Calculator.calculate_next_position(self_map_knowledge,\
-                                                partner_map_knowledge, \
-                                                MAP_TECH, \
-                                                ALPHA_TECH, agent.sigma_k)
-                        
-                        self.expected_learning_matrix_with_loss[agent_index][partner_index] = \
-                            self.calculate_learning_after_loss( \
-                                        next_map_market, \
-                                        next_map_knowledge, \
-                                        agent_index, partner_index, \
-                                        self.expected_learning_matrix[agent_index][partner_index])
-                
     def make_network_alliances(self, evaluation_matrix):
         """
         Evaluate the expected learning matrix to find reasonable partnerships
-        based on the max learning found within the matrix.
+        based on the max learning found within the matrix. The pairs are
+        tried in descending order of expected learning and each agent makes
+        at most one alliance.
         """
-        num_agent = len(self.agents)
-        # create a local copy of the expected learning matrix
-        local_expected_learning_matrix = list(evaluation_matrix)
-        # find the maximum expected learning within the local matrix
-        max_sys_expected_learning = max(max(l) for l in \
-                                      local_expected_learning_matrix)
-        while max_sys_expected_learning:
-            for agent_index in range(num_agent):
-                for partner_index in range(num_agent):
-                    if (agent_index != partner_index):
-                        agent = self.agents[agent_index]
-                        partner = self.agents[partner_index]
-                        if (agent.is_active) and (partner.is_active):
-                            # find the placement of the max value within the expected learning
-                            if local_expected_learning_matrix[agent_index][partner_index] == max_sys_expected_learning:
-                                self.try_alliance(agent_index, partner_index, local_expected_learning_matrix)
-            max_sys_expected_learning = max(max(l) for l in local_expected_learning_matrix)
+        rows, cols, values, reverse_values = \
+            AllianceMatcher.get_candidates(evaluation_matrix)
+        alliances = self.alliance_matcher.match(rows, cols, values, \
+                                                reverse_values, \
+                                                len(self.agents))
+        self.form_alliances(alliances)
+
+    def make_network_alliances_with_bounds(self, evaluation_matrix):
+        """
+        Makes the same alliances as make_network_alliances with the
+        expected learning matrix with loss, when only evaluation_matrix,
+        the expected learning matrix without loss, is calculated. Loss can
+        only decrease the expected learning, so the values of
+        evaluation_matrix are upper bounds and the values with loss are
+        calculated by the evaluation engine only for the pairs that can
+        be tried.
+        """
+        rows, cols, values, reverse_values = \
+            AllianceMatcher.get_candidates(evaluation_matrix)
+        alliances = self.alliance_matcher.match_with_bounds(rows, cols, values, \
+                        self.evaluation_engine.get_learning_with_loss, \
+                        len(self.agents))
+        self.form_alliances(alliances)
 
     def calculate_realized_learning(self):
         """
         Calculates the realized learning of agents after position change 
-        in the network. 
+        in the network. The realized learnings, the cum_knowledge values
+        and the network statistics are calculated with array operations
+        over the population columns, and the agent data of the cycle is
+        written with the network data as one block.
         """
-        num_agent = len(self.agents)
-        num_active_agents = 0
+        population = self.population
+        # the agents have moved after making alliances.
+        self.build_spatial_index()
+        active = population.get_active()
+        allied = active[population['partner'][active] >= 0]
+        partners = population['partner'][allied].astype(numpy.intp)
+        expected_learning = EvaluationEngine.get_pair_values( \
+                                self.expected_learning_matrix, allied, partners)
+        neighbor_count = numpy.zeros(len(allied), dtype=numpy.int32)
+        if self.config.LOSS != 0:
+            # Do not cause loss if the agent is the one that this
+            # agent makes alliance
+            neighbor_count = self.spatial_index.count_in_radius_array( \
+                                population['map_market'][allied], \
+                                population['map_knowledge'][allied], \
+                                allied, partners)
+        realized_learning = self.evaluation_engine.apply_loss(expected_learning, \
+                                                              neighbor_count, \
+                                                              numpy.zeros(len(allied)))
+        population['cycle_realized_learning'][allied] = realized_learning
+        population['cum_knowledge'][allied] += realized_learning
+
+        cum_knowledge = population['cum_knowledge'][active]
+        num_active_agents = len(active)
+        # the sums are accumulated one agent after another in row order,
+        # as cumsum does, so they do not depend on the summation order.
         network_total_realized_learning = 0.0
+        if len(allied):
+            network_total_realized_learning = float(numpy.cumsum(realized_learning)[-1])
+        self.average_agent_cum_knowledge = float(numpy.cumsum( \
+            numpy.concatenate(([self.average_agent_cum_knowledge], cum_knowledge)))[-1])
         min_agent_cum_knowledge = 10000000.0
         max_agent_cum_knowledge = 0.0
-        for agent_index in range(num_agent):
-            agent = self.agents[agent_index]
-            if (agent.is_active):
-                num_active_agents += 1
-                if (agent.alliance != None):
-                    agent.cycle_realized_learning = self.calculate_learning_after_loss(agent.map_market, agent.map_knowledge,\
-                                                                            agent_index, agent.alliance.agent_id, 
-                                                                            self.expected_learning_matrix[agent_index][agent.alliance.agent_id])
-                    agent.cum_knowledge += agent.cycle_realized_learning
-                    network_total_realized_learning += agent.cycle_realized_learning
-                    
-                self.cyclic_data.append_agent_cycle(agent.agent_id, agent.map_market, agent.map_knowledge, \
-                                              agent.cum_knowledge, agent.cycle_realized_learning)
-                self.average_agent_cum_knowledge += agent.cum_knowledge
-                min_agent_cum_knowledge = min(min_agent_cum_knowledge, agent.cum_knowledge)
-                max_agent_cum_knowledge = max(max_agent_cum_knowledge, agent.cum_knowledge)
+        if num_active_agents:
+            min_agent_cum_knowledge = min(min_agent_cum_knowledge, float(cum_knowledge.min()))
+            max_agent_cum_knowledge = max(max_agent_cum_knowledge, float(cum_knowledge.max()))
         
         # Adds realized learnings to network's total cum_knowledge
         self.total_cum_knowledge += network_total_realized_learning
@@ -216,20 +333,31 @@ class Network(object):
         except ZeroDivisionError:
             pass
          
-        self.cyclic_data.append_network(num_active_agents, \
-                                        self.total_cum_knowledge, \
-                                        network_total_realized_learning, \
-                                        self.average_agent_cum_knowledge, \
-                                        average_agent_realized_learning, \
-                                        min_agent_cum_knowledge, \
-                                        max_agent_cum_knowledge)
-        print 'number_of_agents', num_active_agents
-        print 'network_total_cum_knowledge', self.total_cum_knowledge
-        print 'cycle_total_realized_learning', network_total_realized_learning
-        print 'avegare_agent_cum_knowledge', self.average_agent_cum_knowledge
-        print 'average_agent_realized_learning', average_agent_realized_learning
-        print 'min_agent_cum_knowledge', min_agent_cum_knowledge
-        print 'max_agent_cum_knowledge', max_agent_cum_knowledge
+        self.phase_timer.start('output')
+        self.observer.append_cycle(active, population['map_market'][active], \
+                                   population['map_knowledge'][active], \
+                                   cum_knowledge, \
+                                   population['cycle_realized_learning'][active], \
+                                   (num_active_agents, \
+                                    self.total_cum_knowledge, \
+                                    network_total_realized_learning, \
+                                    self.average_agent_cum_knowledge, \
+                                    average_agent_realized_learning, \
+                                    min_agent_cum_knowledge, \
+                                    max_agent_cum_knowledge))
+        self.phase_timer.stop()
+        self.logger.debug('number_of_agents %s\n' \
+                          'network_total_cum_knowledge %s\n' \
+                          'cycle_total_realized_learning %s\n' \
+                          'average_agent_cum_knowledge %s\n' \
+                          'average_agent_realized_learning %s\n' \
+                          'min_agent_cum_knowledge %s\n' \
+                          'max_agent_cum_knowledge %s', num_active_agents, \
+                          self.total_cum_knowledge, \
+                          network_total_realized_learning, \
+                          self.average_agent_cum_knowledge, \
+                          average_agent_realized_learning, \
+                          min_agent_cum_knowledge, max_agent_cum_knowledge)
     
     def manage_exit(self):
         """
@@ -237,13 +365,15 @@ class Network(object):
         network_average_firm_cum_knowledge * EXIT MARGIN % from network. 
         """
         num_agent = len(self.agents)
+        exits = []
         for agent_index in range(num_agent):
             agent = self.agents[agent_index]
             if (agent.is_active):
                 if (agent.cum_knowledge < (self.average_agent_cum_knowledge \
-                                           * EXIT_MARGIN / 100)):
+                                           * self.config.EXIT_MARGIN / 100)):
                     agent.exit()
-                    self.cyclic_data.append_agent_exit(agent.agent_id)
+                    exits.append(agent.agent_id)
+        self.observer.append_agent_exits(exits)
 
     def manage_entry(self, num_entry, cycle_num):
         """
@@ -251,32 +381,51 @@ class Network(object):
         """
         num_agent = len(self.agents)
         for i in range(num_entry):
-            agent = Agent(num_agent, cycle_num, self.sigma)
-            self.agents.append(agent)
-            self.cyclic_data.append_agent(agent.agent_id, agent.entry_cycle, \
-                                          agent.sigma_m, agent.sigma_k)
-            self.cyclic_data.append_agent_cycle(agent.agent_id, \
-                                                agent.map_market, \
-                                                agent.map_knowledge, \
-                                                agent.cum_knowledge, \
-                                                agent.cycle_realized_learning)
-            num_agent += 1
+            agent = Agent(num_agent + i, cycle_num, self.sigma, \
+                          self.population, self.config, self.random_stream)
+        self.append_agents(range(num_agent, num_agent + num_entry))
+
+    def append_agents(self, indices):
+        '''
+        Gives the agents in the given rows, which are created in the
+        current cycle, and their first positions to the observer as
+        blocks. The id of an agent is its row.
+        '''
+        indices = numpy.array(indices, dtype=numpy.intp)
+        population = self.population
+        self.observer.append_agents(indices, \
+                                    population['entry_cycle'][indices], \
+                                    population['sigma_m'][indices], \
+                                    population['sigma_k'][indices])
+        self.observer.append_agent_cycles(indices, \
+                                          population['map_market'][indices], \
+                                          population['map_knowledge'][indices], \
+                                          population['cum_knowledge'][indices], \
+                                          population['cycle_realized_learning'][indices])
             
     def manage_breakthrough(self, num_entry):
         """
         NUM_ENTRY number of agents change their place in the map
         """
+        self.phase_timer.start('breakthrough')
         num_agent = len(self.agents)
+        # the (agent_id, map_market, map_knowledge, new_map_market,
+        # new_map_knowledge) rows of the breakthroughs in their order.
+        rows = []
         for i in range(num_entry):
-            agent_id = random.randint(0, num_agent - 1)
-            print "breakthrough---------------", agent_id
+            agent_id = self.random_stream.randint(0, num_agent - 1)
+            self.logger.debug("breakthrough--------------- %d", agent_id)
             agent = self.agents[agent_id]
             ex_map_knowledge = agent.map_knowledge
             ex_map_market = agent.map_market
             agent.move_on_breakthrough()
-            self.cyclic_data.append_agent_breakthrough(agent.agent_id, \
-                ex_map_market, ex_map_knowledge, agent.map_market, \
-                agent.map_knowledge)
+            rows.append((agent.agent_id, ex_map_market, ex_map_knowledge, \
+                         agent.map_market, agent.map_knowledge))
+        self.phase_timer.start('output')
+        self.observer.append_breakthroughs(*[[row[k] for row in rows] \
+                                             for k in range(5)])
+        self.phase_timer.stop()
+        self.phase_timer.stop()
         
     def calculate_learning_after_loss(self, map_market, map_knowledge, \
                                       agent_index, partner_index, \
@@ -284,27 +433,33 @@ class Network(object):
         '''
         Returns the expected learning with loss for the agent with 
         specified index for the specified market and knowledge values 
-        on the map.
+        on the map. The neighbors are counted with the spatial index, so
+        build_spatial_index must be called after the agents move.
         '''
-        num_agent = len(self.agents)
         possible_learning = expected_learning
-        for i in range(num_agent):
-            # Do not cause loss if the agent is the one that this
-            # agent makes alliance
-            if (i != agent_index) and (i != partner_index):
-                neighbor = self.agents[i]
-                if (neighbor.is_active):
-                    neighbor_map_market = neighbor.map_market
-                    neighbor_map_knowledge = neighbor.map_knowledge
-                    
-                    if (Calculator.is_in_torus_radius(map_market, \
-                                                      neighbor_map_market, \
-                                                      map_knowledge, \
-                                                      neighbor_map_knowledge,\
-                                                      R, MAP_MARKET, MAP_TECH)):
-                        # apply loss to the expected learning
-                        possible_learning -= possible_learning * LOSS / 100
+        loss = self.config.LOSS
+        if loss == 0:
+            return possible_learning
+        # Do not cause loss if the agent is the one that this
+        # agent makes alliance
+        num_neighbors = self.spatial_index.count_in_radius(map_market, \
+                                                           map_knowledge, \
+                                                           agent_index, \
+                                                           partner_index)
+        for i in range(num_neighbors):
+            # apply loss to the expected learning
+            possible_learning -= possible_learning * loss / 100
         return possible_learning
+
+    def build_spatial_index(self):
+        '''
+        Builds the spatial index for the current positions of the active
+        agents. It must be called again after the agents move.
+        '''
+        active = self.population.get_active()
+        self.spatial_index.build(self.population['map_market'][active], \
+                                 self.population['map_knowledge'][active], \
+                                 active)
     
     def try_alliance(self, agent_index, partner_index, learning_matrix):
         '''
@@ -318,25 +473,69 @@ class Network(object):
         the system is re-determined.
         '''
         if self.can_make_alliance(agent_index, partner_index, learning_matrix):
-            agent = self.agents[agent_index] 
-            partner = self.agents[partner_index]
-            agent.make_alliance(partner)
-            self.cyclic_data.append_alliance(agent_index, partner_index)
+            self.form_alliance(agent_index, partner_index)
             # when the alliance deal is OK
             # nullify the agent_index and partner_index values
             Calculator.reset_row_column(agent_index, partner_index, \
                                         learning_matrix)
-            
-            # After making alliance calculates the next point for partners
-            agent.calculate_next_position()
-            partner.calculate_next_position()
-            # and then moves them to their new position on the map.
-            agent.move_next_position()
-            partner.move_next_position()
-
         else:
             # if the deal fail then nullify the max value to find the next one
             learning_matrix[agent_index][partner_index] = 0
+
+    def form_alliances(self, alliances):
+        '''
+        Makes the given (agent_index, partner_index) alliances, gives them
+        to the observer and then moves the agents of all alliances to their
+        next positions at once. An agent makes at most one alliance, so
+        the next positions of both agents of an alliance are calculated
+        from their positions before the alliances, as form_alliance does.
+        '''
+        alliances = numpy.array(alliances, dtype=numpy.intp).reshape(-1, 2)
+        self.phase_timer.start('output')
+        self.observer.append_alliances(alliances[:, 0], alliances[:, 1])
+        self.phase_timer.stop()
+        if not len(alliances):
+            return
+        agents = numpy.concatenate((alliances[:, 0], alliances[:, 1]))
+        partners = numpy.concatenate((alliances[:, 1], alliances[:, 0]))
+        population = self.population
+        population['partner'][agents] = partners
+        next_map_market, next_map_knowledge = \
+            self.evaluation_engine.get_next_positions(population['map_market'], \
+                                                      population['map_knowledge'], \
+                                                      population['sigma_m'], \
+                                                      population['sigma_k'], \
+                                                      agents, partners)
+        # the agents whose next position is 0.0 on both axes are not moved
+        # as in Agent.move_next_position.
+        moved = (next_map_market != 0) | (next_map_knowledge != 0)
+        agents = agents[moved]
+        next_map_market = next_map_market[moved]
+        next_map_knowledge = next_map_knowledge[moved]
+        if not Calculator.checked and len(agents):
+            for values, map_range in ((next_map_market, self.config.MAP_MARKET), \
+                                      (next_map_knowledge, self.config.MAP_TECH)):
+                Calculator.validate_position(values.min(), map_range)
+                Calculator.validate_position(values.max(), map_range)
+        population['map_market'][agents] = next_map_market
+        population['map_knowledge'][agents] = next_map_knowledge
+
+    def form_alliance(self, agent_index, partner_index):
+        '''
+        Makes the alliance between the agents in the given agent_index and
+        partner_index, gives it to the observer and moves both agents to
+        their next positions.
+        '''
+        agent = self.agents[agent_index] 
+        partner = self.agents[partner_index]
+        agent.make_alliance(partner)
+        self.observer.append_alliances([agent_index], [partner_index])
+        # After making alliance calculates the next point for partners
+        agent.calculate_next_position()
+        partner.calculate_next_position()
+        # and then moves them to their new position on the map.
+        agent.move_next_position()
+        partner.move_next_position()
             
     def can_make_alliance(self, agent_index, partner_index, learning_matrix):
         """
@@ -350,10 +549,21 @@ class Network(object):
         """
         agent_expected_learning = learning_matrix[agent_index][partner_index]
         partner_expected_learning = learning_matrix[partner_index][agent_index] 
+        return self.accepts_alliance(agent_index, partner_index, \
+                                     agent_expected_learning, \
+                                     partner_expected_learning)
+
+    def accepts_alliance(self, agent_index, partner_index, \
+                         agent_expected_learning, partner_expected_learning):
+        """
+        Checks the conditions of can_make_alliance for the given expected
+        learnings of the agent with agent_index from the agent with
+        partner_index and of the partner from the agent.
+        """
         if (agent_expected_learning == 0 and partner_expected_learning == 0):
             return 0
         else :
-            return ((Calculator.get_difference_percentage(agent_expected_learning, partner_expected_learning) <= ALLIANCE_MARGIN) and \
+            return ((Calculator.get_difference_percentage(agent_expected_learning, partner_expected_learning) <= self.config.ALLIANCE_MARGIN) and \
                 (self.agents[agent_index].in_learning_margin(agent_expected_learning)) and \
                 (self.agents[partner_index].in_learning_margin(partner_expected_learning)))
             
@@ -363,24 +573,22 @@ class Network(object):
         and knowledge map. Market values are shown on x-axis and knowledge 
         values are shown on y-axis. The size of the circle that represents 
         the agent is determined by the value of its cum_knowledge.
+        The values are copied from the population, so the plot can be
+        rendered in the background while the agents move. Only the cycles
+        of the plot policy are plotted.
         '''
         if (run_num < 0) or (cycle_num < 0):
             raise InputError("Error : Network.plot_map method cannot have negative run_num or \
                             cycle_num")
-        map_market = []
-        map_knowledge = []
-        cum_knowledge = []
-        num_agent = 0
-        
-        for agent_index in range(len(self.agents)):
-            agent = self.agents[agent_index]
-            if (agent.is_active):
-                num_agent += 1
-                map_market.append(agent.map_market)
-                map_knowledge.append(agent.map_knowledge)
-                cum_knowledge.append(agent.cum_knowledge)
+        if not self.plot_policy.is_plotted(cycle_num):
+            return
+        active = self.population.get_active()
+        map_market = self.population['map_market'][active]
+        map_knowledge = self.population['map_knowledge'][active]
+        cum_knowledge = self.population['cum_knowledge'][active]
+        num_agent = len(active)
 
-        file_name = 'RUN' + str(run_num) + "_" + CYCLE_MAP
+        file_name = 'RUN' + str(run_num) + "_" + self.config.CYCLE_MAP
         
         # putting file names in order 
         if cycle_num < 10:
@@ -392,12 +600,13 @@ class Network(object):
         file_name += '%d' % cycle_num
         fig_title = str(num_agent) + " Agents, Cycle " + str(cycle_num)
 
-        if (cycle_num % 50 == 0) or (cycle_num == 249): 
-            print_pdf = 1
-        else:
-            print_pdf = 0
-        Plotter.scatter(fig_title, file_name, map_market, \
+        print_pdf = self.plot_policy.is_printed_to_pdf(cycle_num)
+        plotter = Plotter
+        if self.plot_renderer is not None:
+            plotter = self.plot_renderer
+        plotter.scatter(fig_title, file_name, map_market, \
                           map_knowledge, cum_knowledge, 'Market', 'Knowledge', \
-                          MAP_MARKET, MAP_TECH, print_pdf)
+                          self.config.MAP_MARKET, self.config.MAP_TECH, \
+                          print_pdf, self.config.OUTPUT_DIR)
 
     
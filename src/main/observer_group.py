@@ -0,0 +1,119 @@
+from cycle_observer import CycleObserver
+
+
+class ObserverGroup(CycleObserver):
+    '''
+    ObserverGroup gives the blocks of a run to several observers in the
+    given order, for instance to a CyclicData that writes them to files
+    and to a CycleRecorder that keeps them in memory. The offsets of a
+    group are the offsets of its observers, so a run with a group is
+    resumed from a checkpoint only if one of them writes files.
+    '''
+
+    def __init__(self, observers):
+        '''
+        Constructor
+        '''
+        # The observers that the blocks are given to.
+        self.observers = list(observers)
+
+    def set_run(self, run_number):
+        '''
+        Sets the run of the following blocks of the observers.
+        '''
+        for observer in self.observers:
+            observer.set_run(run_number)
+
+    def set_cycle(self, cycle_number):
+        '''
+        Sets the cycle of the following blocks of the observers.
+        '''
+        for observer in self.observers:
+            observer.set_cycle(cycle_number)
+
+    def append_agents(self, agent_ids, entry_cycles, sigma_m, sigma_k):
+        '''
+        Gives the agents created in the cycle to the observers.
+        '''
+        for observer in self.observers:
+            observer.append_agents(agent_ids, entry_cycles, sigma_m, sigma_k)
+
+    def append_agent_cycles(self, agent_ids, map_market, map_knowledge, \
+                            capital, realized_learning):
+        '''
+        Gives the agent cycles to the observers.
+        '''
+        for observer in self.observers:
+            observer.append_agent_cycles(agent_ids, map_market, \
+                                         map_knowledge, capital, \
+                                         realized_learning)
+
+    def append_network(self, *network):
+        '''
+        Gives the network summary of the cycle to the observers.
+        '''
+        for observer in self.observers:
+            observer.append_network(*network)
+
+    def append_cycle(self, agent_ids, map_market, map_knowledge, capital, \
+                     realized_learning, network):
+        '''
+        Gives the agent cycles and the network summary to the observers.
+        '''
+        for observer in self.observers:
+            observer.append_cycle(agent_ids, map_market, map_knowledge, \
+                                  capital, realized_learning, network)
+
+    def append_alliances(self, agent_ids1, agent_ids2):
+        '''
+        Gives the alliances of the cycle to the observers.
+        '''
+        for observer in self.observers:
+            observer.append_alliances(agent_ids1, agent_ids2)
+
+    def append_breakthroughs(self, agent_ids, map_market, map_knowledge, \
+                             new_map_market, new_map_knowledge):
+        '''
+        Gives the breakthroughs of the cycle to the observers.
+        '''
+        for observer in self.observers:
+            observer.append_breakthroughs(agent_ids, map_market, \
+                                          map_knowledge, new_map_market, \
+                                          new_map_knowledge)
+
+    def append_agent_exits(self, agent_ids):
+        '''
+        Gives the agent exits of the cycle to the observers.
+        '''
+        for observer in self.observers:
+            observer.append_agent_exits(agent_ids)
+
+    def append_timing(self, phase_timer):
+        '''
+        Gives the phase times of the run to the observers.
+        '''
+        for observer in self.observers:
+            observer.append_timing(phase_timer)
+
+    def append_work(self, work_counter):
+        '''
+        Gives the work of the run to the observers.
+        '''
+        for observer in self.observers:
+            observer.append_work(work_counter)
+
+    def get_offsets(self):
+        '''
+        Returns the offsets of the files of the observers.
+        '''
+        offsets = {}
+        for observer in self.observers:
+            offsets.update(observer.get_offsets())
+        return offsets
+
+    def close_all(self):
+        '''
+        Ends the blocks given to the observers.
+        '''
+        for observer in self.observers:
+            observer.close_all()
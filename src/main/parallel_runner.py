@@ -0,0 +1,172 @@
+import os
+import random
+import shutil
+import numpy
+from multiprocessing import Pool
+from twisted.python.formmethod import InputError
+from aging import Aging
+from cyclic_data import CyclicData
+from columnar_data import ColumnarData, create_cyclic_data
+from calculator import Calculator
+from configuration import Configuration
+from random_stream import RandomStream
+from plot_renderer import PlotRenderer
+from plotter import Plotter
+from ensemble import Ensemble
+from checkpoint import Checkpoint
+from simulation_log import SimulationLog
+
+
+def start_worker(config, seeded):
+    '''
+    Prepares the worker process for the runs of config and returns the
+    PlotRenderer of the runs, None if the maps are plotted in place. The
+    global random modules are seeded again if the runs are not seeded.
+    The messages of the runs are logged in batch mode.
+    '''
+    if not seeded:
+        # the worker processes start with the random state of the parent,
+        # so each run takes a new seed.
+        random.seed()
+        numpy.random.seed()
+    Calculator.set_checked(config.CHECKED_CALCULATIONS)
+    SimulationLog.configure(config.LOG_LEVEL, 1)
+    Plotter.set_style(config.PLOT_TEXT)
+    if config.PLOT_QUEUE_SIZE > 0:
+        return PlotRenderer(config.PLOT_QUEUE_SIZE)
+    return None
+
+
+def get_batches(jobs, size):
+    '''
+    Returns the list of the jobs divided into batches of at most size
+    jobs, in the given order.
+    '''
+    if (size < 1):
+        raise InputError("Error : get_batches cannot have size less than 1.")
+    return [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+
+def run_in_worker(job):
+    '''
+    Runs one Aging run in a worker process and writes its cycle data to
+    the run directory given in the job (run_num, run_dir, config,
+    point_index). The worker does not import anything again, so it can
+    make runs of different configurations one after another. The random
+    stream of the run is derived from MASTER_SEED, point_index and run_num.
+    The run is checkpointed in its run directory. Returns run_num.
+    '''
+    run_num, run_dir, config, point_index = job
+    random_stream = RandomStream.for_run(config.MASTER_SEED, run_num, \
+                                         point_index)
+    plot_renderer = start_worker(config, random_stream.is_seeded())
+    # with RESUME the run continues from the checkpoint in its directory.
+    checkpoint = Checkpoint.for_config(run_dir, config)
+    state = None
+    offsets = None
+    if (checkpoint is not None) and config.RESUME:
+        state = checkpoint.load()
+    if state is not None:
+        offsets = state['offsets']
+    cyclic_data = create_cyclic_data(run_dir, config, offsets)
+    cyclic_data.set_run(run_num)
+    Aging(run_num, cyclic_data, config, random_stream, plot_renderer, 1, \
+          checkpoint, state)
+    cyclic_data.close_all()
+    if plot_renderer is not None:
+        plot_renderer.close()
+    return run_num
+
+
+def run_ensemble_in_worker(jobs):
+    '''
+    Runs the jobs of run_in_worker together as one Ensemble in a worker
+    process. Returns the list of their run_nums.
+    '''
+    config = jobs[0][2]
+    plot_renderer = start_worker(config, config.MASTER_SEED is not None)
+    Ensemble(jobs, plot_renderer).run()
+    if plot_renderer is not None:
+        plot_renderer.close()
+    return [job[0] for job in jobs]
+
+
+def map_jobs(pool, jobs, ensemble_size):
+    '''
+    Makes the jobs in the pool, alone if ensemble_size is 1 and in
+    ensembles of ensemble_size jobs otherwise.
+    '''
+    if ensemble_size > 1:
+        pool.map(run_ensemble_in_worker, get_batches(jobs, ensemble_size), 1)
+    else:
+        pool.map(run_in_worker, jobs, 1)
+
+
+class ParallelRunner(object):
+    '''
+    ParallelRunner runs independent Aging runs in a pool of worker
+    processes. Each run writes its cycle data files to its own directory
+    in the output directory. When all runs are finished, the files of the
+    runs are merged in run order into the files of the output directory,
+    so the output has the same layout as the runs made one after another.
+    With ENSEMBLE_SIZE greater than 1, the runs are made in ensembles of
+    that many runs.
+    '''
+
+    def __init__(self, number_of_workers, output_dir=None, config=None):
+        '''
+        Constructor. If output_dir is None, the OUTPUT_DIR of the
+        configuration is used.
+        '''
+        if config is None:
+            config = Configuration.get_default()
+        if output_dir is None:
+            output_dir = config.OUTPUT_DIR
+        if (number_of_workers < 1):
+            raise InputError("Error : ParallelRunner cannot have number_of_workers less than 1.")
+        # The maximum number of runs made at the same time.
+        self.number_of_workers = number_of_workers
+        # The directory where the merged files are written.
+        self.output_dir = output_dir
+        # The configuration of the runs.
+        self.config = config
+
+    def get_run_dir(self, run_num):
+        '''
+        Returns the directory where the run with run_num writes its files.
+        '''
+        return os.path.join(self.output_dir, 'run_' + str(run_num))
+
+    def run(self, run_numbers):
+        '''
+        Makes the runs with the given run numbers in the worker processes
+        and merges their files into the output directory.
+        '''
+        run_numbers = list(run_numbers)
+        CyclicData.delete_files(self.output_dir)
+        jobs = [(run_num, self.get_run_dir(run_num), self.config, 0) \
+                for run_num in run_numbers]
+        pool = Pool(min(self.number_of_workers, max(len(jobs), 1)))
+        try:
+            map_jobs(pool, jobs, self.config.ENSEMBLE_SIZE)
+        finally:
+            pool.close()
+            pool.join()
+        self.merge(run_numbers)
+
+    def merge(self, run_numbers):
+        '''
+        Merges the files of the runs in the given order into the files of
+        the output directory and deletes the run directories.
+        '''
+        run_dirs = [self.get_run_dir(run_num) for run_num in run_numbers]
+        if not run_dirs:
+            return
+        if self.config.OUTPUT_FORMAT == 'columnar':
+            ColumnarData.merge(run_dirs, self.output_dir)
+        else:
+            CyclicData.merge(run_dirs, self.output_dir)
+        shutil.copy(os.path.join(run_dirs[0], 'alpha_beta_file.txt'), \
+                    self.output_dir)
+        for run_dir in run_dirs:
+            shutil.rmtree(run_dir)
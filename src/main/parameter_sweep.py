@@ -0,0 +1,142 @@
+import os
+import argparse
+from multiprocessing import Pool
+from twisted.python.formmethod import InputError
+from cyclic_data import CyclicData
+from configuration import Configuration
+from parallel_runner import ParallelRunner, map_jobs
+
+
+class ParameterSweep(object):
+    '''
+    ParameterSweep makes all runs of a list of (ALPHA, BETA) or
+    (ALPHA, BETA, MAX_TIP) parameter points in a pool of worker processes.
+    Every (point, run) pair is an independent job that runs with the
+    configuration of its point, so the workers make the jobs of all
+    points one after another without starting a new process. The jobs
+    are started in descending order of their estimated cost so that the
+    long jobs do not remain alone at the end. With ENSEMBLE_SIZE greater
+    than 1, consecutive jobs of this order, of one or several points, are
+    made together as an ensemble. When all jobs are finished, the files of each
+    point are merged into its output_alpha_X_beta_Y directory in the same
+    layout as simul_tm.py writes.
+    '''
+
+    def __init__(self, points, number_of_runs=None, number_of_workers=None, \
+                 config=None):
+        '''
+        Constructor. The parameters other than ALPHA, BETA and MAX_TIP
+        are taken from config, the default configuration if it is None.
+        number_of_runs and number_of_workers are taken from config if they
+        are None.
+        '''
+        if config is None:
+            config = Configuration.get_default()
+        if number_of_runs is None:
+            number_of_runs = config.NUMBER_OF_RUNS
+        if number_of_workers is None:
+            number_of_workers = config.NUMBER_OF_WORKERS
+        if (number_of_runs < 1) or (number_of_workers < 1):
+            raise InputError("Error : ParameterSweep cannot have number_of_runs or number_of_workers less than 1.")
+        if not points:
+            raise InputError("Error : ParameterSweep must have at least one point.")
+        # The configuration that the configurations of the points are
+        # copied from.
+        self.config = config
+        # The configurations of the parameter points. MAX_TIP is derived
+        # from BETA if it is not given. Each point has its own OUTPUT_DIR.
+        self.configs = []
+        for point in points:
+            if len(point) not in (2, 3):
+                raise InputError("Error : ParameterSweep points must be (alpha, beta) or (alpha, beta, max_tip).")
+            alpha, beta = float(point[0]), float(point[1])
+            values = {'ALPHA': alpha, 'BETA': beta, \
+                      'OUTPUT_DIR': Configuration.get_output_dir(alpha, beta)}
+            if len(point) == 3:
+                values['MAX_TIP'] = float(point[2])
+            self.configs.append(config.copy(**values))
+        self.number_of_runs = number_of_runs
+        self.number_of_workers = number_of_workers
+
+    @staticmethod
+    def grid(alphas, betas):
+        '''
+        Returns the (alpha, beta) points of the grid of the given values.
+        '''
+        return [(alpha, beta) for alpha in alphas for beta in betas]
+
+    @staticmethod
+    def estimate_cost(config):
+        '''
+        Returns the estimated relative cost of a run of the configuration.
+        The expected learning is positive for the distances in
+        (sigma, sigma + BETA), so the pairs to be evaluated and matched
+        grow with MAX_SIGMA + BETA.
+        '''
+        return config.MAX_SIGMA + config.BETA
+
+    def get_jobs(self):
+        '''
+        Returns the jobs (run_num, run_dir, config, point_index) of all
+        points and runs, the most costly first. Jobs with the same cost are
+        in the order of the points and runs.
+        '''
+        jobs = []
+        for point_index, config in enumerate(self.configs):
+            runner = ParallelRunner(1, config.OUTPUT_DIR, config)
+            for run_num in range(1, self.number_of_runs + 1):
+                jobs.append((run_num, \
+                             os.path.abspath(runner.get_run_dir(run_num)), \
+                             config, point_index))
+        jobs.sort(key=lambda job: -self.estimate_cost(job[2]))
+        return jobs
+
+    def run(self):
+        '''
+        Makes all jobs and merges the files of each point.
+        '''
+        for config in self.configs:
+            if not os.path.exists(config.OUTPUT_DIR):
+                os.makedirs(config.OUTPUT_DIR)
+            CyclicData.delete_files(config.OUTPUT_DIR)
+        jobs = self.get_jobs()
+        pool = Pool(min(self.number_of_workers, len(jobs)))
+        try:
+            map_jobs(pool, jobs, self.config.ENSEMBLE_SIZE)
+        finally:
+            pool.close()
+            pool.join()
+        for config in self.configs:
+            runner = ParallelRunner(1, config.OUTPUT_DIR, config)
+            runner.merge(range(1, self.number_of_runs + 1))
+
+
+def parse_point(text):
+    '''
+    Parses a parameter point given as alpha:beta or alpha:beta:max_tip.
+    '''
+    return tuple(float(value) for value in text.split(':'))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Runs the simulation for ' + \
+                                     'several ALPHA and BETA values.')
+    parser.add_argument('--alphas', type=float, nargs='*', default=[], \
+                        help='ALPHA values of the grid')
+    parser.add_argument('--betas', type=float, nargs='*', default=[], \
+                        help='BETA values of the grid')
+    parser.add_argument('--points', type=parse_point, nargs='*', default=[], \
+                        help='points given as alpha:beta or alpha:beta:max_tip')
+    parser.add_argument('--runs', type=int, default=None, \
+                        help='number of runs of each point')
+    parser.add_argument('--workers', type=int, default=None, \
+                        help='number of worker processes')
+    Configuration.add_arguments(parser)
+    args = parser.parse_args()
+
+    points = ParameterSweep.grid(args.alphas, args.betas) + args.points
+    if not points:
+        parser.error('no parameter point is given')
+    ParameterSweep(points, args.runs, args.workers, \
+                   Configuration.from_arguments(args)).run()
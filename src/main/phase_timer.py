@@ -0,0 +1,118 @@
+import time
+from twisted.python.formmethod import InputError
+
+
+class PhaseTimer(object):
+    '''
+    PhaseTimer measures how long the phases of the cycles of a run take.
+    A phase is timed from start to stop. A phase that is started while
+    another phase is running, for instance the writing of the cycle data
+    in the realized learning phase, pauses the running phase until it is
+    stopped, so each phase is given only its own time and the times of the
+    phases add up to the time of the cycles.
+
+    The modes of the timer are:
+    off : nothing is measured.
+    run : the times of the phases are summed up for the run.
+    cycle : the times are also kept for each cycle.
+    '''
+
+    # The modes of the timer.
+    MODES = ('off', 'run', 'cycle')
+
+    # The phases of a cycle, in the order they are written.
+    PHASES = ('plot', 'evaluation', 'matching', 'realized_learning', \
+              'breakthrough', 'reset', 'output')
+
+    def __init__(self, mode='run', clock=time.time):
+        '''
+        Constructor. clock returns the current time in seconds.
+        '''
+        if mode not in PhaseTimer.MODES:
+            raise InputError("Error : PhaseTimer cannot have mode " + str(mode) + ".")
+        # The mode that decides what is measured.
+        self.mode = mode
+        self.clock = clock
+        # The cycle that the measured times belong to.
+        self.cycle = 0
+        # The total seconds of each phase and the number of times it is
+        # started or recorded.
+        self.seconds = dict((phase, 0.0) for phase in PhaseTimer.PHASES)
+        self.calls = dict((phase, 0) for phase in PhaseTimer.PHASES)
+        # The seconds of each (cycle, phase) in cycle mode.
+        self.cycle_seconds = {}
+        # The started phases, the running one last, and the time when the
+        # running phase was started or resumed.
+        self.running = []
+        self.started = 0.0
+
+    def set_cycle(self, cycle):
+        '''
+        Sets the cycle that the following times belong to.
+        '''
+        self.cycle = cycle
+
+    def start(self, phase):
+        '''
+        Starts timing the phase and pauses the running phase.
+        '''
+        if self.mode == 'off':
+            return
+        if phase not in self.seconds:
+            raise InputError("Error : PhaseTimer cannot have phase " + str(phase) + ".")
+        now = self.clock()
+        if self.running:
+            self.add(self.running[-1], now - self.started)
+        self.running.append(phase)
+        self.calls[phase] += 1
+        self.started = now
+
+    def stop(self):
+        '''
+        Stops timing the running phase and resumes the phase it paused.
+        '''
+        if self.mode == 'off':
+            return
+        if not self.running:
+            raise InputError("Error : PhaseTimer.stop method cannot be called when no phase is running.")
+        now = self.clock()
+        self.add(self.running.pop(), now - self.started)
+        self.started = now
+
+    def record(self, phase, seconds):
+        '''
+        Records the seconds of the phase measured elsewhere, for instance
+        the share of a run in a phase made for several runs together.
+        '''
+        if self.mode == 'off':
+            return
+        if phase not in self.seconds:
+            raise InputError("Error : PhaseTimer cannot have phase " + str(phase) + ".")
+        self.calls[phase] += 1
+        self.add(phase, seconds)
+
+    def add(self, phase, seconds):
+        '''
+        Adds the seconds to the time of the phase in the current cycle.
+        '''
+        self.seconds[phase] += seconds
+        if self.mode == 'cycle':
+            key = (self.cycle, phase)
+            self.cycle_seconds[key] = self.cycle_seconds.get(key, 0.0) + seconds
+
+    def get_rows(self):
+        '''
+        Returns the (phase, calls, seconds) rows of the run.
+        '''
+        return [(phase, self.calls[phase], self.seconds[phase]) \
+                for phase in PhaseTimer.PHASES]
+
+    def get_cycle_rows(self):
+        '''
+        Returns the (cycle, phase, seconds) rows of the cycles in cycle
+        mode, in the order of cycles and phases.
+        '''
+        order = dict((phase, i) for i, phase in enumerate(PhaseTimer.PHASES))
+        keys = sorted(self.cycle_seconds, key=lambda key: (key[0], order[key[1]]))
+        return [(cycle, phase, self.cycle_seconds[(cycle, phase)]) \
+                for cycle, phase in keys]
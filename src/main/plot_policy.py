@@ -0,0 +1,66 @@
+from twisted.python.formmethod import InputError
+
+
+class PlotPolicy(object):
+    '''
+    PlotPolicy decides for which cycles the map of the network is plotted
+    and for which of them the plot is also written to a pdf file.
+
+    The plotted cycles are given by the mode:
+    every : every k cycles, starting from cycle 0, and the last cycle.
+    list : the cycles in the given list.
+    first_last : the first and the last cycle.
+    off : no cycle.
+    A plotted cycle is also written to pdf if it is a multiple of pdf_every
+    or it is in pdf_cycles.
+    '''
+
+    # The modes that decide the plotted cycles.
+    MODES = ('every', 'list', 'first_last', 'off')
+
+    def __init__(self, mode, last_cycle, every=1, cycles=(), pdf_every=50, \
+                 pdf_cycles=()):
+        '''
+        Constructor. last_cycle is the last cycle of a run. every and
+        pdf_every are not used if they are 0.
+        '''
+        if mode not in PlotPolicy.MODES:
+            raise InputError("Error : PlotPolicy cannot have mode " + str(mode) + ".")
+        if (last_cycle < 0) or (every < 0) or (pdf_every < 0):
+            raise InputError("Error : PlotPolicy cannot have negative last_cycle, every or pdf_every.")
+        if (mode == 'every') and (every == 0):
+            raise InputError("Error : PlotPolicy cannot have every 0 in every mode.")
+        # The mode that decides the plotted cycles.
+        self.mode = mode
+        # The last cycle of a run.
+        self.last_cycle = last_cycle
+        # The period of the plotted cycles in every mode.
+        self.every = every
+        # The plotted cycles in list mode.
+        self.cycles = frozenset(cycles)
+        # The period of the cycles that are written to pdf, and the other
+        # cycles that are written to pdf.
+        self.pdf_every = pdf_every
+        self.pdf_cycles = frozenset(pdf_cycles)
+
+    def is_plotted(self, cycle_num):
+        '''
+        Returns 1 if the map of the cycle is plotted, 0 otherwise.
+        '''
+        if self.mode == 'every':
+            return int((cycle_num % self.every == 0) or \
+                       (cycle_num == self.last_cycle))
+        if self.mode == 'list':
+            return int(cycle_num in self.cycles)
+        if self.mode == 'first_last':
+            return int((cycle_num == 0) or (cycle_num == self.last_cycle))
+        return 0
+
+    def is_printed_to_pdf(self, cycle_num):
+        '''
+        Returns 1 if the plot of the cycle is also written to pdf, 0
+        otherwise.
+        '''
+        if self.pdf_every and (cycle_num % self.pdf_every == 0):
+            return 1
+        return int(cycle_num in self.pdf_cycles)
@@ -0,0 +1,93 @@
+import Queue
+import threading
+import multiprocessing
+from twisted.python.formmethod import InputError
+from plotter import Plotter
+from simulation_log import SimulationLog
+
+
+def render_plots(queue, failures):
+    '''
+    Renders the plots taken from the queue with Plotter.scatter until
+    None is taken. A plot that cannot be rendered is logged with its
+    traceback, counted in failures and skipped.
+    '''
+    logger = SimulationLog.get_logger()
+    while True:
+        job = queue.get()
+        if job is None:
+            break
+        try:
+            Plotter.scatter(*job)
+        except Exception:
+            logger.exception('plot ' + str(job[1]) + ' cannot be rendered')
+            with failures.get_lock():
+                failures.value += 1
+
+
+class PlotRenderer(object):
+    '''
+    PlotRenderer renders the plots of the simulation in the background so
+    that the simulation does not wait for matplotlib and LaTeX. The plots
+    are given with the scatter method, which has the arguments of
+    Plotter.scatter, and are rendered in a separate process. In the worker
+    processes of a pool, which cannot start processes, they are rendered
+    in a thread, which is then the only user of pyplot.
+
+    The plots waiting to be rendered are kept in a queue of queue_size
+    plots. When the queue is full, scatter waits until a plot is rendered,
+    so the simulation cannot get ahead of the renderer without bound.
+
+    A plot that cannot be rendered does not stop the simulation; it is
+    logged at 'error' level and the number of such plots is reported by
+    close.
+    '''
+
+    def __init__(self, queue_size, in_thread=None):
+        '''
+        Constructor. Starts the renderer in a thread if in_thread is 1, in
+        a process if it is 0, and in a process if it can be started if it
+        is None.
+        '''
+        if (queue_size < 1):
+            raise InputError("Error : PlotRenderer cannot have queue_size less than 1.")
+        if in_thread is None:
+            in_thread = multiprocessing.current_process().daemon
+        # The number of plots that could not be rendered, shared with the
+        # renderer.
+        self.failures = multiprocessing.Value('i', 0)
+        if in_thread:
+            # The plots that are waiting to be rendered.
+            self.queue = Queue.Queue(queue_size)
+            # The thread or process that renders the plots.
+            self.worker = threading.Thread(target=render_plots, \
+                                           args=(self.queue, self.failures))
+        else:
+            self.queue = multiprocessing.Queue(queue_size)
+            self.worker = multiprocessing.Process(target=render_plots, \
+                                                  args=(self.queue, self.failures))
+        self.worker.daemon = True
+        self.worker.start()
+
+    def scatter(self, title, file_name, x_array, y_array, size_array, \
+                x_label, y_label, x_range, y_range, print_pdf, output_dir=None):
+        '''
+        Puts the plot in the queue of the renderer. The arrays must not be
+        changed afterwards, so a copy of the values is to be given.
+        '''
+        self.queue.put((title, file_name, x_array, y_array, size_array, \
+                        x_label, y_label, x_range, y_range, print_pdf, \
+                        output_dir))
+
+    def close(self):
+        '''
+        Waits until all plots in the queue are rendered and stops the
+        renderer. Returns the number of plots that could not be rendered,
+        which is logged at 'error' level if there are any.
+        '''
+        self.queue.put(None)
+        self.worker.join()
+        if self.failures.value > 0:
+            SimulationLog.get_logger().error( \
+                str(self.failures.value) + ' plots could not be rendered.')
+        return self.failures.value
@@ -2,26 +2,56 @@ from matplotlib import rc
 import matplotlib.pylab as plt
 from matplotlib.backends.backend_pdf import PdfPages
 from matplotlib.pyplot import xlabel, ylabel
-from global_values import OUTPUT_DIR
+from twisted.python.formmethod import InputError
+from configuration import Configuration
 
 class Plotter(object):
     '''
     Plotter class is a static class to draw and save png/pdf images of 
     the x-y array values with size values.
+
+    The text is rendered with LaTeX, or with the mathtext of matplotlib
+    which does not start a LaTeX process. The style is set once with
+    set_style, before the first plot if it is not set.
     '''
 
+    # The modes of text rendering.
+    TEXT_MODES = ('latex', 'mathtext')
+
+    # The text rendering mode of the current style, None if the style is
+    # not set.
+    text_mode = None
+
+    @staticmethod
+    def set_style(text_mode):
+        '''
+        Sets the style of the plots with the given text rendering mode,
+        latex or mathtext.
+        '''
+        if text_mode not in Plotter.TEXT_MODES:
+            raise InputError("Error : Plotter.set_style method cannot have text_mode other than latex or mathtext.")
+        if text_mode == Plotter.text_mode:
+            return
+        rc('text', usetex=(text_mode == 'latex'))
+        rc('font', family='serif')
+        if text_mode == 'mathtext':
+            rc('mathtext', fontset='cm')
+        Plotter.text_mode = text_mode
+
     @staticmethod
     def scatter(title, file_name, x_array, y_array, size_array, x_label, \
-                y_label, x_range, y_range, print_pdf):
+                y_label, x_range, y_range, print_pdf, output_dir=None):
         '''
         Plots the given x value array and y value array with the specified 
         title and saves with the specified file name. The size of points on
         the map are proportional to the values given in size_array. If 
         print_pdf value is 1, the image is also written to pdf file. 
-        Otherwise it is only written to png file.
+        Otherwise it is only written to png file. The files are written to
+        output_dir, the OUTPUT_DIR of the default configuration if it is
+        None.
         '''
-        rc('text', usetex=True)
-        rc('font', family='serif')
+        if Plotter.text_mode is None:
+            Plotter.set_style('latex')
         plt.clf() # clear the ploting window, a must.                               
         plt.scatter(x_array, y_array, s =  size_array, c = 'b', marker = 'o', alpha = 0.4)
         if x_label != None:   
@@ -32,27 +62,31 @@ class Plotter(object):
         plt.grid(True)
         plt.suptitle(title)
     
-        Plotter.print_to_png(plt, file_name)
+        Plotter.print_to_png(plt, file_name, output_dir)
         
         if print_pdf:
-            Plotter.print_to_pdf(plt, file_name)
+            Plotter.print_to_pdf(plt, file_name, output_dir)
         
     @staticmethod    
-    def print_to_png(image, file_name):
+    def print_to_png(image, file_name, output_dir=None):
         '''
         Creates a png image file with specified file name and 
         specified image.
         '''
-        output = OUTPUT_DIR + file_name + '.png'
+        if output_dir is None:
+            output_dir = Configuration.get_default().OUTPUT_DIR
+        output = output_dir + file_name + '.png'
         plt.savefig(output)
     
     @staticmethod
-    def print_to_pdf(image, file_name):
+    def print_to_pdf(image, file_name, output_dir=None):
         '''
         Creates a pdf image file with specified file name and 
         specified image.
         '''
-        output = OUTPUT_DIR + file_name + '.pdf'
+        if output_dir is None:
+            output_dir = Configuration.get_default().OUTPUT_DIR
+        output = output_dir + file_name + '.pdf'
         pdf_file = PdfPages(output)
         plt.savefig(pdf_file, format='pdf')
         pdf_file.close()
@@ -0,0 +1,136 @@
+import numpy
+from twisted.python.formmethod import InputError
+
+
+class Population(object):
+    '''
+    Population stores the data of the agents of a network column by column.
+    Each attribute of the agents is kept in one contiguous typed array and
+    an agent is a row of these arrays. The Agent objects of the network are
+    views over their rows, so the network phases can work on the whole
+    columns while the agents can still be used one by one.
+
+    The arrays are allocated with spare capacity which is doubled when it
+    is used up, so adding agents one at a time does not copy the arrays
+    each time.
+    '''
+
+    # The columns of the population and their types.
+    COLUMNS = (('map_market', numpy.float64),
+               ('map_knowledge', numpy.float64),
+               ('sigma_m', numpy.float64),
+               ('sigma_k', numpy.float64),
+               ('cum_knowledge', numpy.float64),
+               ('cycle_realized_learning', numpy.float64),
+               ('next_map_market', numpy.float64),
+               ('next_map_tech', numpy.float64),
+               ('is_active', numpy.int8),
+               ('entry_cycle', numpy.int32),
+               ('partner', numpy.int32))
+
+    def __init__(self, capacity=16):
+        '''
+        Constructor
+        '''
+        if (capacity < 1):
+            raise InputError("Error : Population cannot have capacity less than 1.")
+        # The number of agents in the population.
+        self.size = 0
+        # The number of agents that the arrays can hold before they are
+        # allocated again.
+        self.capacity = capacity
+        # The arrays of the columns by name.
+        self.columns = {}
+        for name, dtype in self.COLUMNS:
+            self.columns[name] = numpy.zeros(capacity, dtype=dtype)
+        self.columns['partner'].fill(-1)
+        # The agents that are the views over the rows, in row order.
+        self.agents = []
+
+    def __getitem__(self, name):
+        '''
+        Returns the array of the column with the given name for the agents
+        in the population. The array is a view, so writing into it changes
+        the agents.
+        '''
+        return self.columns[name][:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def add(self, agent, entry_cycle, sigma_m, sigma_k, map_market, \
+            map_knowledge, cum_knowledge):
+        '''
+        Adds a new active agent without alliance with the given values and
+        returns its row index. agent is the view of the new row.
+        '''
+        if self.size == self.capacity:
+            self.grow(2 * self.capacity)
+        index = self.size
+        columns = self.columns
+        columns['map_market'][index] = map_market
+        columns['map_knowledge'][index] = map_knowledge
+        columns['sigma_m'][index] = sigma_m
+        columns['sigma_k'][index] = sigma_k
+        columns['cum_knowledge'][index] = cum_knowledge
+        columns['cycle_realized_learning'][index] = 0.0
+        columns['next_map_market'][index] = 0.0
+        columns['next_map_tech'][index] = 0.0
+        columns['is_active'][index] = 1
+        columns['entry_cycle'][index] = entry_cycle
+        columns['partner'][index] = -1
+        self.agents.append(agent)
+        self.size += 1
+        return index
+
+    def grow(self, capacity):
+        '''
+        Allocates the arrays again with the given capacity and copies the
+        values of the agents.
+        '''
+        if (capacity < self.size):
+            raise InputError("Error : Population.grow method cannot have capacity less than the size.")
+        for name, dtype in self.COLUMNS:
+            column = numpy.zeros(capacity, dtype=dtype)
+            column[:self.size] = self.columns[name][:self.size]
+            self.columns[name] = column
+        self.columns['partner'][self.size:] = -1
+        self.capacity = capacity
+
+    def get_state(self):
+        '''
+        Returns the copies of the columns of the agents by name.
+        '''
+        return dict((name, numpy.array(self[name])) for name, dtype in self.COLUMNS)
+
+    def set_state(self, state):
+        '''
+        Sets the columns to the columns returned by get_state. The views of
+        the rows are not created; they are appended to agents by the
+        caller.
+        '''
+        size = len(state['map_market'])
+        if size > self.capacity:
+            self.grow(size)
+        self.size = size
+        for name, dtype in self.COLUMNS:
+            self.columns[name][:size] = state[name]
+        self.columns['partner'][size:] = -1
+        del self.agents[:]
+
+    def get_active(self):
+        '''
+        Returns the row indices of the active agents.
+        '''
+        return numpy.flatnonzero(self['is_active'])
+
+    def reset(self):
+        '''
+        Resets the realized learning, alliance and next position of the
+        active agents to their values at the beginning of a cycle.
+        '''
+        active = self['is_active'] != 0
+        self['cycle_realized_learning'][active] = 0.0
+        self['partner'][active] = -1
+        self['next_map_market'][active] = 0.0
+        self['next_map_tech'][active] = 0.0
@@ -0,0 +1,79 @@
+import time
+import logging
+from twisted.python.formmethod import InputError
+from simulation_log import SimulationLog
+
+
+class ProgressReporter(object):
+    '''
+    ProgressReporter logs the progress of a run at 'info' level: the start
+    of the run, then the last cycle made, the cycles made per second and
+    the estimated time until the end of the run. The progress is logged
+    at most once every interval seconds, and at the last cycle, so it does
+    not slow down the cycles of small networks.
+    '''
+
+    def __init__(self, run_num, number_of_cycles, interval=10.0, \
+                 start_cycle=0, clock=time.time):
+        '''
+        Constructor. The run is made from the end of start_cycle, which is
+        not 0 for a resumed run. clock returns the current time in
+        seconds.
+        '''
+        if (interval < 0):
+            raise InputError("Error : ProgressReporter cannot have interval less than 0.")
+        self.run_num = run_num
+        self.number_of_cycles = number_of_cycles
+        # The minimum number of seconds between two reports.
+        self.interval = interval
+        self.start_cycle = start_cycle
+        self.clock = clock
+        self.logger = SimulationLog.get_logger()
+        # The time when the run was started and when the progress was
+        # last reported.
+        self.started = clock()
+        self.reported = self.started
+
+    def start(self):
+        '''
+        Reports the start of the run, or the cycle it is continued from,
+        and starts timing its cycles.
+        '''
+        self.started = self.clock()
+        self.reported = self.started
+        if self.start_cycle == 0:
+            self.logger.info('run %d : started, %d cycles', self.run_num, \
+                             self.number_of_cycles)
+        else:
+            self.logger.info('run %d : continued from cycle %d of %d', \
+                             self.run_num, self.start_cycle, \
+                             self.number_of_cycles)
+
+    def get_progress(self, cycle, now):
+        '''
+        Returns the cycles per second and the estimated seconds until the
+        end of the run after cycle, at time now. The estimate is None
+        before the first cycle is timed.
+        '''
+        elapsed = now - self.started
+        if (elapsed <= 0) or (cycle <= self.start_cycle):
+            return 0.0, None
+        rate = (cycle - self.start_cycle) / elapsed
+        return rate, (self.number_of_cycles - cycle) / rate
+
+    def update(self, cycle):
+        '''
+        Reports the progress after cycle, if interval seconds have passed
+        since the last report or cycle is the last cycle.
+        '''
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        now = self.clock()
+        if (now - self.reported < self.interval) and \
+           (cycle < self.number_of_cycles):
+            return
+        self.reported = now
+        rate, remaining = self.get_progress(cycle, now)
+        eta = '-' if remaining is None else '%.0f s' % remaining
+        self.logger.info('run %d : cycle %d of %d, %.2f cycles/s, ETA %s', \
+                         self.run_num, cycle, self.number_of_cycles, rate, eta)
@@ -1,5 +1,6 @@
-import random
-from global_values import MAX_SIGMA, MIN_SIGMA
+from configuration import Configuration
+from random_stream import RandomStream
+from simulation_log import SimulationLog
 
 class RandomSigma(object):
     '''
@@ -16,10 +17,20 @@ class RandomSigma(object):
     
     '''
 
-    def __init__(self):
+    def __init__(self, config=None, random_stream=None):
         '''
         Constructor
         '''
+        if config is None:
+            config = Configuration.get_default()
+        if random_stream is None:
+            random_stream = RandomStream.get_global()
+        # The configuration that gives the range of sigma values.
+        self.config = config
+        # The stream that the sigma values are drawn from.
+        self.random_stream = random_stream
+        # The logger of the sigma values.
+        self.logger = SimulationLog.get_logger()
         self.region = 0
               
     def get_sigma(self):
@@ -45,10 +56,10 @@ class RandomSigma(object):
             sigma_m = MIN_SIGMA + mid_value + (mid_value * random.random())
             sigma_t = MIN_SIGMA + (mid_value * random.random())
         '''
-        sigma_m = random.random() * MAX_SIGMA
-        sigma_t = random.random() * MAX_SIGMA
+        sigma_m = self.random_stream.random() * self.config.MAX_SIGMA
+        sigma_t = self.random_stream.random() * self.config.MAX_SIGMA
         value = (sigma_m, sigma_t) 
-        print value, 'region ', self.region + 1
+        self.logger.debug('%s region  %d', value, self.region + 1)
         self.region = (self.region + 1) % 4
         return value
     
@@ -0,0 +1,146 @@
+import random
+import numpy
+from twisted.python.formmethod import InputError
+
+
+class RandomStream(object):
+    '''
+    RandomStream gives all random numbers of a run. A seeded stream has its
+    own generator, seeded from a master seed, the index of the parameter
+    point and the run number, so a run draws the same numbers whichever
+    process makes it and whatever runs are made before it. Uniform numbers
+    are drawn from the generator in blocks of BLOCK_SIZE and given one by
+    one.
+
+    A stream without a seed draws from the global random and numpy.random
+    modules, as the simulation did before the streams, so the numbers
+    depend on the seeds of these modules.
+    '''
+
+    # The number of uniform numbers drawn from the generator at once.
+    BLOCK_SIZE = 1024
+
+    # The stream that draws from the global random modules.
+    global_stream = None
+
+    def __init__(self, seed=None):
+        '''
+        Constructor. seed is an integer or a sequence of integers, None
+        for a stream that draws from the global random modules.
+        '''
+        # The seed of the stream.
+        self.seed = seed
+        # The generator of the stream, None if the stream draws from the
+        # global random modules.
+        self.state = None
+        if seed is not None:
+            self.state = numpy.random.RandomState(seed)
+        # The block of uniform numbers in [0, 1) drawn from the generator
+        # and the position of the next number to be given.
+        self.block = numpy.empty(0)
+        self.position = 0
+
+    @staticmethod
+    def get_global():
+        '''
+        Returns the stream that draws from the global random modules.
+        '''
+        if RandomStream.global_stream is None:
+            RandomStream.global_stream = RandomStream()
+        return RandomStream.global_stream
+
+    @staticmethod
+    def for_run(master_seed, run_num, point_index=0):
+        '''
+        Returns the stream of the run with run_num of the parameter point
+        with point_index. If master_seed is None, returns the stream that
+        draws from the global random modules.
+        '''
+        if master_seed is None:
+            return RandomStream.get_global()
+        if (master_seed < 0) or (run_num < 0) or (point_index < 0):
+            raise InputError("Error : RandomStream.for_run method cannot have negative master_seed, run_num or point_index.")
+        return RandomStream([master_seed, point_index, run_num])
+
+    @staticmethod
+    def for_branch(master_seed, run_num, branch, point_index=0):
+        '''
+        Returns the stream of the branch with number branch of the run
+        with run_num, which continues the run from a cycle with numbers
+        other than the numbers of the run and of the other branches. If
+        master_seed is None, returns the stream that draws from the global
+        random modules.
+        '''
+        if master_seed is None:
+            return RandomStream.get_global()
+        if (master_seed < 0) or (run_num < 0) or (point_index < 0) or \
+           (branch < 1):
+            raise InputError("Error : RandomStream.for_branch method cannot have negative master_seed, run_num or point_index, or branch less than 1.")
+        return RandomStream([master_seed, point_index, run_num, branch])
+
+    def is_seeded(self):
+        '''
+        Returns 1 if the stream has its own generator, 0 otherwise.
+        '''
+        return int(self.state is not None)
+
+    def get_state(self):
+        '''
+        Returns the state of the stream, from which set_state continues
+        the same numbers. The state of a stream without a seed is the
+        state of the global random modules.
+        '''
+        if self.state is None:
+            return (random.getstate(), numpy.random.get_state())
+        return (self.state.get_state(), self.block.copy(), self.position)
+
+    def set_state(self, state):
+        '''
+        Sets the state returned by get_state.
+        '''
+        if self.state is None:
+            random.setstate(state[0])
+            numpy.random.set_state(state[1])
+            return
+        self.state.set_state(state[0])
+        self.block = numpy.array(state[1])
+        self.position = state[2]
+
+    def random(self):
+        '''
+        Returns the next uniform number in [0, 1).
+        '''
+        if self.state is None:
+            return random.random()
+        if self.position == len(self.block):
+            self.block = self.state.random_sample(RandomStream.BLOCK_SIZE)
+            self.position = 0
+        value = float(self.block[self.position])
+        self.position += 1
+        return value
+
+    def uniform(self, low, high):
+        '''
+        Returns the next uniform number in [low, high).
+        '''
+        if self.state is None:
+            return random.uniform(low, high)
+        return low + (high - low) * self.random()
+
+    def randint(self, low, high):
+        '''
+        Returns the next uniform integer in [low, high].
+        '''
+        if (high < low):
+            raise InputError("Error : RandomStream.randint method cannot have high less than low.")
+        if self.state is None:
+            return random.randint(low, high)
+        return low + int(self.random() * (high - low + 1))
+
+    def poisson(self, lam, size):
+        '''
+        Returns an array of size poisson distributed numbers with mean lam.
+        '''
+        if self.state is None:
+            return numpy.random.poisson(lam, size)
+        return self.state.poisson(lam, size)
@@ -1,32 +1,78 @@
 import os
+import argparse
 from aging import Aging
-from global_values import START_NUM_AGENT, NUMBER_OF_RUNS, OUTPUT_DIR
-from cyclic_data import CyclicData
+from configuration import Configuration
+from columnar_data import create_cyclic_data
+from calculator import Calculator
+from random_stream import RandomStream
+from plot_renderer import PlotRenderer
+from plotter import Plotter
+from parallel_runner import ParallelRunner, run_in_worker
+from checkpoint import Checkpoint
+from simulation_log import SimulationLog
 
 
 if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Runs the simulation.')
+    parser.add_argument('--run', type=int, default=None, \
+                        help='make only the run with this number')
+    parser.add_argument('--run-dir', default=None, \
+                        help='the directory where the files of --run are written')
+    Configuration.add_arguments(parser)
+    args = parser.parse_args()
+    config = Configuration.from_arguments(args)
+    if args.run is not None:
+        # a single run written to its own directory
+        run_in_worker((args.run, args.run_dir or config.OUTPUT_DIR, config, 0))
+        exit()
     
-    print '------------------',OUTPUT_DIR
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    SimulationLog.configure(config.LOG_LEVEL)
+    logger = SimulationLog.get_logger()
+    logger.info('output directory : ' + config.OUTPUT_DIR)
+    if not os.path.exists(config.OUTPUT_DIR):
+        os.makedirs(config.OUTPUT_DIR)
 
     # stop the execution of the program 
     # if the number of agents is not even.
-    if ((START_NUM_AGENT % 2) != 0):
+    if ((config.START_NUM_AGENT % 2) != 0):
         exit("Error: Choose even number of agents!")
 
-    print "\n* ***************************************************\n*"
-    print "*\n*                 STARTING                         *\n*"
-    print "*\n****************************************************\n"
-
-    cyclic_data = CyclicData()
-    for i in range(1, NUMBER_OF_RUNS + 1):
-        #print "$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$\n"
-        print "$$$$$$$$$$$$$$$$  RUN NUMBER = ", i, "  $$$$$$$$$$$$$$$$$\n"
-        #print "$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$\n"
-        cyclic_data.set_run(i) 
-        Aging(i, cyclic_data)
-    cyclic_data.close_all()    
-    print '\n *********************** the close_all *************************\n\n\n\n'
+    logger.info('starting ' + str(config.NUMBER_OF_RUNS) + ' runs of ' + \
+                str(config.NUMBER_OF_CYCLES) + ' cycles')
+
+    Calculator.set_checked(config.CHECKED_CALCULATIONS)
+    if (config.NUMBER_OF_WORKERS > 1) or (config.ENSEMBLE_SIZE > 1):
+        ParallelRunner(config.NUMBER_OF_WORKERS, config=config).run( \
+            range(1, config.NUMBER_OF_RUNS + 1))
+    else:
+        Plotter.set_style(config.PLOT_TEXT)
+        plot_renderer = None
+        if config.PLOT_QUEUE_SIZE > 0:
+            plot_renderer = PlotRenderer(config.PLOT_QUEUE_SIZE)
+        # with RESUME the runs continue from the checkpoint of the last
+        # run that was made.
+        checkpoint = Checkpoint.for_config(config.OUTPUT_DIR, config)
+        state = None
+        offsets = None
+        if (checkpoint is not None) and config.RESUME:
+            state = checkpoint.load()
+        if state is not None:
+            offsets = state['offsets']
+        cyclic_data = create_cyclic_data(config=config, offsets=offsets)
+        for i in range(1, config.NUMBER_OF_RUNS + 1):
+            if (state is not None) and (i < state['run_num']):
+                continue
+            run_state = None
+            if (state is not None) and (i == state['run_num']):
+                run_state = state
+            cyclic_data.set_run(i) 
+            Aging(i, cyclic_data, config, \
+                  RandomStream.for_run(config.MASTER_SEED, i), plot_renderer, \
+                  1, checkpoint, run_state)
+        cyclic_data.close_all()    
+        if plot_renderer is not None:
+            plot_renderer.close()
+    logger.info('the simulation is finished')
 
 
@@ -0,0 +1,70 @@
+import sys
+import logging
+from twisted.python.formmethod import InputError
+
+
+class SimulationLog(object):
+    '''
+    SimulationLog sets up the logger that the simulation reports to. The
+    values of each cycle, the breakthroughs and the sigma values are
+    logged at 'debug' level, the start and the progress of the runs and
+    the start and the end of the simulation at 'info' level, and the
+    plots that cannot be rendered at 'error' level. The level is given by
+    LOG_LEVEL:
+    'auto' : 'info' when the runs are made one after another in the main
+    process, 'warning' in batch mode, when they are made by worker
+    processes, so the workers do not fill the output.
+    'debug', 'info', 'warning', 'error' : the level of the logging module.
+
+    Nothing is written until configure is called, so the tests and the
+    programs that use the simulation as a library stay quiet.
+    '''
+
+    # The name of the logger of the simulation.
+    NAME = 'simulation'
+
+    # The levels of LOG_LEVEL.
+    LEVELS = {'debug': logging.DEBUG, \
+              'info': logging.INFO, \
+              'warning': logging.WARNING, \
+              'error': logging.ERROR}
+
+    # The handler that writes the messages, None until configure is
+    # called.
+    handler = None
+
+    @staticmethod
+    def get_logger():
+        '''
+        Returns the logger of the simulation.
+        '''
+        logger = logging.getLogger(SimulationLog.NAME)
+        if not logger.handlers:
+            logger.addHandler(logging.NullHandler())
+        return logger
+
+    @staticmethod
+    def get_level(log_level, batch=0):
+        '''
+        Returns the logging level of LOG_LEVEL, in batch mode if batch is
+        1.
+        '''
+        if log_level == 'auto':
+            log_level = 'warning' if batch else 'info'
+        if log_level not in SimulationLog.LEVELS:
+            raise InputError("Error : SimulationLog cannot have LOG_LEVEL " + str(log_level) + ".")
+        return SimulationLog.LEVELS[log_level]
+
+    @staticmethod
+    def configure(log_level, batch=0):
+        '''
+        Writes the messages of the simulation at LOG_LEVEL and above to
+        stdout, in batch mode if batch is 1.
+        '''
+        logger = SimulationLog.get_logger()
+        logger.setLevel(SimulationLog.get_level(log_level, batch))
+        logger.propagate = False
+        if SimulationLog.handler is None:
+            SimulationLog.handler = logging.StreamHandler(sys.stdout)
+            SimulationLog.handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(SimulationLog.handler)
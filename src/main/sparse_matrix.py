@@ -0,0 +1,86 @@
+import numpy
+from twisted.python.formmethod import InputError
+
+
+class SparseMatrix(object):
+    '''
+    SparseMatrix is a square matrix of which only the given values are
+    stored and the other values are 0. The values are kept in row order
+    (compressed sparse rows): the columns and the values of row i are
+    cols[row_start[i]:row_start[i + 1]] and values[row_start[i]:row_start[i + 1]],
+    sorted by column.
+
+    A value is read as matrix[i, j], in the same way as from a numpy
+    array, so it can replace an evaluation matrix when most of its values
+    are 0.
+    '''
+
+    def __init__(self, size, rows, cols, values):
+        '''
+        Constructor. The value of (rows[k], cols[k]) is values[k]; a pair
+        must not be given twice.
+        '''
+        rows = numpy.asarray(rows, dtype=numpy.intp)
+        cols = numpy.asarray(cols, dtype=numpy.intp)
+        values = numpy.asarray(values, dtype=float)
+        if not (len(rows) == len(cols) == len(values)):
+            raise InputError("Error : SparseMatrix cannot have rows, cols and values of different length.")
+        if (size < 0) or numpy.any(rows < 0) or numpy.any(rows >= size) or \
+           numpy.any(cols < 0) or numpy.any(cols >= size):
+            raise InputError("Error : SparseMatrix cannot have rows or cols out of range [0,size).")
+        # The number of rows and columns of the matrix.
+        self.size = size
+        # The keys row * size + col of the stored pairs, which are sorted.
+        self.keys = rows * size + cols
+        # the pairs are sorted only if they are not given in row order.
+        if numpy.any(self.keys[1:] < self.keys[:-1]):
+            order = numpy.argsort(self.keys, kind='mergesort')
+            self.keys = self.keys[order]
+            rows = rows[order]
+            cols = cols[order]
+            values = values[order]
+        # The rows, columns and values of the stored pairs in row order.
+        self.rows = rows
+        self.cols = cols
+        self.values = values
+        # The start of the pairs of each row, and the end of the last row.
+        self.row_start = numpy.searchsorted(self.rows, numpy.arange(size + 1))
+
+    def __len__(self):
+        '''
+        Returns the number of rows.
+        '''
+        return self.size
+
+    def __getitem__(self, index):
+        '''
+        Returns the value of the (row, col) index.
+        '''
+        row, col = index
+        start = self.row_start[row]
+        end = self.row_start[row + 1]
+        position = start + numpy.searchsorted(self.cols[start:end], col)
+        if (position < end) and (self.cols[position] == col):
+            return self.values[position]
+        return 0.0
+
+    def get_values(self, rows, cols):
+        '''
+        Returns the values of the (rows[k], cols[k]) pairs as an array.
+        '''
+        keys = numpy.asarray(rows, dtype=numpy.intp) * self.size + \
+               numpy.asarray(cols, dtype=numpy.intp)
+        if len(self.keys) == 0:
+            return numpy.zeros(len(keys))
+        position = numpy.minimum(numpy.searchsorted(self.keys, keys), \
+                                 len(self.keys) - 1)
+        return numpy.where(self.keys[position] == keys, \
+                           self.values[position], 0.0)
+
+    def to_dense(self):
+        '''
+        Returns the matrix as a numpy array.
+        '''
+        dense = numpy.zeros((self.size, self.size))
+        dense[self.rows, self.cols] = self.values
+        return dense
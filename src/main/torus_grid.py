@@ -0,0 +1,278 @@
+import math
+import numpy
+from twisted.python.formmethod import InputError
+from work_counter import WorkCounter
+
+
+class TorusGrid(object):
+    '''
+    TorusGrid is a spatial index of the agent positions on the torus map.
+    The map is divided into cells which are not smaller than the radius, so
+    the points within the radius of a point are in its own cell or in one of
+    the eight cells around it. The cells on the edges of the map are
+    neighbors of the cells on the opposite edges.
+
+    The grid is built once for the positions of the active agents and then
+    answers how many of them are within the radius of a point in time that
+    depends on the number of agents around the point instead of the number
+    of agents in the network.
+
+    The points can be divided into layers, for instance the networks of an
+    ensemble, which are indexed in one grid. A point is then only counted
+    for the queries in its own layer.
+    '''
+
+    # The largest number of positions times the points of the most
+    # crowded cell for which count_in_radius_array pairs every position
+    # with every point of its neighbor cells at once.
+    PAIR_LIMIT = 1 << 18
+
+    def __init__(self, x_range, y_range, radius):
+        '''
+        Constructor
+        '''
+        if (x_range <= 0) or (y_range <= 0):
+            raise InputError("Error : TorusGrid cannot have non-positive x_range or y_range.")
+        if (radius < 0):
+            raise InputError("Error : TorusGrid cannot have radius value less than 0.")
+        # The ranges of the map on x and y axes.
+        self.x_range = x_range
+        self.y_range = y_range
+        # The radius that the queries are made for.
+        self.radius = radius
+        # The number of layers whose points are indexed.
+        self.number_of_layers = 1
+        # The number of cells on x and y axes and the size of a cell.
+        self.x_cells = 1
+        self.y_cells = 1
+        self.cell_width = x_range
+        self.cell_height = y_range
+        # The positions and ids of the indexed points.
+        self.x = numpy.zeros(0)
+        self.y = numpy.zeros(0)
+        self.ids = numpy.zeros(0, dtype=numpy.intp)
+        # The points sorted by their cells. The points of cell c are
+        # ids[cell_start[c]:cell_start[c + 1]]. The cells of layer l come
+        # after the cells of the layers before it.
+        self.cell_start = numpy.zeros(2, dtype=numpy.intp)
+        # The number of points of the most crowded cell.
+        self.most_crowded = 0
+        # The points compared with the query positions, which are taken
+        # by a WorkCounter.
+        self.counts = WorkCounter.create_counts(('neighbor_checks',))
+
+    def get_cell_count(self, map_range, num_points):
+        '''
+        Returns the number of cells on an axis. A cell is never smaller than
+        the radius and there are not more cells than the square root of the
+        number of points on an axis.
+        '''
+        cells = max(1, int(math.sqrt(num_points)))
+        if self.radius > 0:
+            # the cell is kept slightly larger than the radius so that
+            # rounding cannot put a point in the radius two cells away.
+            cells = min(cells, int(map_range / (self.radius * (1 + 1e-9))))
+        return max(1, cells)
+
+    def build(self, x, y, ids, layers=None, number_of_layers=1):
+        '''
+        Indexes the points with the given x, y positions and ids. The grid
+        is rebuilt from scratch at each call. layers gives the layer of
+        each point in range [0, number_of_layers), all points are in layer
+        0 if it is None.
+        '''
+        if (number_of_layers < 1):
+            raise InputError("Error : TorusGrid.build method cannot have number_of_layers less than 1.")
+        self.x = numpy.array(x, dtype=float)
+        self.y = numpy.array(y, dtype=float)
+        ids = numpy.array(ids, dtype=numpy.intp)
+        self.number_of_layers = number_of_layers
+        points_per_layer = len(ids) // number_of_layers
+        self.x_cells = self.get_cell_count(self.x_range, points_per_layer)
+        self.y_cells = self.get_cell_count(self.y_range, points_per_layer)
+        self.cell_width = self.x_range / float(self.x_cells)
+        self.cell_height = self.y_range / float(self.y_cells)
+
+        cells = self.get_cell(self.x, self.y, layers)
+        order = numpy.argsort(cells, kind='mergesort')
+        self.x = self.x[order]
+        self.y = self.y[order]
+        self.ids = ids[order]
+        num_cells = self.x_cells * self.y_cells * number_of_layers
+        counts = numpy.bincount(cells, minlength=num_cells)
+        self.cell_start = numpy.zeros(num_cells + 1, dtype=numpy.intp)
+        numpy.cumsum(counts, out=self.cell_start[1:])
+
+        self.most_crowded = int(counts.max()) if len(counts) else 0
+
+    def get_cell(self, x, y, layers=None):
+        '''
+        Returns the cell index of the given position(s) in the given
+        layer(s), layer 0 if layers is None.
+        '''
+        cell_x = numpy.minimum((numpy.asarray(x) / self.cell_width).astype(numpy.intp), \
+                               self.x_cells - 1)
+        cell_y = numpy.minimum((numpy.asarray(y) / self.cell_height).astype(numpy.intp), \
+                               self.y_cells - 1)
+        cell = cell_x * self.y_cells + cell_y
+        if layers is not None:
+            cell = cell + numpy.asarray(layers, dtype=numpy.intp) * \
+                          (self.x_cells * self.y_cells)
+        return cell
+
+    def get_neighbor_cells(self, cell):
+        '''
+        Returns the list of different cells around the given cell, the cell
+        itself included. The cells wrap around the edges of the map and
+        are in the layer of the given cell.
+        '''
+        layer, cell = divmod(int(cell), self.x_cells * self.y_cells)
+        first = layer * self.x_cells * self.y_cells
+        cell_x, cell_y = divmod(cell, self.y_cells)
+        xs = set((cell_x + offset) % self.x_cells for offset in (-1, 0, 1))
+        ys = set((cell_y + offset) % self.y_cells for offset in (-1, 0, 1))
+        return [first + i * self.y_cells + j for i in sorted(xs) for j in sorted(ys)]
+
+    def get_neighbor_offsets(self):
+        '''
+        Returns the list of different (x, y) cell offsets around a cell.
+        '''
+        xs = sorted(set(offset % self.x_cells for offset in (-1, 0, 1)))
+        ys = sorted(set(offset % self.y_cells for offset in (-1, 0, 1)))
+        return [(i, j) for i in xs for j in ys]
+
+    def in_radius(self, x, y, partner_x, partner_y):
+        '''
+        Returns whether the partner positions are within the radius of the
+        positions on the torus. It makes the same calculation as
+        Calculator.is_in_torus_radius.
+        '''
+        dx = numpy.absolute(x - partner_x)
+        dx = numpy.where(dx > (self.x_range / 2.0), self.x_range - dx, dx)
+        dy = numpy.absolute(y - partner_y)
+        dy = numpy.where(dy > (self.y_range / 2.0), self.y_range - dy, dy)
+        return numpy.sqrt(numpy.power(dx, 2.0) + numpy.power(dy, 2.0)) <= self.radius
+
+    def count_in_radius(self, x, y, exclude1, exclude2, layer=None):
+        '''
+        Returns the number of indexed points of the layer within the radius
+        of the position (x, y), without counting the points with ids
+        exclude1 and exclude2.
+        '''
+        count = 0
+        for cell in self.get_neighbor_cells(self.get_cell(x, y, layer)):
+            start = self.cell_start[cell]
+            end = self.cell_start[cell + 1]
+            if start == end:
+                continue
+            self.counts['neighbor_checks'] += int(end - start)
+            within = self.in_radius(x, y, self.x[start:end], self.y[start:end])
+            ids = self.ids[start:end]
+            within &= (ids != exclude1) & (ids != exclude2)
+            count += int(numpy.count_nonzero(within))
+        return count
+
+    def find_in_radius(self, x, y):
+        '''
+        Returns the pairs of the positions in the x and y arrays and the
+        indexed points within the radius of them, as the arrays
+        (positions, ids): the point with ids[k] is within the radius of
+        the position with index positions[k].
+        '''
+        x = numpy.asarray(x, dtype=float).ravel()
+        y = numpy.asarray(y, dtype=float).ravel()
+        found_positions = [numpy.zeros(0, dtype=numpy.intp)]
+        found_points = [numpy.zeros(0, dtype=numpy.intp)]
+        if (len(self.ids) == 0) or (len(x) == 0):
+            return found_positions[0], found_points[0]
+        cell_x, cell_y = numpy.divmod(self.get_cell(x, y), self.y_cells)
+        cell_size = numpy.diff(self.cell_start)
+        for offset_x, offset_y in self.get_neighbor_offsets():
+            neighbor = ((cell_x + offset_x) % self.x_cells) * self.y_cells + \
+                       (cell_y + offset_y) % self.y_cells
+            # each position is paired with every point of its neighbor
+            # cell, which are consecutive.
+            size = cell_size[neighbor]
+            positions = numpy.repeat(numpy.arange(len(x)), size)
+            first = numpy.cumsum(size) - size
+            point = numpy.arange(len(positions)) + \
+                    numpy.repeat(self.cell_start[neighbor] - first, size)
+            self.counts['neighbor_checks'] += len(positions)
+            within = self.in_radius(x[positions], y[positions], \
+                                    self.x[point], self.y[point])
+            found_positions.append(positions[within])
+            found_points.append(point[within])
+        return numpy.concatenate(found_positions), \
+               self.ids[numpy.concatenate(found_points)]
+
+    def count_in_radius_array(self, x, y, exclude1, exclude2, layers=None):
+        '''
+        Returns the number of indexed points within the radius of each of
+        the positions in the x and y arrays, without counting the points
+        with ids exclude1 and exclude2. Only the points in the layer of a
+        position are counted, layer 0 if layers is None. The arguments
+        are broadcast together to the shape of the result.
+        '''
+        if layers is None:
+            layers = 0
+        x, y, exclude1, exclude2, layers = numpy.broadcast_arrays( \
+            numpy.asarray(x, dtype=float), numpy.asarray(y, dtype=float), \
+            exclude1, exclude2, numpy.asarray(layers, dtype=numpy.intp))
+        shape = x.shape
+        count = numpy.zeros(x.size, dtype=numpy.int32)
+        if len(self.ids) == 0:
+            return count.reshape(shape)
+        x = x.ravel()
+        y = y.ravel()
+        exclude1 = exclude1.ravel()
+        exclude2 = exclude2.ravel()
+        cell_x, cell_y = numpy.divmod(self.get_cell(x, y), self.y_cells)
+        first = layers.ravel() * (self.x_cells * self.y_cells)
+        cell_size = numpy.diff(self.cell_start)
+        if x.size * self.most_crowded <= TorusGrid.PAIR_LIMIT:
+            for offset_x, offset_y in self.get_neighbor_offsets():
+                neighbor = first + \
+                           ((cell_x + offset_x) % self.x_cells) * self.y_cells + \
+                           (cell_y + offset_y) % self.y_cells
+                # each position is paired with every point of its neighbor
+                # cell, which are consecutive.
+                size = cell_size[neighbor]
+                positions = numpy.repeat(numpy.arange(x.size), size)
+                start = numpy.cumsum(size) - size
+                point = numpy.arange(len(positions)) + \
+                        numpy.repeat(self.cell_start[neighbor] - start, size)
+                ids = self.ids[point]
+                self.counts['neighbor_checks'] += len(positions)
+                within = self.in_radius(x[positions], y[positions], \
+                                        self.x[point], self.y[point])
+                within &= (ids != exclude1[positions]) & \
+                          (ids != exclude2[positions])
+                count += numpy.bincount(positions[within], \
+                                        minlength=x.size).astype(count.dtype)
+            return count.reshape(shape)
+        for offset_x, offset_y in self.get_neighbor_offsets():
+            neighbor = first + \
+                       ((cell_x + offset_x) % self.x_cells) * self.y_cells + \
+                       (cell_y + offset_y) % self.y_cells
+            # the points of a cell are consecutive, so the slot-th point of
+            # the neighbor cell is compared for the positions whose
+            # neighbor cell has more than slot points.
+            positions = numpy.arange(x.size)
+            start = self.cell_start[neighbor]
+            size = cell_size[neighbor]
+            self.counts['neighbor_checks'] += int(size.sum())
+            for slot in range(self.most_crowded):
+                more = size > slot
+                positions = positions[more]
+                if len(positions) == 0:
+                    break
+                start = start[more]
+                size = size[more]
+                point = start + slot
+                ids = self.ids[point]
+                within = self.in_radius(x[positions], y[positions], \
+                                        self.x[point], self.y[point])
+                within &= (ids != exclude1[positions]) & \
+                          (ids != exclude2[positions])
+                count[positions] += within
+        return count.reshape(shape)
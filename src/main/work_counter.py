@@ -0,0 +1,99 @@
+from twisted.python.formmethod import InputError
+
+
+class WorkCounter(object):
+    '''
+    WorkCounter sums up how much work the cycles of a run do, which
+    explains the time of the phases measured by PhaseTimer. The counters
+    are:
+    pair_evaluations : the pairs whose learning and next positions are
+    calculated.
+    neighbor_checks : the points compared with a position by the spatial
+    indexes to count the agents within radius R, for LOSS.
+    matching_iterations : the candidates and blocks of candidates gone
+    through by the alliance matcher.
+    alliance_attempts : the pairs tried by the alliance matcher.
+    alliance_rejections : the tried pairs that did not make alliance.
+    alliances : the alliances made.
+
+    The parts of the simulation count their work in their counts
+    dictionaries, which are taken by take method. The modes are the same
+    as the modes of PhaseTimer.
+    '''
+
+    # The modes of the counter.
+    MODES = ('off', 'run', 'cycle')
+
+    # The counters, in the order they are written.
+    COUNTERS = ('pair_evaluations', 'neighbor_checks', 'matching_iterations', \
+                'alliance_attempts', 'alliance_rejections', 'alliances')
+
+    def __init__(self, mode='run'):
+        '''
+        Constructor
+        '''
+        if mode not in WorkCounter.MODES:
+            raise InputError("Error : WorkCounter cannot have mode " + str(mode) + ".")
+        # The mode that decides what is counted.
+        self.mode = mode
+        # The cycle that the counted work belongs to.
+        self.cycle = 0
+        # The total of each counter in the run.
+        self.values = dict((name, 0) for name in WorkCounter.COUNTERS)
+        # The value of each (cycle, counter) in cycle mode.
+        self.cycle_values = {}
+
+    @staticmethod
+    def create_counts(names):
+        '''
+        Returns the counts dictionary of the given counters, with which a
+        part of the simulation counts its work.
+        '''
+        for name in names:
+            if name not in WorkCounter.COUNTERS:
+                raise InputError("Error : WorkCounter cannot have counter " + str(name) + ".")
+        return dict((name, 0) for name in names)
+
+    def set_cycle(self, cycle):
+        '''
+        Sets the cycle that the following work belongs to.
+        '''
+        self.cycle = cycle
+
+    def add(self, name, value):
+        '''
+        Adds value to the counter name in the current cycle.
+        '''
+        if self.mode == 'off':
+            return
+        if name not in self.values:
+            raise InputError("Error : WorkCounter cannot have counter " + str(name) + ".")
+        self.values[name] += value
+        if self.mode == 'cycle':
+            key = (self.cycle, name)
+            self.cycle_values[key] = self.cycle_values.get(key, 0) + value
+
+    def take(self, counts):
+        '''
+        Adds the values of the counts dictionary to the counters and sets
+        them to 0.
+        '''
+        for name in counts:
+            self.add(name, counts[name])
+            counts[name] = 0
+
+    def get_rows(self):
+        '''
+        Returns the (counter, value) rows of the run.
+        '''
+        return [(name, self.values[name]) for name in WorkCounter.COUNTERS]
+
+    def get_cycle_rows(self):
+        '''
+        Returns the (cycle, counter, value) rows of the cycles in cycle
+        mode, in the order of cycles and counters.
+        '''
+        order = dict((name, i) for i, name in enumerate(WorkCounter.COUNTERS))
+        keys = sorted(self.cycle_values, key=lambda key: (key[0], order[key[1]]))
+        return [(cycle, name, self.cycle_values[(cycle, name)]) \
+                for cycle, name in keys]
@@ -6,6 +6,7 @@ from twisted.python.formmethod import InputError
 sys.path.append("../")
 
 from main.agent import Agent
+from main.population import Population
 from main.sigma import Sigma
 
 
@@ -38,12 +39,15 @@ class TestAgent(unittest.TestCase):
 
 
         self.sigma = Sigma()
+        # The agents are in one population so that they can make
+        # alliances.
+        self.population = Population()
         # 20 is given as seed. 
         random.seed(20)
-        self.agent1 = Agent(0, 0, self.sigma)
+        self.agent1 = Agent(0, 0, self.sigma, self.population)
         # 30 is given as seed.
         random.seed(30)
-        self.agent2 = Agent(1, 1, self.sigma)
+        self.agent2 = Agent(1, 1, self.sigma, self.population)
 
                 
     def tearDown(self):
@@ -51,6 +55,7 @@ class TestAgent(unittest.TestCase):
         Releases the used sources for the tests.
         t        '''
         self.sigma = None
+        self.population = None
         self.agent1 = None
         self.agent2 = None
 
@@ -69,7 +74,7 @@ class TestAgent(unittest.TestCase):
         self.assertEqual(3.832546281813221, self.agent1.cum_knowledge)
         self.assertEqual(0, self.agent1.cycle_realized_learning)
         self.assertEqual(0, self.agent1.next_map_market)
-        self.assertEqual(0, self.agent1.next_map_knowledge)
+        self.assertEqual(0, self.agent1.next_map_tech)
         self.assertEqual(None, self.agent1.alliance)
 
         # Tests the values for agent2 with seed 30.
@@ -83,7 +88,7 @@ class TestAgent(unittest.TestCase):
         self.assertEqual(0.15018454275563531, self.agent2.cum_knowledge)
         self.assertEqual(0, self.agent2.cycle_realized_learning)
         self.assertEqual(0, self.agent2.next_map_market)
-        self.assertEqual(0, self.agent2.next_map_knowledge)
+        self.assertEqual(0, self.agent2.next_map_tech)
         self.assertEqual(None, self.agent2.alliance)
 
     def test_reset(self):
@@ -93,13 +98,13 @@ class TestAgent(unittest.TestCase):
         self.agent1.make_alliance(self.agent2)
         self.agent1.cycle_realized_learning = 10
         self.agent1.next_map_market = 0.3
-        self.agent1.next_map_knowledge = 0.5
+        self.agent1.next_map_tech = 0.5
         
         self.agent1.reset()
         
         self.assertEqual(0, self.agent1.cycle_realized_learning)
         self.assertEqual(0, self.agent1.next_map_market)
-        self.assertEqual(0, self.agent1.next_map_knowledge)
+        self.assertEqual(0, self.agent1.next_map_tech)
         self.assertEqual(None, self.agent1.alliance)
     
     def test_exit(self):
@@ -138,6 +143,12 @@ class TestAgent(unittest.TestCase):
                                                            None)
         self.assertRaises(InputError, Agent.make_alliance, self.agent1, \
                                                            self.agent1)
+        # Agents created without a population are in populations of
+        # their own.
+        detached = Agent(2, 0, self.sigma)
+        self.assertEqual(1, detached.population.size)
+        self.assertRaises(InputError, Agent.make_alliance, self.agent1, \
+                                                           detached)
         
     def test_calculate_next_position(self):
         '''
@@ -152,7 +163,7 @@ class TestAgent(unittest.TestCase):
         
         self.agent1.calculate_next_position()
         self.assertEqual(0, self.agent1.next_map_market)
-        self.assertEqual(0, self.agent1.next_map_knowledge)
+        self.assertEqual(0, self.agent1.next_map_tech)
         
         self.agent1.make_alliance(self.agent2)
         self.agent1.calculate_next_position()
@@ -160,11 +171,11 @@ class TestAgent(unittest.TestCase):
 
         # learning of the agent_1 is null so no movement for it
         self.assertAlmostEqual(18.112793523490414, self.agent1.next_map_market)
-        self.assertAlmostEqual(13.725083140534052, self.agent1.next_map_knowledge)
+        self.assertAlmostEqual(13.725083140534052, self.agent1.next_map_tech)
 
         # learning of the agent_2 in market dimension is null
         self.assertAlmostEqual(10.781631292116211, self.agent2.next_map_market)
-        self.assertAlmostEqual(5.991987079, self.agent2.next_map_knowledge)
+        self.assertAlmostEqual(5.991987079, self.agent2.next_map_tech)
 
     def test_move_next_position(self):
         '''
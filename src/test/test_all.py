@@ -14,6 +14,27 @@ from test_cyclic_data import TestCyclicData
 from test_agent import TestAgent
 from test_network import TestNetwork
 from test_plotter import TestPlotter
+from test_evaluation_engine import TestEvaluationEngine
+from test_torus_grid import TestTorusGrid
+from test_alliance_matcher import TestAllianceMatcher
+from test_population import TestPopulation
+from test_parallel_runner import TestParallelRunner
+from test_parameter_sweep import TestParameterSweep
+from test_configuration import TestConfiguration
+from test_random_stream import TestRandomStream
+from test_columnar_data import TestColumnarData
+from test_plot_renderer import TestPlotRenderer
+from test_plot_policy import TestPlotPolicy
+from test_ensemble import TestEnsemble
+from test_sparse_matrix import TestSparseMatrix
+from test_candidate_generator import TestCandidateGenerator
+from test_phase_timer import TestPhaseTimer
+from test_work_counter import TestWorkCounter
+from test_scaling_benchmark import TestScalingBenchmark
+from test_checkpoint import TestCheckpoint
+from test_branching import TestBranching
+from test_cycle_recorder import TestCycleRecorder
+from test_progress_reporter import TestProgressReporter
 #from test.test_sigma import TestSigma
 
 if __name__ == '__main__':
@@ -25,11 +46,49 @@ if __name__ == '__main__':
     suiteCyclicData = unittest.TestLoader().loadTestsFromTestCase(TestCyclicData)
     suiteNetwork = unittest.TestLoader().loadTestsFromTestCase(TestNetwork)
     suitePlotter = unittest.TestLoader().loadTestsFromTestCase(TestPlotter)
+    suiteEvaluationEngine = unittest.TestLoader().loadTestsFromTestCase(TestEvaluationEngine)
+    suiteTorusGrid = unittest.TestLoader().loadTestsFromTestCase(TestTorusGrid)
+    suiteAllianceMatcher = unittest.TestLoader().loadTestsFromTestCase(TestAllianceMatcher)
+    suitePopulation = unittest.TestLoader().loadTestsFromTestCase(TestPopulation)
+    suiteParallelRunner = unittest.TestLoader().loadTestsFromTestCase(TestParallelRunner)
+    suiteParameterSweep = unittest.TestLoader().loadTestsFromTestCase(TestParameterSweep)
+    suiteConfiguration = unittest.TestLoader().loadTestsFromTestCase(TestConfiguration)
+    suiteRandomStream = unittest.TestLoader().loadTestsFromTestCase(TestRandomStream)
+    suiteColumnarData = unittest.TestLoader().loadTestsFromTestCase(TestColumnarData)
+    suitePlotRenderer = unittest.TestLoader().loadTestsFromTestCase(TestPlotRenderer)
+    suitePlotPolicy = unittest.TestLoader().loadTestsFromTestCase(TestPlotPolicy)
+    suiteEnsemble = unittest.TestLoader().loadTestsFromTestCase(TestEnsemble)
+    suiteSparseMatrix = unittest.TestLoader().loadTestsFromTestCase(TestSparseMatrix)
+    suiteCandidateGenerator = unittest.TestLoader().loadTestsFromTestCase(TestCandidateGenerator)
+    suitePhaseTimer = unittest.TestLoader().loadTestsFromTestCase(TestPhaseTimer)
+    suiteWorkCounter = unittest.TestLoader().loadTestsFromTestCase(TestWorkCounter)
+    suiteScalingBenchmark = unittest.TestLoader().loadTestsFromTestCase(TestScalingBenchmark)
+    suiteCheckpoint = unittest.TestLoader().loadTestsFromTestCase(TestCheckpoint)
+    suiteBranching = unittest.TestLoader().loadTestsFromTestCase(TestBranching)
+    suiteCycleRecorder = unittest.TestLoader().loadTestsFromTestCase(TestCycleRecorder)
+    suiteProgressReporter = unittest.TestLoader().loadTestsFromTestCase(TestProgressReporter)
 #    suiteSigma = unittest.TestLoader().loadTestsFromTestCase(TestSigma)
     allTests = unittest.TestSuite([suiteAgent, \
                                    suiteCalculator, \
                                    suiteCyclicData, \
                                    suiteNetwork, \
-                                   suitePlotter])
+                                   suitePlotter, \
+                                   suiteEvaluationEngine, \
+                                   suiteTorusGrid, \
+                                   suiteAllianceMatcher, \
+                                   suitePopulation, \
+                                   suiteParallelRunner, \
+                                   suiteParameterSweep, \
+                                   suiteConfiguration, \
+                                   suiteRandomStream, \
+                                   suiteColumnarData, \
+                                   suitePlotRenderer, \
+                                   suitePlotPolicy, \
+                                   suiteEnsemble, \
+                                   suiteSparseMatrix, \
+                                   suiteCandidateGenerator, suitePhaseTimer, \
+                                   suiteWorkCounter, suiteScalingBenchmark, \
+                                   suiteCheckpoint, suiteBranching, \
+                                   suiteCycleRecorder, suiteProgressReporter])
 #                                   suiteSigma])
     unittest.TextTestRunner(verbosity=2).run(allTests)
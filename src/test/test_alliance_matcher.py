@@ -0,0 +1,163 @@
+import unittest
+import random
+import sys
+import numpy
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.alliance_matcher import AllianceMatcher
+from main.sparse_matrix import SparseMatrix
+from main.calculator import Calculator
+
+
+class TestAllianceMatcher(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates a random 20 x 20 evaluation matrix with repeated values so
+        that there are ties, and zeros on the diagonal.
+        '''
+        random.seed(10)
+        self.size = 20
+        self.matrix = [[random.choice([0.0, 1.0, 2.5, 4.0, random.uniform(0, 5)]) \
+                        for j in range(self.size)] for i in range(self.size)]
+        for i in range(self.size):
+            self.matrix[i][i] = 0.0
+        self.margin = 40.0
+
+    def tearDown(self):
+        self.matrix = None
+
+    def accept(self, agent_index, partner_index, agent_learning, partner_learning):
+        '''
+        Accepts the alliance if the difference of the expected learnings is
+        within the margin.
+        '''
+        return Calculator.get_difference_percentage(agent_learning, \
+                                                    partner_learning) <= self.margin
+
+    def match_by_rescan(self):
+        '''
+        Decides the alliances by searching the matrix for its max value as
+        Network.make_network_alliances used to do.
+        '''
+        matrix = [list(row) for row in self.matrix]
+        alliances = []
+        max_value = max(max(row) for row in matrix)
+        while max_value:
+            for i in range(self.size):
+                for j in range(self.size):
+                    if (i != j) and (matrix[i][j] == max_value):
+                        if self.accept(i, j, matrix[i][j], matrix[j][i]):
+                            alliances.append((i, j))
+                            Calculator.reset_row_column(i, j, matrix)
+                        else:
+                            matrix[i][j] = 0
+            max_value = max(max(row) for row in matrix)
+        return alliances
+
+    def test_match(self):
+        '''
+        Tests that the match method makes the same alliances in the same
+        order as searching the matrix for its max value.
+        '''
+        matcher = AllianceMatcher(self.accept)
+        for margin in (0.0, 40.0, 100.0):
+            self.margin = margin
+            rows, cols, values, reverse_values = \
+                AllianceMatcher.get_candidates(self.matrix)
+            self.assertEqual(self.match_by_rescan(), \
+                             matcher.match(rows, cols, values, reverse_values, \
+                                           self.size))
+
+    def test_counts(self):
+        '''
+        Tests that the match and match_with_bounds methods count the
+        candidates they go through, the pairs they try and the alliances
+        they make.
+        '''
+        self.margin = 40.0
+        matcher = AllianceMatcher(self.accept)
+        rows, cols, values, reverse_values = \
+            AllianceMatcher.get_candidates(self.matrix)
+        alliances = matcher.match(rows, cols, values, reverse_values, self.size)
+        counts = matcher.counts
+        self.assertEqual(len(rows), counts['matching_iterations'])
+        self.assertEqual(len(alliances), counts['alliances'])
+        self.assertEqual(counts['alliance_attempts'], \
+                         counts['alliances'] + counts['alliance_rejections'])
+        self.assertTrue(counts['alliance_rejections'] > 0)
+        attempts = counts['alliance_attempts']
+        matcher.match_with_bounds(rows, cols, values, \
+                                  lambda rows, cols: numpy.array(self.matrix)[rows, cols], \
+                                  self.size)
+        self.assertEqual(2 * len(alliances), counts['alliances'])
+        self.assertEqual(2 * attempts, counts['alliance_attempts'])
+
+    def test_match_with_bounds(self):
+        '''
+        Tests that the match_with_bounds method makes the same alliances in
+        the same order as the match method with the exact values, when the
+        bounds are the exact values or larger.
+        '''
+        matcher = AllianceMatcher(self.accept)
+        exact = numpy.array(self.matrix)
+        bounds = exact * numpy.array([[1.0 + (i * j) % 3 for j in range(self.size)] \
+                                      for i in range(self.size)])
+        get_values = lambda rows, cols: exact[rows, cols]
+        for margin in (0.0, 40.0, 100.0):
+            self.margin = margin
+            rows, cols, values, reverse_values = \
+                AllianceMatcher.get_candidates(exact)
+            alliances = matcher.match(rows, cols, values, reverse_values, \
+                                      self.size)
+            for matrix in (exact, bounds):
+                rows, cols, values, reverse_values = \
+                    AllianceMatcher.get_candidates(matrix)
+                self.assertEqual(alliances, \
+                                 matcher.match_with_bounds(rows, cols, values, \
+                                                           get_values, \
+                                                           self.size))
+
+    def test_get_order(self):
+        '''
+        Tests that the ties are ordered by agent index and partner index.
+        '''
+        order = AllianceMatcher.get_order([2, 0, 1, 0], [0, 2, 0, 1], \
+                                          [1.0, 1.0, 3.0, 1.0])
+        self.assertEqual([2, 3, 1, 0], list(order))
+
+    def test_get_candidates(self):
+        '''
+        Tests the get_candidates method of AllianceMatcher class.
+        '''
+        rows, cols, values, reverse_values = \
+            AllianceMatcher.get_candidates([[0, 2.0], [0, 0]])
+        self.assertEqual([0], list(rows))
+        self.assertEqual([1], list(cols))
+        self.assertEqual([2.0], list(values))
+        self.assertEqual([0.0], list(reverse_values))
+
+    def test_get_candidates_sparse(self):
+        '''
+        Tests that the get_candidates method gives the same candidates for
+        a SparseMatrix as for the dense matrix.
+        '''
+        matrix = numpy.array([[0, 2.0, 0], [1.0, 0, 0], [0, 3.0, 0]])
+        rows, cols = numpy.nonzero(matrix)
+        sparse = SparseMatrix(3, rows, cols, matrix[rows, cols])
+        for dense_values, sparse_values in \
+                zip(AllianceMatcher.get_candidates(matrix), \
+                    AllianceMatcher.get_candidates(sparse)):
+            self.assertEqual(list(dense_values), list(sparse_values))
+
+    def test_get_candidates_exception(self):
+        '''
+        Tests the get_candidates method for invalid input.
+        '''
+        self.assertRaises(InputError, AllianceMatcher.get_candidates, \
+                          [[0, 1, 2], [1, 0, 2]])
+
+if __name__ == "__main__":
+    unittest.main()
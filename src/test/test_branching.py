@@ -0,0 +1,108 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.branching import Branching
+from main.aging import Aging
+from main.cyclic_data import CyclicData
+from main.configuration import Configuration
+from main.random_stream import RandomStream
+from main.calculator import Calculator
+
+
+class TestBranching(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates the configuration of small seeded runs with breakthroughs
+        in a temporary output directory.
+        '''
+        self.output_dir = tempfile.mkdtemp()
+        self.config = Configuration(MASTER_SEED=3, START_NUM_AGENT=20, \
+                                    NUMBER_OF_CYCLES=6, PLOT_MODE='off', \
+                                    LAMBDA_POISSON=2.0, NUMBER_OF_RUNS=2, \
+                                    NUMBER_OF_WORKERS=1, \
+                                    OUTPUT_DIR=os.path.join(self.output_dir, 'branches', ''))
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+        Calculator.set_config(Configuration.get_default())
+
+    def read_files(self, output_dir):
+        '''
+        Returns the contents of the cycle data files in output_dir.
+        '''
+        return [open(os.path.join(output_dir, file_name + '.txt')).read() \
+                for file_name in CyclicData.FILE_NAMES]
+
+    def read_cycles(self, output_dir, file_name, last_cycle):
+        '''
+        Returns the rows of the file in output_dir up to last_cycle.
+        '''
+        lines = open(os.path.join(output_dir, file_name + '.txt')).readlines()
+        return [line for line in lines[1:] \
+                if int(line.split(',')[1]) <= last_cycle]
+
+    def test_trunk(self):
+        '''
+        Tests that the branches have the data of the runs made without
+        branching up to the branch cycle.
+        '''
+        Branching([{'LOSS': 0.5}], 3, config=self.config).run()
+        run_dir = os.path.join(self.output_dir, 'run')
+        cyclic_data = CyclicData(run_dir, self.config)
+        cyclic_data.set_run(1)
+        Aging(1, cyclic_data, self.config, RandomStream.for_run(3, 1))
+        cyclic_data.close_all()
+        branch_dir = os.path.join(self.config.OUTPUT_DIR, 'branch_1')
+        for file_name in ('data_network', 'data_agent_cycle', 'data_alliance'):
+            expected = self.read_cycles(run_dir, file_name, 3)
+            values = self.read_cycles(branch_dir, file_name, 3)
+            self.assertEqual(expected, values[:len(expected)])
+            self.assertNotEqual(self.read_cycles(run_dir, file_name, 6), \
+                                self.read_cycles(branch_dir, file_name, 6))
+        self.assertEqual(['BRANCH_CYCLE,3\n', 'LOSS,0.5\n'], \
+                         open(os.path.join(branch_dir, 'branch_file.txt')).readlines())
+        self.assertFalse(os.path.exists(os.path.join(self.config.OUTPUT_DIR, 'trunk')))
+
+    def test_branches(self):
+        '''
+        Tests that the branches draw their own numbers and that the
+        branches made in worker processes have the same data.
+        '''
+        branches = [{}, {}, {'ALLIANCE_MARGIN': 0.2, 'NUMBER_OF_CYCLES': 8}]
+        Branching(branches, 2, config=self.config).run()
+        files = [self.read_files(os.path.join(self.config.OUTPUT_DIR, \
+                                              'branch_' + str(branch))) \
+                 for branch in (1, 2, 3)]
+        self.assertNotEqual(files[0], files[1])
+        self.assertEqual(set(range(9)), \
+                         set(int(line.split(',')[1]) for line in \
+                             files[2][4].splitlines()[1:]))
+        Branching(branches, 2, number_of_workers=2, config=self.config).run()
+        for branch in (1, 2, 3):
+            self.assertEqual(files[branch - 1], \
+                             self.read_files(os.path.join(self.config.OUTPUT_DIR, \
+                                                          'branch_' + str(branch))))
+
+    def test_constructor_exception(self):
+        '''
+        Tests the constructor of Branching for invalid input.
+        '''
+        self.assertRaises(InputError, Branching, [], 2, config=self.config)
+        self.assertRaises(InputError, Branching, [{}], 7, config=self.config)
+        self.assertRaises(InputError, Branching, [{}], -1, config=self.config)
+        self.assertRaises(InputError, Branching, [{'NUMBER_OF_CYCLES': 2}], 3, \
+                          config=self.config)
+        self.assertRaises(InputError, Branching, [{'START_NUM_AGENT': 10}], 3, \
+                          config=self.config)
+        self.assertRaises(InputError, Branching, [{}], 3, \
+                          config=self.config.copy(ENSEMBLE_SIZE=4))
+
+if __name__ == "__main__":
+    unittest.main()
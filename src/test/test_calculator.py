@@ -358,6 +358,44 @@ class TestCalculator(unittest.TestCase):
         self.assertRaises(InputError, \
                           Calculator.reset_row_column, 3, 0, \
                           [[1, 2, 3] , [2, 4, 5], [3, 5, 7]])
+
+    def test_set_checked(self):
+        '''
+        Tests that the methods skip the input checks in unchecked mode and
+        give the same results as in checked mode.
+        '''
+        distance = Calculator.get_torus_distance(2.0, 15.0, MAP_MARKET)
+        position = Calculator.calculate_next_position(2.0, 4.0, MAP_MARKET, \
+                                                      0.2, 1.0)
+        Calculator.set_checked(0)
+        try:
+            self.assertEqual(distance, \
+                             Calculator.get_torus_distance(2.0, 15.0, MAP_MARKET))
+            self.assertEqual(position, \
+                             Calculator.calculate_next_position(2.0, 4.0, \
+                                                                MAP_MARKET, \
+                                                                0.2, 1.0))
+            Calculator.get_torus_distance(-1.0, 2.0, MAP_MARKET)
+            Calculator.parabola_distance(1.0, MAX_SIGMA)
+            Calculator.is_in_torus_radius(-1, 2, 3, 4, 1, MAP_MARKET, MAP_TECH)
+        finally:
+            Calculator.set_checked(1)
+        self.assertRaises(InputError, \
+                          Calculator.get_torus_distance, -1.0, 2.0, MAP_MARKET)
+
+    def test_validate_exception(self):
+        '''
+        Tests the validate_sigma and validate_position methods of the
+        Calculator class for invalid input.
+        '''
+        Calculator.validate_sigma((MIN_SIGMA + MAX_SIGMA) / 2)
+        Calculator.validate_position(MAP_MARKET, MAP_MARKET)
+        self.assertRaises(InputError, Calculator.validate_sigma, MIN_SIGMA)
+        self.assertRaises(InputError, Calculator.validate_sigma, MAX_SIGMA)
+        self.assertRaises(InputError, Calculator.validate_position, -0.1, \
+                          MAP_MARKET)
+        self.assertRaises(InputError, Calculator.validate_position, \
+                          MAP_MARKET + 0.1, MAP_MARKET)
     
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import random
+import sys
+import numpy
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.candidate_generator import CandidateGenerator
+from main.calculator import Calculator
+from main.global_values import BETA, MAX_SIGMA
+
+
+class TestCandidateGenerator(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates random positions and sigmas for 80 agents on a 60 x 40
+        map. Agent 5 is not active.
+        '''
+        random.seed(10)
+        self.num_agent = 80
+        self.map_market = 60.0
+        self.map_tech = 40.0
+        self.market = [random.uniform(0, self.map_market) for i in range(self.num_agent)]
+        self.knowledge = [random.uniform(0, self.map_tech) for i in range(self.num_agent)]
+        self.sigma_m = [random.uniform(0.1, MAX_SIGMA - 0.1) for i in range(self.num_agent)]
+        self.sigma_k = [random.uniform(0.1, MAX_SIGMA - 0.1) for i in range(self.num_agent)]
+        self.is_active = [1] * self.num_agent
+        self.is_active[5] = 0
+        self.generator = CandidateGenerator(self.map_market, self.map_tech, BETA)
+
+    def tearDown(self):
+        self.generator = None
+
+    def test_get_pairs(self):
+        '''
+        Tests that the pairs contain every pair with positive parabola
+        distance on an axis, and no pair of an agent with itself or with
+        an inactive agent.
+        '''
+        rows, cols = self.generator.get_pairs(self.market, self.knowledge, \
+                                              self.sigma_m, self.sigma_k, \
+                                              self.is_active)
+        pairs = set(zip(rows, cols))
+        self.assertEqual(len(rows), len(pairs))
+        self.assertEqual(sorted(pairs), zip(rows, cols))
+        for i in range(self.num_agent):
+            for j in range(self.num_agent):
+                if (i == j) or not (self.is_active[i] and self.is_active[j]):
+                    self.assertFalse((i, j) in pairs)
+                    continue
+                market = Calculator.distance(Calculator.get_torus_distance( \
+                            self.market[i], self.market[j], self.map_market), \
+                            self.sigma_m[i])
+                knowledge = Calculator.distance(Calculator.get_torus_distance( \
+                            self.knowledge[i], self.knowledge[j], self.map_tech), \
+                            self.sigma_k[i])
+                if (market > 0) or (knowledge > 0):
+                    self.assertTrue((i, j) in pairs)
+
+    def test_get_band_pairs_wrap(self):
+        '''
+        Tests that the bands wrap around the edges of the map.
+        '''
+        rows, cols = CandidateGenerator.get_band_pairs([0.5, 9.0, 5.0], \
+                                                       numpy.array([1.0] * 3), \
+                                                       numpy.array([2.0] * 3), \
+                                                       10.0)
+        self.assertEqual([(0, 1), (1, 0)], sorted(set(zip(rows, cols))))
+
+    def test_exception(self):
+        '''
+        Tests the constructor for invalid input.
+        '''
+        self.assertRaises(InputError, CandidateGenerator, 0, 10, BETA)
+
+if __name__ == "__main__":
+    unittest.main()
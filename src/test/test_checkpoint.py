@@ -0,0 +1,140 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.checkpoint import Checkpoint
+from main.aging import Aging
+from main.cyclic_data import CyclicData
+from main.columnar_data import ColumnarData, create_cyclic_data
+from main.configuration import Configuration
+from main.random_stream import RandomStream
+from main.calculator import Calculator
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates the configuration of a small seeded run with breakthroughs
+        in a temporary output directory.
+        '''
+        self.output_dir = tempfile.mkdtemp()
+        self.config = Configuration(MASTER_SEED=5, START_NUM_AGENT=20, \
+                                    NUMBER_OF_CYCLES=5, PLOT_MODE='off', \
+                                    LAMBDA_POISSON=2.0, CHECKPOINT_EVERY=2, \
+                                    OUTPUT_DIR=self.output_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+        Calculator.set_config(Configuration.get_default())
+
+    def read_files(self, output_dir):
+        '''
+        Returns the contents of the cycle data files in output_dir.
+        '''
+        return [open(os.path.join(output_dir, file_name + '.txt')).read() \
+                for file_name in CyclicData.FILE_NAMES]
+
+    def run_alone(self, output_dir, config):
+        '''
+        Makes the run without checkpoints.
+        '''
+        cyclic_data = create_cyclic_data(output_dir, config)
+        cyclic_data.set_run(1)
+        Aging(1, cyclic_data, config, RandomStream.for_run(config.MASTER_SEED, 1))
+        cyclic_data.close_all()
+
+    def resume(self, output_dir, config, checkpoint):
+        '''
+        Resumes the run from its checkpoint.
+        '''
+        state = checkpoint.load()
+        cyclic_data = create_cyclic_data(output_dir, config, state['offsets'])
+        cyclic_data.set_run(1)
+        Aging(1, cyclic_data, config, RandomStream.for_run(config.MASTER_SEED, 1), \
+              None, 1, checkpoint, state)
+        cyclic_data.close_all()
+
+    def test_save_load(self):
+        '''
+        Tests that the saved state is loaded and that the temporary file
+        is replaced.
+        '''
+        checkpoint = Checkpoint(self.output_dir, 3)
+        self.assertEqual(None, checkpoint.load())
+        checkpoint.save({'cycle': 3, 'values': [1.5, 2.5]})
+        checkpoint.save({'cycle': 6, 'values': [1.5]})
+        self.assertEqual({'cycle': 6, 'values': [1.5]}, checkpoint.load())
+        self.assertEqual([Checkpoint.FILE_NAME], os.listdir(self.output_dir))
+        self.assertTrue(checkpoint.is_due(6))
+        self.assertFalse(checkpoint.is_due(4))
+        self.assertFalse(Checkpoint(self.output_dir, 0).is_due(4))
+        checkpoint.delete()
+        self.assertEqual(None, checkpoint.load())
+        self.assertEqual(None, Checkpoint.for_config(self.output_dir, \
+                                                     Configuration()))
+        self.assertEqual(2, Checkpoint.for_config(self.output_dir, \
+                                                  self.config).every)
+
+    def test_resume(self):
+        '''
+        Tests that a run stopped after a checkpoint and resumed writes the
+        same data as the run made at once, in both output formats, and
+        that resuming a finished run does not change its data.
+        '''
+        for output_format in ('csv', 'columnar'):
+            config = self.config.copy(OUTPUT_FORMAT=output_format)
+            alone_dir = os.path.join(self.output_dir, output_format + '_alone')
+            run_dir = os.path.join(self.output_dir, output_format)
+            self.run_alone(alone_dir, config)
+            # the run is stopped in cycle 3, after the checkpoint of cycle
+            # 2 and some of the rows of cycle 3 are written.
+            cyclic_data = create_cyclic_data(run_dir, config)
+            cyclic_data.set_run(1)
+            checkpoint = Checkpoint(run_dir, config.CHECKPOINT_EVERY)
+            aging = Aging(1, cyclic_data, config, \
+                          RandomStream.for_run(config.MASTER_SEED, 1), None, 0, \
+                          checkpoint)
+            for cycle in range(1, 4):
+                aging.start_cycle(cycle)
+                aging.network.calculate_network()
+                if cycle < 3:
+                    aging.end_cycle(cycle)
+                if checkpoint.is_due(cycle):
+                    checkpoint.save(aging.get_state())
+            cyclic_data.close_all()
+            self.assertEqual(2, checkpoint.load()['cycle'])
+            self.resume(run_dir, config, checkpoint)
+            self.assertEqual(1, checkpoint.load()['finished'])
+            self.resume(run_dir, config, checkpoint)
+            if output_format == 'columnar':
+                ColumnarData.to_csv(alone_dir)
+                ColumnarData.to_csv(run_dir)
+            self.assertEqual(self.read_files(alone_dir), self.read_files(run_dir))
+
+    def test_constructor_exception(self):
+        '''
+        Tests the constructor of Checkpoint and the resume of another run
+        for invalid input.
+        '''
+        self.assertRaises(InputError, Checkpoint, self.output_dir, -1)
+        run_dir = os.path.join(self.output_dir, 'run')
+        config = self.config.copy(NUMBER_OF_CYCLES=2)
+        cyclic_data = CyclicData(run_dir, config)
+        cyclic_data.set_run(1)
+        checkpoint = Checkpoint(run_dir, 2)
+        Aging(1, cyclic_data, config, RandomStream.for_run(5, 1), None, 1, \
+              checkpoint)
+        cyclic_data.close_all()
+        state = checkpoint.load()
+        self.assertRaises(InputError, Aging, 2, CyclicData(run_dir, config, \
+                                                           state['offsets']), \
+                          config, RandomStream.for_run(5, 2), None, 0, None, state)
+
+if __name__ == "__main__":
+    unittest.main()
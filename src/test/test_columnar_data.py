@@ -0,0 +1,201 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+import numpy
+
+sys.path.append("../")
+
+from main.columnar_data import ColumnarData, create_cyclic_data
+from main.column_table import ColumnTable
+from main.cyclic_data import CyclicData
+from main.configuration import Configuration
+
+
+class TestColumnarData(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Writes the same rows with CyclicData and ColumnarData in two
+        temporary directories.
+        '''
+        self.csv_dir = tempfile.mkdtemp()
+        self.columnar_dir = tempfile.mkdtemp()
+        for cyclic_data in (CyclicData(self.csv_dir), \
+                            ColumnarData(self.columnar_dir)):
+            self.write_rows(cyclic_data, 1)
+            cyclic_data.close_all()
+
+    def tearDown(self):
+        shutil.rmtree(self.csv_dir)
+        shutil.rmtree(self.columnar_dir)
+
+    def write_rows(self, cyclic_data, run_num):
+        '''
+        Writes the rows of a run with two cycles to cyclic_data.
+        '''
+        cyclic_data.set_run(run_num)
+        cyclic_data.set_cycle(0)
+        cyclic_data.append_agent(0, 0, 0.66241954208476006, 2.5)
+        cyclic_data.append_agent_cycle(0, 18.112793523490414, 13.7, 3.8, 0.0)
+        cyclic_data.append_network(1, 3.8, 0, 3.8, 0, 0, 0)
+        cyclic_data.set_cycle(1)
+        cyclic_data.append_alliance(0, 1)
+        cyclic_data.append_agent_exit(0)
+        cyclic_data.append_agent_breakthrough(0, 1.0, 2.0, 1.0 / 3, 4.0)
+        cyclic_data.append_network(1, 4.1, 0.3, 4.1, 0.3, 4.1, 4.1)
+        cyclic_data.set_cycle(2)
+        cyclic_data.append_cycle(numpy.array([0, 2]), numpy.array([1.0 / 3, 5.0]), \
+                                 numpy.array([2.0, 0.1]), numpy.array([4.1, 3.0]), \
+                                 numpy.array([0.0, 0.2]), \
+                                 (2, 7.1, 0.2, 3.55, 0.1, 3.0, 4.1))
+
+    def test_to_csv(self):
+        '''
+        Tests that the converted csv files are the same as the files
+        written by CyclicData.
+        '''
+        ColumnarData.to_csv(self.columnar_dir)
+        for file_name in CyclicData.FILE_NAMES:
+            expected = open(os.path.join(self.csv_dir, file_name + '.txt')).read()
+            converted = open(os.path.join(self.columnar_dir, file_name + '.txt')).read()
+            self.assertEqual(expected, converted)
+
+    def test_append_cycle(self):
+        '''
+        Tests that append_cycle writes the same rows as append_agent_cycle
+        for each agent and append_network.
+        '''
+        cyclic_data = CyclicData(self.columnar_dir)
+        cyclic_data.set_run(1)
+        cyclic_data.set_cycle(2)
+        cyclic_data.append_agent_cycle(0, 1.0 / 3, 2.0, 4.1, 0.0)
+        cyclic_data.append_agent_cycle(2, 5.0, 0.1, 3.0, 0.2)
+        cyclic_data.append_network(2, 7.1, 0.2, 3.55, 0.1, 3.0, 4.1)
+        cyclic_data.close_all()
+        for file_name in ('data_agent_cycle', 'data_network'):
+            expected = open(os.path.join(self.columnar_dir, file_name + '.txt')).readlines()
+            written = open(os.path.join(self.csv_dir, file_name + '.txt')).readlines()
+            self.assertEqual(expected[1:], written[-len(expected) + 1:])
+
+    def test_append_blocks(self):
+        '''
+        Tests that the blocks of a CycleObserver are written as the same
+        rows as the rows appended one by one, in both formats.
+        '''
+        for cyclic_data in (CyclicData(os.path.join(self.csv_dir, 'blocks')), \
+                            ColumnarData(os.path.join(self.columnar_dir, 'blocks'))):
+            cyclic_data.set_run(1)
+            cyclic_data.set_cycle(0)
+            cyclic_data.append_agents(numpy.array([0]), numpy.array([0]), \
+                                      numpy.array([0.66241954208476006]), [2.5])
+            cyclic_data.append_agent_cycles([0], numpy.array([18.112793523490414]), \
+                                            [13.7], [3.8], numpy.zeros(1))
+            cyclic_data.append_network(1, 3.8, 0, 3.8, 0, 0, 0)
+            cyclic_data.set_cycle(1)
+            cyclic_data.append_alliances(numpy.array([0]), numpy.array([1]))
+            cyclic_data.append_agent_exits(numpy.array([0]))
+            cyclic_data.append_breakthroughs([0], [1.0], [2.0], \
+                                             numpy.array([1.0 / 3]), [4.0])
+            cyclic_data.append_network(1, 4.1, 0.3, 4.1, 0.3, 4.1, 4.1)
+            cyclic_data.set_cycle(2)
+            cyclic_data.append_cycle(numpy.array([0, 2]), numpy.array([1.0 / 3, 5.0]), \
+                                     numpy.array([2.0, 0.1]), numpy.array([4.1, 3.0]), \
+                                     numpy.array([0.0, 0.2]), \
+                                     (2, 7.1, 0.2, 3.55, 0.1, 3.0, 4.1))
+            cyclic_data.close_all()
+        ColumnarData.to_csv(os.path.join(self.columnar_dir, 'blocks'))
+        for file_name in CyclicData.FILE_NAMES:
+            expected = open(os.path.join(self.csv_dir, file_name + '.txt')).read()
+            for output_dir in (self.csv_dir, self.columnar_dir):
+                written = open(os.path.join(output_dir, 'blocks', \
+                                            file_name + '.txt')).read()
+                self.assertEqual(expected, written)
+
+    def test_append_block(self):
+        '''
+        Tests that the rows of append_block are written after the rows in
+        the buffer and that the int values of number columns are kept.
+        '''
+        table = ColumnTable(self.columnar_dir, 'test', 'a,b', \
+                            [('a', 'int'), ('b', 'number')])
+        table.append((0, 0.5))
+        table.append_block((numpy.array([1, 2]), numpy.array([3, 4])))
+        table.append_block((3, numpy.array([1.5])))
+        table.close()
+        ColumnTable.write_csv(self.columnar_dir, 'test', \
+                              os.path.join(self.columnar_dir, 'test.txt'))
+        lines = open(os.path.join(self.columnar_dir, 'test.txt')).readlines()
+        self.assertEqual(['a,b\n', '0,0.5\n', '1,3\n', '2,4\n', '3,1.5\n'], lines)
+
+    def test_read(self):
+        '''
+        Tests that the tables are read as typed arrays.
+        '''
+        columns = ColumnTable.read(self.columnar_dir, 'data_alliance')
+        self.assertEqual([0, 1], list(columns['agent_id1']))
+        self.assertEqual(numpy.dtype('<i4'), columns['agent_id1'].dtype)
+        columns = ColumnTable.read(self.columnar_dir, 'data_network')
+        self.assertEqual([3.8, 4.1, 7.1], list(columns['network_total_cum_knowledge']))
+
+    def test_chunks(self):
+        '''
+        Tests that the rows are written in chunks of CHUNK_SIZE.
+        '''
+        table = ColumnTable(self.columnar_dir, 'test', 'a,b', \
+                            [('a', 'int'), ('b', 'number')])
+        for i in range(ColumnTable.CHUNK_SIZE + 3):
+            table.append((i, i if i % 2 else 0.5 * i))
+        self.assertEqual(ColumnTable.CHUNK_SIZE, table.number_of_rows)
+        self.assertEqual(3, len(table.rows))
+        table.close()
+        columns = ColumnTable.read(self.columnar_dir, 'test')
+        self.assertEqual(range(ColumnTable.CHUNK_SIZE + 3), list(columns['a']))
+        ColumnTable.write_csv(self.columnar_dir, 'test', \
+                              os.path.join(self.columnar_dir, 'test.txt'))
+        lines = open(os.path.join(self.columnar_dir, 'test.txt')).readlines()
+        self.assertEqual(['a,b\n', '0,0.0\n', '1,1\n', '2,1.0\n'], lines[:4])
+
+    def test_merge(self):
+        '''
+        Tests that merged tables are the same as the tables of the runs
+        written one after another.
+        '''
+        run_dir = os.path.join(self.columnar_dir, 'run_2')
+        cyclic_data = ColumnarData(run_dir)
+        self.write_rows(cyclic_data, 2)
+        cyclic_data.close_all()
+        cyclic_data = CyclicData(self.csv_dir)
+        self.write_rows(cyclic_data, 1)
+        self.write_rows(cyclic_data, 2)
+        cyclic_data.close_all()
+        shutil.move(os.path.join(self.columnar_dir, 'run_2'), \
+                    os.path.join(self.csv_dir, 'run_2'))
+        os.mkdir(os.path.join(self.csv_dir, 'run_1'))
+        for file_name in os.listdir(self.columnar_dir):
+            shutil.copy(os.path.join(self.columnar_dir, file_name), \
+                        os.path.join(self.csv_dir, 'run_1'))
+        ColumnarData.merge([os.path.join(self.csv_dir, 'run_1'), \
+                            os.path.join(self.csv_dir, 'run_2')], \
+                           self.columnar_dir)
+        ColumnarData.to_csv(self.columnar_dir)
+        for file_name in CyclicData.FILE_NAMES:
+            expected = open(os.path.join(self.csv_dir, file_name + '.txt')).read()
+            merged = open(os.path.join(self.columnar_dir, file_name + '.txt')).read()
+            self.assertEqual(expected, merged)
+
+    def test_create_cyclic_data(self):
+        '''
+        Tests that create_cyclic_data returns the writer of OUTPUT_FORMAT.
+        '''
+        cyclic_data = create_cyclic_data(self.columnar_dir, \
+                                         Configuration(OUTPUT_FORMAT='columnar'))
+        self.assertTrue(isinstance(cyclic_data, ColumnarData))
+        cyclic_data.close_all()
+        cyclic_data = create_cyclic_data(self.csv_dir, Configuration())
+        self.assertFalse(isinstance(cyclic_data, ColumnarData))
+        cyclic_data.close_all()
+
+if __name__ == "__main__":
+    unittest.main()
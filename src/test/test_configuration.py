@@ -0,0 +1,89 @@
+import unittest
+import os
+import sys
+import argparse
+import tempfile
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.configuration import Configuration
+from main import global_values
+
+
+class TestConfiguration(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Configuration()
+
+    def tearDown(self):
+        self.config = None
+
+    def test_constructor(self):
+        '''
+        Tests that the default values are the values in global_values.py.
+        '''
+        for name in Configuration.PARAMETERS:
+            self.assertEqual(getattr(global_values, name), \
+                             getattr(self.config, name))
+
+    def test_set(self):
+        '''
+        Tests that the derived values follow the overridden values unless
+        they are overridden themselves.
+        '''
+        self.config.set(ALPHA=0.1, BETA=6.0, MAP=10.0)
+        self.assertEqual(0.1, self.config.ALPHA_MARKET)
+        self.assertEqual(0.1, self.config.ALPHA_TECH)
+        self.assertEqual(10.0, self.config.MAP_MARKET)
+        self.assertEqual(9.0, self.config.MAX_TIP)
+        self.assertEqual('../../output_alpha_0.1_beta_6.0/', \
+                         self.config.OUTPUT_DIR)
+        self.config.set(MAX_TIP=3.5)
+        self.config.set(BETA=2.0)
+        self.assertEqual(3.5, self.config.MAX_TIP)
+        self.assertRaises(InputError, self.config.set, UNKNOWN=1)
+
+    def test_copy(self):
+        '''
+        Tests that a copy can be changed without changing the original.
+        '''
+        other = self.config.copy(LOSS=0.0)
+        self.assertEqual(0.0, other.LOSS)
+        self.assertEqual(global_values.LOSS, self.config.LOSS)
+        self.assertFalse('LOSS' in self.config.overridden)
+
+    def test_set_assignments(self):
+        '''
+        Tests that the values given as text take the type of the default
+        value.
+        '''
+        self.config.set_assignments(['BETA=5', 'START_NUM_AGENT = 20', \
+                                     "CYCLE_MAP='map'"])
+        self.assertEqual(5.0, self.config.BETA)
+        self.assertTrue(isinstance(self.config.BETA, float))
+        self.assertEqual(20, self.config.START_NUM_AGENT)
+        self.assertEqual('map', self.config.CYCLE_MAP)
+        self.assertEqual(6.25, self.config.MAX_TIP)
+        self.assertRaises(InputError, self.config.set_assignments, ['BETA'])
+        self.assertRaises(InputError, self.config.set_assignments, ['BETA=x'])
+
+    def test_from_arguments(self):
+        '''
+        Tests that the files are read first and --set options are applied
+        last.
+        '''
+        handle, file_name = tempfile.mkstemp()
+        os.write(handle, "# test values\n\nALPHA = 0.05\nLOSS = 0.0\n")
+        os.close(handle)
+        parser = argparse.ArgumentParser()
+        Configuration.add_arguments(parser)
+        args = parser.parse_args(['--config', file_name, '--set', 'LOSS=5'])
+        config = Configuration.from_arguments(args)
+        os.remove(file_name)
+        self.assertEqual(0.05, config.ALPHA)
+        self.assertEqual(0.05, config.ALPHA_MARKET)
+        self.assertEqual(5.0, config.LOSS)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+import numpy
+
+sys.path.append("../")
+
+from main.cycle_recorder import CycleRecorder
+from main.observer_group import ObserverGroup
+from main.aging import Aging
+from main.cyclic_data import CyclicData
+from main.configuration import Configuration
+from main.random_stream import RandomStream
+from main.calculator import Calculator
+
+
+class TestCycleRecorder(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates the configuration of a small seeded run with breakthroughs
+        in a temporary output directory.
+        '''
+        self.output_dir = tempfile.mkdtemp()
+        self.config = Configuration(MASTER_SEED=9, START_NUM_AGENT=20, \
+                                    NUMBER_OF_CYCLES=4, PLOT_MODE='off', \
+                                    LAMBDA_POISSON=2.0, OUTPUT_DIR=self.output_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+        Calculator.set_config(Configuration.get_default())
+
+    def read_rows(self, file_name):
+        '''
+        Returns the rows of the csv file as lists of floats.
+        '''
+        lines = open(os.path.join(self.output_dir, file_name + '.txt')).readlines()
+        return [[float(value) for value in line.split(',')] for line in lines[1:]]
+
+    def get_rows(self, values, kind):
+        '''
+        Returns the rows of the get values of kind as lists of floats,
+        rounded as they are written to csv files.
+        '''
+        names = ('run', 'cycle') + CycleRecorder.COLUMNS[kind]
+        return [[float(str(value)) for value in row] for row in \
+                numpy.column_stack([values[name] for name in names]).tolist()]
+
+    def test_stream(self):
+        '''
+        Tests that the blocks of each cycle given by stream are the rows of
+        the cycle written by CyclicData in the same run.
+        '''
+        cyclic_data = CyclicData(self.output_dir, self.config)
+        recorder = CycleRecorder()
+        observer = ObserverGroup([cyclic_data, recorder])
+        observer.set_run(1)
+        aging = Aging(1, observer, self.config, RandomStream.for_run(9, 1), \
+                      None, 0)
+        blocks = list(recorder.stream(aging))
+        cyclic_data.close_all()
+        self.assertEqual(range(5), [cycle for cycle, values in blocks])
+        for kind, file_name in (('agent', 'data_agent'), \
+                                ('agent_cycle', 'data_agent_cycle'), \
+                                ('network', 'data_network'), \
+                                ('breakthrough', 'data_breakthrough')):
+            rows = []
+            for cycle, values in blocks:
+                self.assertTrue(numpy.all(values[kind]['cycle'] == cycle))
+                rows += self.get_rows(values[kind], kind)
+            self.assertEqual(self.read_rows(file_name), rows)
+        self.assertTrue(len(self.read_rows('data_breakthrough')) > 0)
+        alliances = self.read_rows('data_alliance')
+        rows = []
+        for cycle, values in blocks:
+            for row in self.get_rows(values['alliance'], 'alliance'):
+                rows += [row, row[:2] + [row[3], row[2]]]
+        self.assertEqual(alliances, rows)
+        self.assertEqual(1, aging.finished)
+
+    def test_get(self):
+        '''
+        Tests that get gives the blocks kept so far and take drops them.
+        '''
+        recorder = CycleRecorder()
+        recorder.set_run(2)
+        recorder.set_cycle(3)
+        recorder.append_alliances(numpy.array([0, 4]), numpy.array([1, 5]))
+        recorder.append_alliances([], [])
+        recorder.set_cycle(4)
+        recorder.append_alliances([2], [3])
+        recorder.append_network(3, 7.5, 1.5, 2.5, 0.5, 1.0, 4.0)
+        values = recorder.get('alliance')
+        self.assertEqual([2, 2, 2], list(values['run']))
+        self.assertEqual([3, 3, 4], list(values['cycle']))
+        self.assertEqual([0, 4, 2], list(values['agent_id1']))
+        self.assertEqual([1, 5, 3], list(values['agent_id2']))
+        self.assertEqual([7.5], list(recorder.get('network')['network_total_cum_knowledge']))
+        self.assertEqual(0, len(recorder.get('agent_exit')['agent_id']))
+        taken = recorder.take()
+        self.assertEqual([0, 4, 2], list(taken['alliance']['agent_id1']))
+        self.assertEqual(0, len(recorder.get('alliance')['run']))
+
+if __name__ == "__main__":
+    unittest.main()
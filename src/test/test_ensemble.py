@@ -0,0 +1,71 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.ensemble import Ensemble
+from main.aging import Aging
+from main.cyclic_data import CyclicData
+from main.configuration import Configuration
+from main.random_stream import RandomStream
+from main.calculator import Calculator
+
+
+class TestEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates the configuration of small seeded runs in a temporary
+        output directory.
+        '''
+        self.output_dir = tempfile.mkdtemp()
+        self.config = Configuration(MASTER_SEED=11, START_NUM_AGENT=10, \
+                                    NUMBER_OF_CYCLES=4, PLOT_MODE='off', \
+                                    OUTPUT_DIR=self.output_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+        Calculator.set_config(Configuration.get_default())
+
+    def read_files(self, output_dir):
+        '''
+        Returns the contents of the cycle data files in output_dir.
+        '''
+        return [open(os.path.join(output_dir, file_name + '.txt')).read() \
+                for file_name in CyclicData.FILE_NAMES]
+
+    def test_run(self):
+        '''
+        Tests that each run of an ensemble, of two parameter points, writes
+        the same data as when it is run alone.
+        '''
+        other = self.config.copy(ALPHA=0.1, BETA=6.0)
+        jobs = [(1, os.path.join(self.output_dir, 'ensemble_1'), self.config, 0), \
+                (2, os.path.join(self.output_dir, 'ensemble_2'), self.config, 0), \
+                (1, os.path.join(self.output_dir, 'ensemble_3'), other, 1)]
+        Ensemble(jobs).run()
+        for run_num, run_dir, config, point_index in jobs:
+            alone_dir = run_dir + '_alone'
+            cyclic_data = CyclicData(alone_dir, config)
+            cyclic_data.set_run(run_num)
+            Aging(run_num, cyclic_data, config, \
+                  RandomStream.for_run(config.MASTER_SEED, run_num, point_index))
+            cyclic_data.close_all()
+            self.assertEqual(self.read_files(alone_dir), self.read_files(run_dir))
+
+    def test_constructor_exception(self):
+        '''
+        Tests the constructor of Ensemble for invalid input.
+        '''
+        self.assertRaises(InputError, Ensemble, [])
+        other = self.config.copy(START_NUM_AGENT=12)
+        self.assertRaises(InputError, Ensemble, \
+                          [(1, self.output_dir, self.config, 0), \
+                           (2, self.output_dir, other, 0)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,259 @@
+import unittest
+import random
+import sys
+import numpy
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.evaluation_engine import EvaluationEngine
+from main.calculator import Calculator
+from main.global_values import MAP_MARKET, MAP_TECH, ALPHA_MARKET, \
+    ALPHA_TECH, BETA, MAX_TIP, MIN_SIGMA, MAX_SIGMA
+
+
+class TestEvaluationEngine(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates random positions and sigmas for 12 agents. Agent 4 is not
+        active.
+        '''
+        random.seed(10)
+        self.num_agent = 12
+        self.loss = 10.0
+        self.radius = 3.0
+        self.map_market = [random.uniform(0, MAP_MARKET) for i in range(self.num_agent)]
+        self.map_knowledge = [random.uniform(0, MAP_TECH) for i in range(self.num_agent)]
+        self.sigma_m = [random.uniform(0.1, MAX_SIGMA - 0.1) for i in range(self.num_agent)]
+        self.sigma_k = [random.uniform(0.1, MAX_SIGMA - 0.1) for i in range(self.num_agent)]
+        self.is_active = [1] * self.num_agent
+        self.is_active[4] = 0
+        self.engine = EvaluationEngine(MAP_MARKET, MAP_TECH, ALPHA_MARKET, \
+                                       ALPHA_TECH, BETA, MAX_TIP, self.loss, \
+                                       self.radius, MIN_SIGMA, MAX_SIGMA)
+
+    def tearDown(self):
+        self.engine = None
+
+    def learning_after_loss(self, map_market, map_knowledge, agent_index, \
+                            partner_index, expected_learning):
+        '''
+        Calculates the expected learning with loss agent by agent as
+        Network.calculate_learning_after_loss does.
+        '''
+        possible_learning = expected_learning
+        for i in range(self.num_agent):
+            if (i != agent_index) and (i != partner_index) and self.is_active[i]:
+                if Calculator.is_in_torus_radius(map_market, self.map_market[i], \
+                                                 map_knowledge, self.map_knowledge[i], \
+                                                 self.radius, MAP_MARKET, MAP_TECH):
+                    possible_learning -= possible_learning * self.loss / 100
+        return possible_learning
+
+    def test_evaluate(self):
+        '''
+        Tests that the evaluate method gives exactly the values calculated
+        pair by pair with the Calculator methods.
+        '''
+        expected, with_loss = self.engine.evaluate(self.map_market, \
+                                                   self.map_knowledge, \
+                                                   self.sigma_m, self.sigma_k, \
+                                                   self.is_active)
+        for i in range(self.num_agent):
+            for j in range(self.num_agent):
+                if (i == j) or not (self.is_active[i] and self.is_active[j]):
+                    self.assertEqual(0, expected[i][j])
+                    self.assertEqual(0, with_loss[i][j])
+                    continue
+                learning = Calculator.calculate_expected_learning(self.sigma_m[i], \
+                                self.sigma_k[i], self.map_market[i], \
+                                self.map_knowledge[i], self.map_market[j], \
+                                self.map_knowledge[j])
+                next_market = Calculator.calculate_next_position(self.map_market[i], \
+                                self.map_market[j], MAP_MARKET, ALPHA_MARKET, \
+                                self.sigma_m[i])
+                next_knowledge = Calculator.calculate_next_position(self.map_knowledge[i], \
+                                self.map_knowledge[j], MAP_TECH, ALPHA_TECH, \
+                                self.sigma_k[i])
+                self.assertEqual(learning, expected[i][j])
+                self.assertEqual(next_market, self.engine.next_map_market[i][j])
+                self.assertEqual(next_knowledge, self.engine.next_map_knowledge[i][j])
+                self.assertEqual(self.learning_after_loss(next_market, next_knowledge, \
+                                                          i, j, learning), \
+                                 with_loss[i][j])
+
+    def test_evaluate_reuses_buffers(self):
+        '''
+        Tests that the buffers are reused while the number of agents is the
+        same.
+        '''
+        expected, with_loss = self.engine.evaluate(self.map_market, \
+                                                   self.map_knowledge, \
+                                                   self.sigma_m, self.sigma_k, \
+                                                   self.is_active)
+        self.map_market[0] = MAP_MARKET - self.map_market[0]
+        expected_next, with_loss_next = self.engine.evaluate(self.map_market, \
+                                                             self.map_knowledge, \
+                                                             self.sigma_m, \
+                                                             self.sigma_k, \
+                                                             self.is_active)
+        self.assertTrue(expected is expected_next)
+        self.assertTrue(with_loss is with_loss_next)
+
+    def test_evaluate_incremental(self):
+        '''
+        Tests that the matrices updated in incremental mode are the same as
+        the matrices calculated for all pairs, when agents move, change
+        sigma or leave the network.
+        '''
+        engine = EvaluationEngine(MAP_MARKET, MAP_TECH, ALPHA_MARKET, \
+                                  ALPHA_TECH, BETA, MAX_TIP, self.loss, \
+                                  self.radius, MIN_SIGMA, MAX_SIGMA, 1)
+        arrays = [numpy.array(values, dtype=float) for values in \
+                  (self.map_market, self.map_knowledge, self.sigma_m, \
+                   self.sigma_k, self.is_active)]
+        engine.evaluate(*arrays)
+        changes = [(0, 0, MAP_MARKET - arrays[0][0]), \
+                   (1, 3, arrays[1][7]), (2, 5, 1.0), (4, 9, 0), (4, 4, 1)]
+        for column, agent, value in changes:
+            arrays[column][agent] = value
+            expected, with_loss = engine.evaluate(*arrays)
+            expected_all, with_loss_all = self.engine.evaluate(*arrays)
+            self.assertTrue(numpy.array_equal(expected_all, expected))
+            self.assertTrue(numpy.array_equal(with_loss_all, with_loss))
+            self.assertTrue(numpy.array_equal(self.engine.neighbor_count, \
+                                              engine.neighbor_count))
+
+    def test_evaluate_sparse(self):
+        '''
+        Tests that the evaluate_sparse method gives the positive values of
+        the matrices of evaluate, on the default map and on a map where
+        most pairs are too far from each other.
+        '''
+        for map_range in (MAP_MARKET, 10 * MAP_MARKET):
+            engine = EvaluationEngine(map_range, map_range, ALPHA_MARKET, \
+                                      ALPHA_TECH, BETA, MAX_TIP, self.loss, \
+                                      self.radius, MIN_SIGMA, MAX_SIGMA)
+            arrays = [numpy.array(values, dtype=float) for values in \
+                      (self.map_market, self.map_knowledge, self.sigma_m, \
+                       self.sigma_k, self.is_active)]
+            arrays[0] *= map_range / MAP_MARKET
+            arrays[1] *= map_range / MAP_TECH
+            expected, with_loss = engine.evaluate_sparse(*arrays)
+            expected_all, with_loss_all = engine.evaluate(*arrays)
+            self.assertTrue(numpy.array_equal(expected_all, expected.to_dense()))
+            self.assertTrue(numpy.array_equal(with_loss_all, with_loss.to_dense()))
+            self.assertEqual(numpy.count_nonzero(expected_all), len(expected.values))
+
+    def test_get_learning_with_loss(self):
+        '''
+        Tests that in lazy loss mode the get_learning_with_loss method gives
+        the values of the expected learning matrix with loss, after evaluate
+        and after evaluate_sparse.
+        '''
+        engine = EvaluationEngine(MAP_MARKET, MAP_TECH, ALPHA_MARKET, \
+                                  ALPHA_TECH, BETA, MAX_TIP, self.loss, \
+                                  self.radius, MIN_SIGMA, MAX_SIGMA, 0, 1)
+        arrays = (self.map_market, self.map_knowledge, self.sigma_m, \
+                  self.sigma_k, self.is_active)
+        expected_all, with_loss_all = self.engine.evaluate(*arrays)
+        rows, cols = numpy.nonzero(numpy.ones((self.num_agent, self.num_agent)))
+        for evaluate in (engine.evaluate, engine.evaluate_sparse):
+            expected, with_loss = evaluate(*arrays)
+            self.assertTrue(with_loss is None)
+            self.assertEqual(list(with_loss_all[rows, cols]), \
+                             list(engine.get_learning_with_loss(rows, cols)))
+
+    def test_get_next_positions(self):
+        '''
+        Tests that the get_next_positions method gives the positions
+        calculated with Calculator.calculate_next_position.
+        '''
+        agents = [0, 5, 3, 11, 7]
+        partners = [5, 0, 11, 3, 2]
+        next_market, next_knowledge = self.engine.get_next_positions( \
+                                          self.map_market, self.map_knowledge, \
+                                          self.sigma_m, self.sigma_k, \
+                                          agents, partners)
+        for k, (i, j) in enumerate(zip(agents, partners)):
+            self.assertEqual(Calculator.calculate_next_position(self.map_market[i], \
+                                 self.map_market[j], MAP_MARKET, ALPHA_MARKET, \
+                                 self.sigma_m[i]), next_market[k])
+            self.assertEqual(Calculator.calculate_next_position(self.map_knowledge[i], \
+                                 self.map_knowledge[j], MAP_TECH, ALPHA_TECH, \
+                                 self.sigma_k[i]), next_knowledge[k])
+        self.assertRaises(InputError, self.engine.get_next_positions, \
+                          self.map_market, self.map_knowledge, self.sigma_m, \
+                          self.sigma_k, agents, partners[:2])
+
+    def test_evaluate_ensemble(self):
+        '''
+        Tests that the networks of an ensemble, with their own BETA and
+        ALPHA values, get the same matrices as when they are evaluated
+        alone.
+        '''
+        betas = [BETA, BETA + 2.0]
+        alphas = [ALPHA_MARKET, ALPHA_MARKET / 2.0]
+        ensemble = EvaluationEngine(MAP_MARKET, MAP_TECH, alphas, alphas, \
+                                    betas, [(beta / 2.0) ** 2 for beta in betas], \
+                                    self.loss, self.radius, MIN_SIGMA, MAX_SIGMA)
+        map_market = [self.map_market, self.map_market[::-1]]
+        is_active = [self.is_active, [1] * self.num_agent]
+        expected, with_loss = ensemble.evaluate(map_market, \
+                                                [self.map_knowledge] * 2, \
+                                                [self.sigma_m] * 2, \
+                                                [self.sigma_k] * 2, is_active)
+        self.assertEqual((2, self.num_agent, self.num_agent), expected.shape)
+        for k in range(2):
+            engine = EvaluationEngine(MAP_MARKET, MAP_TECH, alphas[k], \
+                                      alphas[k], betas[k], (betas[k] / 2.0) ** 2, \
+                                      self.loss, self.radius, MIN_SIGMA, \
+                                      MAX_SIGMA)
+            expected_alone, with_loss_alone = engine.evaluate(map_market[k], \
+                                                              self.map_knowledge, \
+                                                              self.sigma_m, \
+                                                              self.sigma_k, \
+                                                              is_active[k])
+            self.assertTrue(numpy.array_equal(expected_alone, expected[k]))
+            self.assertTrue(numpy.array_equal(with_loss_alone, with_loss[k]))
+
+    def test_evaluate_exception(self):
+        '''
+        Tests the evaluate method for invalid input.
+        '''
+        self.sigma_m[0] = MAX_SIGMA
+        self.assertRaises(InputError, self.engine.evaluate, self.map_market, \
+                          self.map_knowledge, self.sigma_m, self.sigma_k, \
+                          self.is_active)
+        self.sigma_m[0] = 1.0
+        self.map_knowledge[1] = MAP_TECH + 1
+        self.assertRaises(InputError, self.engine.evaluate, self.map_market, \
+                          self.map_knowledge, self.sigma_m, self.sigma_k, \
+                          self.is_active)
+        self.map_knowledge[1] = 1.0
+        ensemble = EvaluationEngine(MAP_MARKET, MAP_TECH, [ALPHA_MARKET] * 3, \
+                                    ALPHA_TECH, BETA, MAX_TIP, self.loss, \
+                                    self.radius, MIN_SIGMA, MAX_SIGMA)
+        self.assertRaises(InputError, ensemble.evaluate, [self.map_market] * 2, \
+                          [self.map_knowledge] * 2, [self.sigma_m] * 2, \
+                          [self.sigma_k] * 2, [self.is_active] * 2)
+
+    def test_get_learning_with_loss_exception(self):
+        '''
+        Tests that the get_learning_with_loss method cannot be called before
+        an evaluation in lazy loss mode.
+        '''
+        self.engine.evaluate(self.map_market, self.map_knowledge, \
+                             self.sigma_m, self.sigma_k, self.is_active)
+        self.assertRaises(InputError, self.engine.get_learning_with_loss, \
+                          [0], [1])
+
+    def test_allocate_exception(self):
+        '''
+        Tests the allocate method for invalid input.
+        '''
+        self.assertRaises(InputError, self.engine.allocate, -1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
+import os
 import random
+import shutil
 import sys
+import tempfile
 from twisted.python.formmethod import InputError
 
 sys.path.append("../")
@@ -8,6 +11,7 @@ sys.path.append("../")
 from main.network import Network
 from main.calculator import Calculator
 from main.cyclic_data import CyclicData
+from main.configuration import Configuration
 
 class TestNetwork(unittest.TestCase):
 
@@ -52,12 +56,11 @@ class TestNetwork(unittest.TestCase):
         cum_knowledge =  1.41809108953
         '''
 
+        self.output_dir = tempfile.mkdtemp()
+        self.config = Configuration(OUTPUT_DIR=os.path.join(self.output_dir, ''))
         random.seed(10)
-        self.cyclic_data = CyclicData()
-        self.network = Network(6, self.cyclic_data)
-
-        if not os.path.exists(OUTPUT_DIR):
-            os.makedirs(OUTPUT_DIR)
+        self.cyclic_data = CyclicData(self.output_dir, self.config)
+        self.network = Network(6, self.cyclic_data, self.config)
 
         # for i in range(6):
         #     print 'Agent = ', i
@@ -68,15 +71,16 @@ class TestNetwork(unittest.TestCase):
                     
     def tearDown(self):
         self.network = None
+        self.cyclic_data.close_all()
         self.cyclic_data = None
-        if os.path.exists(OUTPUT_DIR):
-            os.removedirs(OUTPUT_DIR)
+        shutil.rmtree(self.output_dir)
+        Calculator.set_config(Configuration.get_default())
 
     def test_constructor(self):
         '''
         Tests the constructor of the Network class.
         '''
-        self.assertEqual(0, self.network.cyclic_data.cycle_number)
+        self.assertEqual(0, self.network.observer.cycle_number)
         self.assertEqual(6, len(self.network.agents))
         self.assertNotEqual(None, self.network.sigma)
         self.assertEqual(20.094728488233791, self.network.total_cum_knowledge)
@@ -162,14 +166,14 @@ class TestNetwork(unittest.TestCase):
         '''
         Tests the reset method of the Network class.
         '''
-        self.network.cyclic_data.set_cycle(5)
+        self.network.observer.set_cycle(5)
         self.network.agents[1].exit()
         self.network.reset()
 
         self.assertEqual(0, self.network.average_agent_cum_knowledge)
         self.assertEqual(0, len(self.network.expected_learning_matrix))
         self.assertEqual(0, len(self.network.expected_learning_matrix_with_loss))
-        self.assertEqual(5, self.network.cyclic_data.cycle_number)
+        self.assertEqual(5, self.network.observer.cycle_number)
         self.assertEqual(6, len(self.network.agents))
         self.assertNotEqual(None, self.network.sigma)
         self.assertEqual(20.094728488233791, self.network.total_cum_knowledge)
@@ -316,6 +320,25 @@ class TestNetwork(unittest.TestCase):
         '''
         pass
     
+    def test_form_alliances(self):
+        '''
+        Tests that the form_alliances method makes the alliances and moves
+        the agents to the same positions as the form_alliance method called
+        for each alliance.
+        '''
+        random.seed(10)
+        network = Network(6, self.cyclic_data, self.config)
+        alliances = [(0, 5), (3, 1), (2, 4)]
+        for agent_index, partner_index in alliances:
+            self.network.form_alliance(agent_index, partner_index)
+        network.form_alliances(alliances)
+        for agent, other in zip(self.network.agents, network.agents):
+            self.assertEqual(agent.map_market, other.map_market)
+            self.assertEqual(agent.map_knowledge, other.map_knowledge)
+            self.assertEqual(agent.alliance.agent_id, other.alliance.agent_id)
+            self.assertEqual(0.0, other.next_map_market)
+            self.assertEqual(0.0, other.next_map_tech)
+
     def test_can_make_alliance(self):
         '''
         Tests the can_make_alliance method of the Network class.
@@ -0,0 +1,103 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.parallel_runner import ParallelRunner
+from main.cyclic_data import CyclicData
+from main.configuration import Configuration
+from main.phase_timer import PhaseTimer
+from main.work_counter import WorkCounter
+
+
+class TestParallelRunner(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates the files of runs 2 and 1 in a temporary output directory.
+        '''
+        self.output_dir = tempfile.mkdtemp()
+        self.runner = ParallelRunner(2, self.output_dir)
+        for run_num in (2, 1):
+            cyclic_data = CyclicData(self.runner.get_run_dir(run_num))
+            cyclic_data.set_run(run_num)
+            cyclic_data.set_cycle(1)
+            cyclic_data.append_alliance(0, 1)
+            cyclic_data.append_agent_exit(run_num)
+            cyclic_data.close_all()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_merge(self):
+        '''
+        Tests that the merge method writes the header once and the rows of
+        the runs in the given order, and deletes the run directories.
+        '''
+        self.runner.merge([1, 2])
+        merged = open(os.path.join(self.output_dir, 'data_alliance.txt')).read()
+        self.assertEqual("run,cycle,agent_id1,agent_id2\n" + \
+                         "1,1,0,1\n1,1,1,0\n2,1,0,1\n2,1,1,0\n", merged)
+        merged = open(os.path.join(self.output_dir, 'data_agent_exit.txt')).read()
+        self.assertEqual("run,cycle,agent_id\n1,1,1\n2,1,2\n", merged)
+        for file_name in CyclicData.FILE_NAMES:
+            self.assertTrue(os.path.exists(os.path.join(self.output_dir, \
+                                                        file_name + '.txt')))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, \
+                                                    'alpha_beta_file.txt')))
+        self.assertFalse(os.path.exists(self.runner.get_run_dir(1)))
+        self.assertFalse(os.path.exists(self.runner.get_run_dir(2)))
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, \
+                                                     'data_timing.txt')))
+
+    def test_merge_timing(self):
+        '''
+        Tests that the files of the phase times and the work counters of
+        the runs are merged when they are written.
+        '''
+        config = Configuration(TIMING='cycle')
+        for run_num in (2, 1):
+            cyclic_data = CyclicData(self.runner.get_run_dir(run_num), config)
+            cyclic_data.set_run(run_num)
+            timer = PhaseTimer('cycle', lambda: 0.0)
+            timer.set_cycle(1)
+            timer.record('matching', run_num * 0.5)
+            cyclic_data.append_timing(timer)
+            counter = WorkCounter('cycle')
+            counter.set_cycle(1)
+            counter.add('alliances', run_num)
+            cyclic_data.append_work(counter)
+            cyclic_data.close_all()
+        self.runner.merge([1, 2])
+        lines = open(os.path.join(self.output_dir, \
+                                  'data_timing.txt')).read().splitlines()
+        self.assertEqual("run,phase,calls,seconds", lines[0])
+        self.assertEqual(1 + 2 * len(PhaseTimer.PHASES), len(lines))
+        self.assertTrue("1,matching,1,0.5" in lines)
+        self.assertTrue("2,matching,1,1.0" in lines)
+        merged = open(os.path.join(self.output_dir, \
+                                   'data_timing_cycle.txt')).read()
+        self.assertEqual("run,cycle,phase,seconds\n" + \
+                         "1,1,matching,0.5\n2,1,matching,1.0\n", merged)
+        lines = open(os.path.join(self.output_dir, \
+                                  'data_counter.txt')).read().splitlines()
+        self.assertEqual(1 + 2 * len(WorkCounter.COUNTERS), len(lines))
+        self.assertTrue("1,alliances,1" in lines)
+        self.assertTrue("2,alliances,2" in lines)
+        merged = open(os.path.join(self.output_dir, \
+                                   'data_counter_cycle.txt')).read()
+        self.assertEqual("run,cycle,counter,value\n" + \
+                         "1,1,alliances,1\n2,1,alliances,2\n", merged)
+
+    def test_constructor_exception(self):
+        '''
+        Tests the constructor of ParallelRunner for invalid input.
+        '''
+        self.assertRaises(InputError, ParallelRunner, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.parameter_sweep import ParameterSweep, parse_point
+
+
+class TestParameterSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.sweep = ParameterSweep(ParameterSweep.grid([0.1, 0.2], [2.0, 6.0]) + \
+                                    [(0.0, 4.0, 3.5)], 2, 4)
+
+    def tearDown(self):
+        self.sweep = None
+
+    def test_grid(self):
+        '''
+        Tests the grid method of ParameterSweep class.
+        '''
+        self.assertEqual([(0.1, 2.0), (0.1, 6.0), (0.2, 2.0), (0.2, 6.0)], \
+                         ParameterSweep.grid([0.1, 0.2], [2.0, 6.0]))
+
+    def test_get_jobs(self):
+        '''
+        Tests that there is a job for each point and run, and the jobs are
+        ordered by descending cost.
+        '''
+        jobs = self.sweep.get_jobs()
+        self.assertEqual(10, len(jobs))
+        self.assertEqual([6.0] * 4 + [4.0] * 2 + [2.0] * 4, \
+                         [job[2].BETA for job in jobs])
+        self.assertEqual([1, 2, 1, 2], [job[0] for job in jobs[:4]])
+        self.assertEqual((0.1, 6.0, 9.0), (jobs[0][2].ALPHA, jobs[0][2].BETA, \
+                                           jobs[0][2].MAX_TIP))
+        self.assertEqual((0.0, 4.0, 3.5), (jobs[4][2].ALPHA, jobs[4][2].BETA, \
+                                           jobs[4][2].MAX_TIP))
+        self.assertTrue(jobs[0][1].endswith('run_1'))
+        self.assertEqual([1, 1, 3, 3], [job[3] for job in jobs[:4]])
+
+    def test_configs(self):
+        '''
+        Tests that each point has its own configuration and output
+        directory.
+        '''
+        self.assertEqual(5, len(self.sweep.configs))
+        self.assertEqual('../../output_alpha_0.2_beta_2.0/', \
+                         self.sweep.configs[2].OUTPUT_DIR)
+        self.assertEqual(1.0, self.sweep.configs[2].MAX_TIP)
+        self.assertEqual(0.2, self.sweep.configs[2].ALPHA_MARKET)
+
+    def test_parse_point(self):
+        '''
+        Tests the parse_point function.
+        '''
+        self.assertEqual((0.2, 4.0), parse_point('0.2:4'))
+        self.assertEqual((0.2, 4.0, 3.5), parse_point('0.2:4:3.5'))
+
+    def test_constructor_exception(self):
+        '''
+        Tests the constructor of ParameterSweep for invalid input.
+        '''
+        self.assertRaises(InputError, ParameterSweep, [(0.1, 2.0)], 0, 1)
+        self.assertRaises(InputError, ParameterSweep, [(0.1, 2.0)], 1, 0)
+        self.assertRaises(InputError, ParameterSweep, [(0.1,)], 1, 1)
+        self.assertRaises(InputError, ParameterSweep, [], 1, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.phase_timer import PhaseTimer
+
+
+class FakeClock(object):
+    '''
+    A clock whose time is set by the test.
+    '''
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPhaseTimer(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.timer = PhaseTimer('cycle', self.clock)
+
+    def tearDown(self):
+        self.timer = None
+
+    def test_start_stop(self):
+        '''
+        Tests that a phase started in another phase pauses it, so each
+        phase is given only its own time.
+        '''
+        self.timer.set_cycle(1)
+        self.timer.start('realized_learning')
+        self.clock.now = 2.0
+        self.timer.start('output')
+        self.clock.now = 2.5
+        self.timer.stop()
+        self.clock.now = 3.0
+        self.timer.stop()
+        self.timer.set_cycle(2)
+        self.timer.start('output')
+        self.clock.now = 4.0
+        self.timer.stop()
+        rows = dict((phase, (calls, seconds)) \
+                    for phase, calls, seconds in self.timer.get_rows())
+        self.assertEqual(list(PhaseTimer.PHASES), \
+                         [row[0] for row in self.timer.get_rows()])
+        self.assertEqual((1, 2.5), rows['realized_learning'])
+        self.assertEqual((2, 1.5), rows['output'])
+        self.assertEqual((0, 0.0), rows['matching'])
+        self.assertEqual([(1, 'realized_learning', 2.5), (1, 'output', 0.5), \
+                          (2, 'output', 1.0)], self.timer.get_cycle_rows())
+
+    def test_record(self):
+        '''
+        Tests that a recorded time is added to the phase as a call.
+        '''
+        self.timer.set_cycle(3)
+        self.timer.record('evaluation', 0.25)
+        self.timer.record('evaluation', 0.5)
+        self.assertEqual(('evaluation', 2, 0.75), self.timer.get_rows()[1])
+        self.assertEqual([(3, 'evaluation', 0.75)], self.timer.get_cycle_rows())
+
+    def test_modes(self):
+        '''
+        Tests that the times are not kept for each cycle in run mode and
+        that nothing is measured in off mode.
+        '''
+        timer = PhaseTimer('run', self.clock)
+        timer.start('plot')
+        self.clock.now = 1.0
+        timer.stop()
+        self.assertEqual(('plot', 1, 1.0), timer.get_rows()[0])
+        self.assertEqual([], timer.get_cycle_rows())
+        timer = PhaseTimer('off', self.clock)
+        timer.start('plot')
+        timer.stop()
+        timer.stop()
+        timer.record('plot', 1.0)
+        self.assertEqual(('plot', 0, 0.0), timer.get_rows()[0])
+
+    def test_exception(self):
+        '''
+        Tests PhaseTimer for invalid input.
+        '''
+        self.assertRaises(InputError, PhaseTimer, 'never')
+        self.assertRaises(InputError, self.timer.start, 'never')
+        self.assertRaises(InputError, self.timer.record, 'never', 1.0)
+        self.assertRaises(InputError, self.timer.stop)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import sys
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.plot_policy import PlotPolicy
+
+
+class TestPlotPolicy(unittest.TestCase):
+
+    def plotted(self, policy):
+        '''
+        Returns the plotted cycles of a run of policy.
+        '''
+        return [cycle for cycle in range(policy.last_cycle + 1) \
+                if policy.is_plotted(cycle)]
+
+    def test_every(self):
+        '''
+        Tests the every mode of PlotPolicy class.
+        '''
+        self.assertEqual(range(11), self.plotted(PlotPolicy('every', 10)))
+        self.assertEqual([0, 4, 8, 10], \
+                         self.plotted(PlotPolicy('every', 10, 4)))
+
+    def test_list(self):
+        '''
+        Tests the list mode of PlotPolicy class.
+        '''
+        self.assertEqual([2, 7], \
+                         self.plotted(PlotPolicy('list', 10, cycles=[7, 2, 20])))
+
+    def test_first_last(self):
+        '''
+        Tests the first_last and off modes of PlotPolicy class.
+        '''
+        self.assertEqual([0, 10], self.plotted(PlotPolicy('first_last', 10)))
+        self.assertEqual([], self.plotted(PlotPolicy('off', 10)))
+
+    def test_is_printed_to_pdf(self):
+        '''
+        Tests that the default policy writes the same pdf files as before.
+        '''
+        policy = PlotPolicy('every', 500, 1, (), 50, (249,))
+        self.assertEqual([cycle for cycle in range(501) \
+                          if (cycle % 50 == 0) or (cycle == 249)], \
+                         [cycle for cycle in range(501) \
+                          if policy.is_printed_to_pdf(cycle)])
+        policy = PlotPolicy('every', 500, 1, (), 0, (3,))
+        self.assertEqual([3], [cycle for cycle in range(501) \
+                               if policy.is_printed_to_pdf(cycle)])
+
+    def test_constructor_exception(self):
+        '''
+        Tests the constructor of PlotPolicy for invalid input.
+        '''
+        self.assertRaises(InputError, PlotPolicy, 'some', 10)
+        self.assertRaises(InputError, PlotPolicy, 'every', 10, 0)
+        self.assertRaises(InputError, PlotPolicy, 'every', -1)
+
+if __name__ == "__main__":
+    unittest.main()
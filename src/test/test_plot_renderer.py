@@ -0,0 +1,108 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+import numpy
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main import plot_renderer
+from main.plot_renderer import PlotRenderer
+
+
+class FilePlotter(object):
+    '''
+    Writes the title of each plot to a file instead of plotting it.
+    '''
+
+    @staticmethod
+    def scatter(title, file_name, x_array, y_array, size_array, x_label, \
+                y_label, x_range, y_range, print_pdf, output_dir):
+        data_file = open(os.path.join(output_dir, file_name), 'w')
+        data_file.write(title + ',' + str(len(x_array)) + ',' + str(print_pdf))
+        data_file.close()
+
+
+class FailingPlotter(object):
+    '''
+    Fails to plot the plots with an odd number of points.
+    '''
+
+    @staticmethod
+    def scatter(title, file_name, x_array, y_array, size_array, x_label, \
+                y_label, x_range, y_range, print_pdf, output_dir):
+        if len(x_array) % 2:
+            raise ValueError('cannot plot ' + title)
+        FilePlotter.scatter(title, file_name, x_array, y_array, size_array, \
+                            x_label, y_label, x_range, y_range, print_pdf, \
+                            output_dir)
+
+
+class TestPlotRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.plotter = plot_renderer.Plotter
+        plot_renderer.Plotter = FilePlotter
+
+    def tearDown(self):
+        plot_renderer.Plotter = self.plotter
+        shutil.rmtree(self.output_dir)
+
+    def render(self, in_thread):
+        '''
+        Gives more plots than the queue size to a renderer and checks that
+        all of them are rendered when it is closed.
+        '''
+        renderer = PlotRenderer(2, in_thread)
+        for i in range(6):
+            renderer.scatter('cycle ' + str(i), 'plot' + str(i), \
+                             numpy.arange(i), numpy.arange(i), numpy.arange(i), \
+                             'x', 'y', 10, 10, i % 2, self.output_dir)
+        self.assertEqual(0, renderer.close())
+        self.assertFalse(renderer.worker.is_alive())
+        for i in range(6):
+            text = open(os.path.join(self.output_dir, 'plot' + str(i))).read()
+            self.assertEqual('cycle ' + str(i) + ',' + str(i) + ',' + str(i % 2), \
+                             text)
+
+    def test_process(self):
+        '''
+        Tests the renderer in a separate process.
+        '''
+        self.render(0)
+
+    def test_thread(self):
+        '''
+        Tests the renderer in a thread.
+        '''
+        self.render(1)
+
+    def test_failures(self):
+        '''
+        Tests that the plots that cannot be rendered are skipped and
+        counted, in a process and in a thread.
+        '''
+        plot_renderer.Plotter = FailingPlotter
+        for in_thread in [0, 1]:
+            renderer = PlotRenderer(2, in_thread)
+            for i in range(5):
+                renderer.scatter('cycle ' + str(i), 'plot' + str(i), \
+                                 numpy.arange(i), numpy.arange(i), \
+                                 numpy.arange(i), 'x', 'y', 10, 10, 0, \
+                                 self.output_dir)
+            self.assertEqual(2, renderer.close())
+            for i in range(5):
+                self.assertEqual(i % 2 == 0, os.path.exists( \
+                    os.path.join(self.output_dir, 'plot' + str(i))))
+
+    def test_constructor_exception(self):
+        '''
+        Tests the constructor of PlotRenderer for invalid input.
+        '''
+        self.assertRaises(InputError, PlotRenderer, 0)
+
+if __name__ == "__main__":
+    unittest.main()
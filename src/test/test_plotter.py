@@ -5,6 +5,7 @@ Created on Sep 15, 2012
 '''
 import unittest
 from main.plotter import Plotter
+from twisted.python.formmethod import InputError
 import sys
 
 sys.path.append("../")
@@ -33,6 +34,15 @@ class TestPlotter(unittest.TestCase):
         Plotter.scatter('Title', 'file_name', self.x_array, \
                         self.y_array, self.size_array, 'Xaxis', 'Yaxis', 10, 20, 1)
 
+    def test_set_style(self):
+        '''
+        Tests the set_style method of the Plotter class.
+        '''
+        Plotter.set_style('mathtext')
+        self.assertEqual('mathtext', Plotter.text_mode)
+        self.assertRaises(InputError, Plotter.set_style, 'some')
+        Plotter.set_style('latex')
+
 
 if __name__ == "__main__":
     unittest.main()
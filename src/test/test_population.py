@@ -0,0 +1,86 @@
+import unittest
+import random
+import sys
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.population import Population
+from main.agent import Agent
+from main.sigma import Sigma
+
+
+class TestPopulation(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates a population with capacity 2 and adds three agents to it,
+        so that the arrays are allocated again once.
+        '''
+        random.seed(20)
+        self.sigma = Sigma()
+        self.population = Population(2)
+        self.agents = [Agent(i, 0, self.sigma, self.population) for i in range(3)]
+
+    def tearDown(self):
+        self.population = None
+        self.agents = None
+
+    def test_add(self):
+        '''
+        Tests that the agents are added as rows of the population.
+        '''
+        self.assertEqual(3, len(self.population))
+        self.assertEqual(4, self.population.capacity)
+        self.assertEqual(self.agents, self.population.agents)
+        for i in range(3):
+            self.assertEqual(i, self.agents[i].index)
+            self.assertEqual(self.agents[i].map_market, \
+                             self.population['map_market'][i])
+            self.assertEqual(1, self.population['is_active'][i])
+            self.assertEqual(-1, self.population['partner'][i])
+        self.assertEqual(0.66241954208476006, self.population['sigma_m'][0])
+
+    def test_view(self):
+        '''
+        Tests that the agents and the columns show the same values.
+        '''
+        self.population['cum_knowledge'][1] = 7.5
+        self.assertEqual(7.5, self.agents[1].cum_knowledge)
+        self.agents[2].map_knowledge = 3.25
+        self.assertEqual(3.25, self.population['map_knowledge'][2])
+        self.agents[0].make_alliance(self.agents[2])
+        self.assertEqual([2, -1, 0], list(self.population['partner']))
+        self.assertTrue(self.agents[2].alliance is self.agents[0])
+        self.agents[1].exit()
+        self.assertEqual([0, 2], list(self.population.get_active()))
+
+    def test_reset(self):
+        '''
+        Tests the reset method of Population class.
+        '''
+        self.agents[0].make_alliance(self.agents[1])
+        self.agents[0].cycle_realized_learning = 2.0
+        self.agents[1].next_map_market = 1.5
+        self.population.reset()
+        self.assertEqual(None, self.agents[0].alliance)
+        self.assertEqual(None, self.agents[1].alliance)
+        self.assertEqual(0, self.agents[0].cycle_realized_learning)
+        self.assertEqual(0, self.agents[1].next_map_market)
+
+    def test_alliance_exception(self):
+        '''
+        Tests that agents of different populations cannot make alliance.
+        '''
+        other = Agent(3, 0, self.sigma, Population())
+        self.assertRaises(InputError, Agent.make_alliance, self.agents[0], other)
+
+    def test_constructor_exception(self):
+        '''
+        Tests the constructor and grow method for invalid input.
+        '''
+        self.assertRaises(InputError, Population, 0)
+        self.assertRaises(InputError, self.population.grow, 2)
+
+if __name__ == "__main__":
+    unittest.main()
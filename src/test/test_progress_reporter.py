@@ -0,0 +1,115 @@
+import unittest
+import sys
+import logging
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.progress_reporter import ProgressReporter
+from main.simulation_log import SimulationLog
+
+
+class RecordingHandler(logging.Handler):
+    '''
+    The handler that keeps the messages it is given.
+    '''
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestProgressReporter(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Keeps the messages of the simulation logger at 'info' level and
+        creates a clock whose time is set by the tests.
+        '''
+        self.logger = SimulationLog.get_logger()
+        self.level = self.logger.level
+        self.logger.setLevel(logging.INFO)
+        self.handler = RecordingHandler()
+        self.logger.addHandler(self.handler)
+        self.now = 100.0
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.logger.setLevel(self.level)
+
+    def clock(self):
+        return self.now
+
+    def test_update(self):
+        '''
+        Tests that the progress is reported once every interval and at the
+        last cycle, with the rate and the remaining time.
+        '''
+        reporter = ProgressReporter(3, 100, 10.0, 0, self.clock)
+        self.now = 105.0
+        reporter.update(10)
+        self.assertEqual([], self.handler.messages)
+        self.now = 110.0
+        reporter.update(20)
+        self.now = 115.0
+        reporter.update(30)
+        self.now = 150.0
+        reporter.update(100)
+        self.assertEqual(['run 3 : cycle 20 of 100, 2.00 cycles/s, ETA 40 s', \
+                          'run 3 : cycle 100 of 100, 2.00 cycles/s, ETA 0 s'], \
+                         self.handler.messages)
+
+    def test_start(self):
+        '''
+        Tests the message of the start of a run and of a resumed run, and
+        that the cycles are timed from the start.
+        '''
+        reporter = ProgressReporter(2, 100, 0.0, 0, self.clock)
+        self.now = 200.0
+        reporter.start()
+        self.now = 210.0
+        reporter.update(20)
+        ProgressReporter(2, 100, 0.0, 60, self.clock).start()
+        self.assertEqual(['run 2 : started, 100 cycles', \
+                          'run 2 : cycle 20 of 100, 2.00 cycles/s, ETA 40 s', \
+                          'run 2 : continued from cycle 60 of 100'], \
+                         self.handler.messages)
+
+    def test_resumed(self):
+        '''
+        Tests that the rate of a resumed run counts only the cycles made
+        after its start.
+        '''
+        reporter = ProgressReporter(1, 100, 0.0, 60, self.clock)
+        reporter.update(60)
+        self.now = 110.0
+        reporter.update(80)
+        self.assertEqual(['run 1 : cycle 60 of 100, 0.00 cycles/s, ETA -', \
+                          'run 1 : cycle 80 of 100, 2.00 cycles/s, ETA 10 s'], \
+                         self.handler.messages)
+
+    def test_quiet(self):
+        '''
+        Tests that nothing is reported above 'info' level.
+        '''
+        self.logger.setLevel(logging.WARNING)
+        reporter = ProgressReporter(1, 10, 0.0, 0, self.clock)
+        self.now = 101.0
+        reporter.update(10)
+        self.assertEqual([], self.handler.messages)
+
+    def test_levels(self):
+        '''
+        Tests the levels of LOG_LEVEL in and out of batch mode.
+        '''
+        self.assertEqual(logging.INFO, SimulationLog.get_level('auto'))
+        self.assertEqual(logging.WARNING, SimulationLog.get_level('auto', 1))
+        self.assertEqual(logging.DEBUG, SimulationLog.get_level('debug', 1))
+        self.assertRaises(InputError, SimulationLog.get_level, 'verbose')
+        self.assertRaises(InputError, ProgressReporter, 1, 10, -1.0)
+
+if __name__ == "__main__":
+    unittest.main()
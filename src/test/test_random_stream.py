@@ -0,0 +1,102 @@
+import unittest
+import random
+import sys
+import numpy
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.random_stream import RandomStream
+from main.random_sigma import RandomSigma
+from main.agent import Agent
+from main.population import Population
+
+
+class TestRandomStream(unittest.TestCase):
+
+    def setUp(self):
+        self.stream = RandomStream.for_run(42, 1)
+
+    def tearDown(self):
+        self.stream = None
+
+    def test_for_run(self):
+        '''
+        Tests that the streams of the same run draw the same numbers and
+        the streams of other runs and points draw other numbers.
+        '''
+        values = [self.stream.random() for i in range(10)]
+        other = RandomStream.for_run(42, 1)
+        self.assertEqual(values, [other.random() for i in range(10)])
+        self.assertNotEqual(values[0], RandomStream.for_run(42, 2).random())
+        self.assertNotEqual(values[0], RandomStream.for_run(42, 1, 1).random())
+        self.assertNotEqual(values[0], RandomStream.for_run(43, 1).random())
+        self.assertTrue(RandomStream.for_run(None, 1) is RandomStream.get_global())
+        self.assertRaises(InputError, RandomStream.for_run, -1, 1)
+        branch = RandomStream.for_branch(42, 1, 1).random()
+        self.assertEqual(branch, RandomStream.for_branch(42, 1, 1).random())
+        self.assertNotEqual(values[0], branch)
+        self.assertNotEqual(branch, RandomStream.for_branch(42, 1, 2).random())
+        self.assertRaises(InputError, RandomStream.for_branch, 42, 1, 0)
+
+    def test_block(self):
+        '''
+        Tests that the numbers are given in the order of the generator
+        over the blocks.
+        '''
+        values = [self.stream.random() \
+                  for i in range(RandomStream.BLOCK_SIZE + 5)]
+        state = numpy.random.RandomState([42, 0, 1])
+        expected = list(state.random_sample(RandomStream.BLOCK_SIZE)) + \
+                   list(state.random_sample(5))
+        self.assertEqual(expected, values)
+
+    def test_ranges(self):
+        '''
+        Tests the uniform and randint methods of RandomStream class.
+        '''
+        for i in range(1000):
+            value = self.stream.uniform(2.0, 5.0)
+            self.assertTrue(2.0 <= value < 5.0)
+            value = self.stream.randint(3, 5)
+            self.assertTrue(value in (3, 4, 5))
+        self.assertRaises(InputError, self.stream.randint, 5, 3)
+
+    def test_state(self):
+        '''
+        Tests that a stream set to a state draws the numbers drawn after
+        the state was taken, within and across the blocks.
+        '''
+        for stream in (self.stream, RandomStream.get_global()):
+            [stream.random() for i in range(RandomStream.BLOCK_SIZE - 3)]
+            state = stream.get_state()
+            values = [stream.random() for i in range(10)]
+            stream.set_state(state)
+            self.assertEqual(values, [stream.random() for i in range(10)])
+
+    def test_global(self):
+        '''
+        Tests that the global stream draws from the random module.
+        '''
+        random.seed(20)
+        expected = random.uniform(0, 20)
+        random.seed(20)
+        self.assertEqual(expected, RandomStream.get_global().uniform(0, 20))
+
+    def test_agent(self):
+        '''
+        Tests that the agents created with the same stream have the same
+        values whatever is drawn from the global random module.
+        '''
+        agents = []
+        for i in range(2):
+            random.random()
+            stream = RandomStream.for_run(7, 3)
+            agents.append(Agent(0, 0, RandomSigma(random_stream=stream), \
+                                Population(), random_stream=stream))
+        self.assertEqual(agents[0].sigma_m, agents[1].sigma_m)
+        self.assertEqual(agents[0].map_market, agents[1].map_market)
+        self.assertEqual(agents[0].cum_knowledge, agents[1].cum_knowledge)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import sys
+import shutil
+import tempfile
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from benchmark.scaling_benchmark import ScalingBenchmark, run_case
+from main.phase_timer import PhaseTimer
+from main.work_counter import WorkCounter
+
+
+class TestScalingBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.baseline_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+        shutil.rmtree(self.baseline_dir)
+
+    def test_cases(self):
+        '''
+        Tests that the cases scale the map with the agents and skip the
+        numbers of agents an engine is not run for.
+        '''
+        benchmark = ScalingBenchmark([100, 400, 5000], ['no_loss'], \
+                                     ['dense', 'sparse'], 2)
+        self.assertEqual([('dense', 100), ('dense', 400), ('sparse', 100), \
+                          ('sparse', 400), ('sparse', 5000)], \
+                         [(case[1], case[2]) for case in benchmark.cases])
+        values = benchmark.cases[1][4]
+        self.assertEqual(40.0, values['MAP'])
+        self.assertEqual(0.0, values['LOSS'])
+        self.assertEqual(0, values['SPARSE_EVALUATION'])
+        benchmark = ScalingBenchmark([400], ['no_loss'], ['dense'], 2, \
+                                     fixed_map=1)
+        self.assertFalse('MAP' in benchmark.cases[0][4])
+
+    def test_run_case(self):
+        '''
+        Tests that a case gives the rows of all phases, cycles and
+        counters.
+        '''
+        benchmark = ScalingBenchmark([20], ['default'], ['sparse'], 2)
+        phase_rows, cycle_rows, counter_rows = run_case(benchmark.cases[0])
+        self.assertEqual(list(PhaseTimer.PHASES) + ['total'], \
+                         [row[0] for row in phase_rows])
+        self.assertEqual(2, phase_rows[1][1])
+        self.assertEqual([1, 2], [row[0] for row in cycle_rows])
+        self.assertEqual(list(WorkCounter.COUNTERS), \
+                         [row[0] for row in counter_rows])
+        self.assertTrue(dict(counter_rows)['pair_evaluations'] > 0)
+
+    def test_compare(self):
+        '''
+        Tests that the phases which became slower than the threshold and
+        the counters which changed are found, and get_exponents.
+        '''
+        benchmark = ScalingBenchmark([100, 200], ['default'], ['dense'], 2)
+        counters = [('alliances', 40)]
+        benchmark.write(self.baseline_dir, \
+                        [([('matching', 2, 1.0, 0), ('output', 2, 0.01, 0), \
+                           ('total', 2, 2.0, 1000)], [], counters), \
+                         ([('total', 2, 8.0, 1000)], [], counters)])
+        benchmark.write(self.output_dir, \
+                        [([('matching', 2, 1.5, 0), ('output', 2, 0.05, 0), \
+                           ('total', 2, 2.2, 1000)], [], [('alliances', 41)]), \
+                         ([('total', 2, 8.0, 1000)], [], counters)])
+        self.assertEqual(["default dense 100 matching: 1.000 s -> 1.500 s", \
+                          "default dense 100 alliances: 40 -> 41"], \
+                         ScalingBenchmark.compare(self.baseline_dir, \
+                                                  self.output_dir))
+        self.assertEqual([], ScalingBenchmark.compare(self.baseline_dir, \
+                                                      self.baseline_dir))
+        self.assertEqual([('default', 'dense', 100, 2.0, None), \
+                          ('default', 'dense', 200, 8.0, 2.0)], \
+                         ScalingBenchmark.get_exponents(self.baseline_dir))
+
+    def test_constructor_exception(self):
+        '''
+        Tests the constructor of ScalingBenchmark for invalid input.
+        '''
+        self.assertRaises(InputError, ScalingBenchmark, [100], ['never'])
+        self.assertRaises(InputError, ScalingBenchmark, [100], None, ['never'])
+        self.assertRaises(InputError, ScalingBenchmark, [100], None, None, 0)
+        self.assertRaises(InputError, ScalingBenchmark, [1])
+
+if __name__ == "__main__":
+    unittest.main()
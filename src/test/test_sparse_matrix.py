@@ -0,0 +1,67 @@
+import unittest
+import sys
+import numpy
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.sparse_matrix import SparseMatrix
+
+
+class TestSparseMatrix(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates a 4 x 4 matrix with 4 values, given out of row order.
+        '''
+        self.dense = numpy.zeros((4, 4))
+        self.dense[2, 1] = 3.0
+        self.dense[0, 3] = 1.5
+        self.dense[2, 0] = -1.0
+        self.dense[3, 2] = 2.0
+        self.matrix = SparseMatrix(4, [2, 0, 3, 2], [1, 3, 2, 0], \
+                                   [3.0, 1.5, 2.0, -1.0])
+
+    def tearDown(self):
+        self.matrix = None
+
+    def test_getitem(self):
+        '''
+        Tests that every value is read as from the dense matrix.
+        '''
+        self.assertEqual(4, len(self.matrix))
+        for i in range(4):
+            for j in range(4):
+                self.assertEqual(self.dense[i, j], self.matrix[i, j])
+
+    def test_row_order(self):
+        '''
+        Tests that the pairs are kept in row order.
+        '''
+        self.assertEqual([0, 2, 2, 3], list(self.matrix.rows))
+        self.assertEqual([3, 0, 1, 2], list(self.matrix.cols))
+        self.assertEqual([0, 1, 1, 3, 4], list(self.matrix.row_start))
+
+    def test_get_values(self):
+        '''
+        Tests the get_values method for stored and missing pairs.
+        '''
+        self.assertEqual([1.5, 0.0, 2.0, 0.0], \
+                         list(self.matrix.get_values([0, 3, 3, 1], [3, 3, 2, 0])))
+        self.assertEqual([0.0], list(SparseMatrix(2, [], [], []).get_values([1], [0])))
+
+    def test_to_dense(self):
+        '''
+        Tests the to_dense method.
+        '''
+        self.assertTrue(numpy.array_equal(self.dense, self.matrix.to_dense()))
+
+    def test_exception(self):
+        '''
+        Tests the constructor for invalid input.
+        '''
+        self.assertRaises(InputError, SparseMatrix, 2, [0, 1], [1], [1.0])
+        self.assertRaises(InputError, SparseMatrix, 2, [0], [2], [1.0])
+
+if __name__ == "__main__":
+    unittest.main()
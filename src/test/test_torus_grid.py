@@ -0,0 +1,171 @@
+import unittest
+import random
+import sys
+import numpy
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.torus_grid import TorusGrid
+from main.calculator import Calculator
+
+
+class TestTorusGrid(unittest.TestCase):
+
+    def setUp(self):
+        '''
+        Creates 50 random points on a 20 x 10 map.
+        '''
+        random.seed(10)
+        self.x_range = 20.0
+        self.y_range = 10.0
+        self.x = [random.uniform(0, self.x_range) for i in range(50)]
+        self.y = [random.uniform(0, self.y_range) for i in range(50)]
+        self.ids = range(50)
+
+    def tearDown(self):
+        self.x = None
+        self.y = None
+
+    def count_brute_force(self, x, y, radius, exclude1, exclude2):
+        '''
+        Counts the points within the radius by checking every point.
+        '''
+        count = 0
+        for i in self.ids:
+            if (i != exclude1) and (i != exclude2):
+                if Calculator.is_in_torus_radius(x, self.x[i], y, self.y[i], \
+                                                 radius, self.x_range, \
+                                                 self.y_range):
+                    count += 1
+        return count
+
+    def test_count_in_radius(self):
+        '''
+        Tests the count_in_radius method against checking every point for
+        radius values that give many, few and a single cell.
+        '''
+        for radius in (0.0, 1.0, 2.5, 6.0):
+            grid = TorusGrid(self.x_range, self.y_range, radius)
+            grid.build(self.x, self.y, self.ids)
+            for i in self.ids:
+                self.assertEqual(self.count_brute_force(self.x[i], self.y[i], \
+                                                        radius, i, -1), \
+                                 grid.count_in_radius(self.x[i], self.y[i], i, -1))
+            self.assertEqual(self.count_brute_force(0.0, self.y_range, radius, 3, 7), \
+                             grid.count_in_radius(0.0, self.y_range, 3, 7))
+
+    def test_count_in_radius_wrap(self):
+        '''
+        Tests that the points on the opposite edges of the map are counted.
+        '''
+        grid = TorusGrid(self.x_range, self.y_range, 1.0)
+        grid.build([0.2, 19.9, 10.0], [9.9, 0.1, 5.0], [0, 1, 2])
+        self.assertEqual(1, grid.count_in_radius(0.2, 9.9, 0, -1))
+        self.assertEqual(2, grid.count_in_radius(0.0, 0.0, -1, -1))
+        self.assertEqual(0, grid.count_in_radius(10.0, 5.0, 2, -1))
+
+    def test_count_in_radius_array(self):
+        '''
+        Tests that the count_in_radius_array method gives the same counts
+        as the count_in_radius method, when it pairs the positions with
+        all points of their neighbor cells at once and when it compares
+        them point by point.
+        '''
+        grid = TorusGrid(self.x_range, self.y_range, 2.0)
+        grid.build(self.x, self.y, self.ids)
+        x = numpy.array(self.x)
+        y = numpy.array(self.y)[::-1]
+        exclude = numpy.arange(50)
+        pair_limit = TorusGrid.PAIR_LIMIT
+        for TorusGrid.PAIR_LIMIT in (pair_limit, 0):
+            count = grid.count_in_radius_array(x[:, None] * numpy.ones(50), \
+                                               y[None, :] * numpy.ones((50, 1)), \
+                                               exclude[:, None], exclude[None, :])
+            for i in range(50):
+                for j in range(50):
+                    self.assertEqual(grid.count_in_radius(x[i], y[j], i, j), \
+                                     count[i][j])
+        TorusGrid.PAIR_LIMIT = pair_limit
+
+    def test_neighbor_checks(self):
+        '''
+        Tests that the points compared by count_in_radius_array are
+        counted in the same way by both of its strategies and by
+        count_in_radius.
+        '''
+        grid = TorusGrid(self.x_range, self.y_range, 2.0)
+        grid.build(self.x, self.y, self.ids)
+        for i in self.ids:
+            grid.count_in_radius(self.x[i], self.y[i], i, -1)
+        checks = grid.counts['neighbor_checks']
+        self.assertTrue(checks >= 50)
+        pair_limit = TorusGrid.PAIR_LIMIT
+        for TorusGrid.PAIR_LIMIT in (pair_limit, 0):
+            grid.counts['neighbor_checks'] = 0
+            grid.count_in_radius_array(self.x, self.y, self.ids, -1)
+            self.assertEqual(checks, grid.counts['neighbor_checks'])
+        TorusGrid.PAIR_LIMIT = pair_limit
+
+    def test_count_in_radius_layers(self):
+        '''
+        Tests that the points of a layer are only counted for the positions
+        in the same layer.
+        '''
+        grid = TorusGrid(self.x_range, self.y_range, 2.0)
+        grid.build(self.x + self.x[:25], self.y + self.y[:25], \
+                   self.ids + range(25), [0] * 50 + [1] * 25, 2)
+        layer = TorusGrid(self.x_range, self.y_range, 2.0)
+        layer.build(self.x[:25], self.y[:25], range(25))
+        x = numpy.array(self.x)
+        y = numpy.array(self.y)[::-1]
+        exclude = numpy.arange(50)
+        count = grid.count_in_radius_array(x, y, exclude, -1, \
+                                           numpy.array([[0], [1]]))
+        for i in range(50):
+            self.assertEqual(grid.count_in_radius(x[i], y[i], i, -1, 0), \
+                             count[0][i])
+            self.assertEqual(self.count_brute_force(x[i], y[i], 2.0, i, -1), \
+                             count[0][i])
+            self.assertEqual(layer.count_in_radius(x[i], y[i], i, -1), \
+                             count[1][i])
+            self.assertEqual(grid.count_in_radius(x[i], y[i], i, -1, 1), \
+                             count[1][i])
+
+    def test_find_in_radius(self):
+        '''
+        Tests that the find_in_radius method finds the points counted by
+        the count_in_radius method.
+        '''
+        grid = TorusGrid(self.x_range, self.y_range, 2.0)
+        grid.build(self.x, self.y, self.ids)
+        positions, ids = grid.find_in_radius(self.x[::-1], self.y)
+        for i in range(50):
+            found = ids[positions == i]
+            self.assertEqual(len(set(found)), len(found))
+            self.assertEqual(grid.count_in_radius(self.x[49 - i], self.y[i], \
+                                                  -1, -1), len(found))
+            for point in found:
+                self.assertTrue(Calculator.is_in_torus_radius(self.x[49 - i], \
+                                    self.x[point], self.y[i], self.y[point], \
+                                    2.0, self.x_range, self.y_range))
+
+    def test_build_empty(self):
+        '''
+        Tests the queries on a grid without points.
+        '''
+        grid = TorusGrid(self.x_range, self.y_range, 1.0)
+        grid.build([], [], [])
+        self.assertEqual(0, grid.count_in_radius(1.0, 1.0, -1, -1))
+        self.assertEqual(0, grid.count_in_radius_array([1.0], [1.0], -1, -1)[0])
+
+    def test_constructor_exception(self):
+        '''
+        Tests the constructor of TorusGrid for invalid input.
+        '''
+        self.assertRaises(InputError, TorusGrid, 0, 10, 1)
+        self.assertRaises(InputError, TorusGrid, 10, -1, 1)
+        self.assertRaises(InputError, TorusGrid, 10, 10, -1)
+
+if __name__ == "__main__":
+    unittest.main()
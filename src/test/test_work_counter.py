@@ -0,0 +1,70 @@
+import unittest
+import sys
+from twisted.python.formmethod import InputError
+
+sys.path.append("../")
+
+from main.work_counter import WorkCounter
+
+
+class TestWorkCounter(unittest.TestCase):
+
+    def setUp(self):
+        self.counter = WorkCounter('cycle')
+
+    def tearDown(self):
+        self.counter = None
+
+    def test_take(self):
+        '''
+        Tests that the counts are added to the counters of the current
+        cycle and set to 0.
+        '''
+        counts = WorkCounter.create_counts(('alliance_attempts', 'alliances'))
+        self.counter.set_cycle(1)
+        counts['alliance_attempts'] += 5
+        counts['alliances'] += 2
+        self.counter.take(counts)
+        self.assertEqual({'alliance_attempts': 0, 'alliances': 0}, counts)
+        self.counter.set_cycle(2)
+        counts['alliance_attempts'] += 3
+        self.counter.take(counts)
+        self.counter.add('pair_evaluations', 100)
+        rows = dict(self.counter.get_rows())
+        self.assertEqual(list(WorkCounter.COUNTERS), \
+                         [row[0] for row in self.counter.get_rows()])
+        self.assertEqual(8, rows['alliance_attempts'])
+        self.assertEqual(2, rows['alliances'])
+        self.assertEqual(100, rows['pair_evaluations'])
+        self.assertEqual(0, rows['neighbor_checks'])
+        self.assertEqual([(1, 'alliance_attempts', 5), (1, 'alliances', 2), \
+                          (2, 'pair_evaluations', 100), \
+                          (2, 'alliance_attempts', 3), (2, 'alliances', 0)], \
+                         self.counter.get_cycle_rows())
+
+    def test_modes(self):
+        '''
+        Tests that the values are not kept for each cycle in run mode and
+        that nothing is counted in off mode.
+        '''
+        counter = WorkCounter('run')
+        counter.add('alliances', 4)
+        self.assertEqual(('alliances', 4), counter.get_rows()[-1])
+        self.assertEqual([], counter.get_cycle_rows())
+        counter = WorkCounter('off')
+        counts = WorkCounter.create_counts(('alliances',))
+        counts['alliances'] = 4
+        counter.take(counts)
+        self.assertEqual(0, counts['alliances'])
+        self.assertEqual(('alliances', 0), counter.get_rows()[-1])
+
+    def test_exception(self):
+        '''
+        Tests WorkCounter for invalid input.
+        '''
+        self.assertRaises(InputError, WorkCounter, 'never')
+        self.assertRaises(InputError, WorkCounter.create_counts, ('never',))
+        self.assertRaises(InputError, self.counter.add, 'never', 1)
+
+if __name__ == "__main__":
+    unittest.main()